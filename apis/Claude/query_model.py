@@ -3,6 +3,9 @@ import time
 
 import requests
 
+from apis.base import iter_sse_events
+from apis.transport import get_session, get_timeout
+
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "").strip()
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-latest").strip()
@@ -17,7 +20,27 @@ def safe_print(message, **kwargs):
               **kwargs)
 
 
-def query_model(prompt):
+def read_message_stream(response, on_delta):
+    parts = []
+    usage_data = {}
+    for event in iter_sse_events(response):
+        event_type = event.get("type")
+        if event_type == "message_start":
+            usage_data.update(event.get("message", {}).get("usage", {}))
+        elif event_type == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta" and delta.get("text"):
+                parts.append(delta["text"])
+                on_delta(delta["text"])
+        elif event_type == "message_delta":
+            usage_data.update(event.get("usage", {}))
+    return {
+        "content": [{"type": "text", "text": "".join(parts)}],
+        "usage": usage_data,
+    }
+
+
+def query_model(prompt, on_delta=None):
     if not ANTHROPIC_API_KEY:
         return 0, None, None, None, 0
 
@@ -27,7 +50,7 @@ def query_model(prompt):
     safe_print(f"🔍 Consulting 🤖 {provider} 🧠 {model}...", end='', flush=True)
 
     try:
-        response = requests.post(
+        response = get_session().post(
             "https://api.anthropic.com/v1/messages",
             headers={
                 "x-api-key": ANTHROPIC_API_KEY,
@@ -40,15 +63,22 @@ def query_model(prompt):
                 "messages": [
                     {"role": "user", "content": prompt}
                 ],
+                "stream": on_delta is not None,
             },
-            timeout=60,
+            timeout=get_timeout(),
+            stream=on_delta is not None,
         )
-        data = response.json()
         if response.status_code != 200:
+            data = response.json()
             safe_print(f"❌ {response.status_code})")
             error = data.get("error", {}).get("message", response.text)
             return response.status_code, model, error, None, time.time() - start_time
 
+        if on_delta is not None:
+            data = read_message_stream(response, on_delta)
+        else:
+            data = response.json()
+
         content_blocks = data.get("content", [])
         content = "".join(
             block.get("text", "") for block in content_blocks
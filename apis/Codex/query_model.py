@@ -1,7 +1,8 @@
 import os
 import time
 
-from openai import OpenAI, OpenAIError
+from apis.base import collect_responses_stream
+from apis.transport import get_openai_client
 
 
 CODEX_API_KEY = os.getenv("CODEX_API_KEY", "").strip()
@@ -17,9 +18,10 @@ def safe_print(message, **kwargs):
               **kwargs)
 
 
-def query_model(prompt):
+def query_model(prompt, on_delta=None):
     if not CODEX_API_KEY:
         return 0, None, None, None, 0
+    from openai import OpenAIError
 
     start_time = time.time()
     model = CODEX_MODEL
@@ -29,12 +31,15 @@ def query_model(prompt):
     response = None
     usage = None
     try:
-        client = OpenAI(api_key=CODEX_API_KEY)
+        client = get_openai_client(CODEX_API_KEY)
         response = client.responses.create(
             model=model,
             input=prompt,
-            max_output_tokens=400
+            max_output_tokens=400,
+            stream=on_delta is not None,
         )
+        if on_delta is not None:
+            response = collect_responses_stream(response, on_delta)
         content = (getattr(response, "output_text", "") or "").strip()
         raw_usage = getattr(response, "usage", None)
         if raw_usage is not None:
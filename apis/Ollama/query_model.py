@@ -7,6 +7,7 @@ import requests
 
 sys.path.append('../..')
 from utils import detect_environment  # noqa: E402
+from apis.transport import get_session, get_timeout  # noqa: E402
 
 DEBUG = os.getenv("DEBUG", "False")
 DEBUG = True if DEBUG == "True" else False
@@ -26,7 +27,10 @@ def safe_print(message, **kwargs):
 
 def list_models():
     models = []
-    response = requests.get(f"http://{OLLAMA_HOST}/api/tags")
+    response = get_session().get(
+        f"http://{OLLAMA_HOST}/api/tags",
+        timeout=get_timeout()
+    )
 
     if response.status_code == 200:
         models_availables = response.json().get("models", [])
@@ -39,7 +43,23 @@ def list_models():
     return models
 
 
-def query_model(prompt):
+def read_generate_stream(response, on_delta):
+    parts = []
+    data = {}
+    for line in response.iter_lines():
+        if not line:
+            continue
+        data = json.loads(line)
+        delta = data.get("response", "")
+        if delta:
+            parts.append(delta)
+            on_delta(delta)
+    if "error" not in data:
+        data["response"] = "".join(parts)
+    return data
+
+
+def query_model(prompt, on_delta=None):
     if not OLLAMA_MODEL:
         return 0, None, None, None, 0
     usage = None
@@ -57,16 +77,21 @@ def query_model(prompt):
     error = None
     code = 666
     try:
-        response = requests.post(
+        response = get_session().post(
             f"http://{OLLAMA_HOST}/api/generate",
             json={
                 "model": model,
                 "prompt": prompt,
-                "stream": False
-            }
+                "stream": on_delta is not None
+            },
+            timeout=get_timeout(),
+            stream=on_delta is not None
         )
-        data = response.json()
-        content = response.json()["response"].strip()
+        if on_delta is not None:
+            data = read_generate_stream(response, on_delta)
+        else:
+            data = response.json()
+        content = data["response"].strip()
         code = response.status_code
         error = ""
     except requests.exceptions.ConnectionError:
@@ -4,10 +4,12 @@ import time
 import json
 import random
 import requests
-from openai import OpenAI, OpenAIError
 
 sys.path.append('../..')
 from utils import detect_environment  # noqa: E402
+from apis.base import collect_responses_stream  # noqa: E402
+from apis.transport import get_openai_client, get_session, \
+    get_timeout  # noqa: E402
 
 
 DEBUG = os.getenv("DEBUG", "False")
@@ -29,11 +31,12 @@ def list_models():
     code = None
     models = []
     try:
-        response = requests.get(
+        response = get_session().get(
             "https://api.openai.com/v1/models",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}"
-            }
+            },
+            timeout=get_timeout()
         )
         data = response.json()
         code = response.status_code
@@ -55,21 +58,23 @@ def list_models():
     return models
 
 
-def query_model(prompt):
+def resolve_model():
+    if MODEL_TIER == "cheap":
+        return "gpt-5-nano"
+    if MODEL_TIER == "premium":
+        return "gpt-5.2"
+    return os.getenv("OPENAI_MODEL", "gpt-5-mini")
+
+
+def query_model(prompt, on_delta=None):
     if not OPENAI_API_KEY:
         return 0, None, None, None, 0
+    from openai import OpenAIError
     usage = None
     start_time = time.time()
     response = None
 
-    if MODEL_TIER == "cheap":
-        OPENAI_MODEL = "gpt-5-nano"
-    elif MODEL_TIER == "premium":
-        OPENAI_MODEL = "gpt-5.2"
-    else:
-        OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5-mini")
-
-    model = OPENAI_MODEL
+    model = resolve_model()
     if model == "RANDOM":
         models = list_models()
         model = random.choice(models)
@@ -78,13 +83,16 @@ def query_model(prompt):
     model = model.strip()
     safe_print(f"🔍 Consulting 🤖 {provider} 🧠 {model}...", end='', flush=True)
     code = 500
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = get_openai_client(OPENAI_API_KEY)
     try:
         response = client.responses.create(
             model=model,
             input=prompt,
-            max_output_tokens=400
+            max_output_tokens=400,
+            stream=on_delta is not None,
         )
+        if on_delta is not None:
+            response = collect_responses_stream(response, on_delta)
         code = 200
 
         if DEBUG:
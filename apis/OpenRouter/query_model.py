@@ -5,10 +5,13 @@ import json
 import time
 import random
 import secrets
-import requests
+import tempfile
+import threading
 
 sys.path.append('../..')
 from utils import detect_environment  # noqa: E402
+from apis.base import iter_sse_events  # noqa: E402
+from apis.transport import get_session, get_timeout  # noqa: E402
 
 
 DEBUG = os.getenv("DEBUG", "False")
@@ -17,6 +20,20 @@ OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "FreeAll").strip()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "").strip()
 random.seed(secrets.randbits(64))
 BLACKLIST_PATH = os.path.join(os.path.dirname(__file__), "blacklist.txt")
+CATALOG_PATH = os.path.expanduser(
+    os.getenv("OPENROUTER_CATALOG_PATH", "~/.gcm/openrouter_models.json")
+)
+CATALOG_MAX_AGE = int(os.getenv("OPENROUTER_CATALOG_MAX_AGE", "3600"))
+CATALOG_TOP_N = 5
+STATS_PATH = os.path.join(os.path.dirname(__file__), "model_stats.json")
+STATS_ALPHA = 0.3
+DEFAULT_LATENCY = 10.0
+COOLDOWN_BASE = 60
+COOLDOWN_MAX = 3600
+# --batch runs OpenRouter from several threads: each load -> update -> save
+# cycle holds its file's lock so concurrent updates are not lost.
+STATS_LOCK = threading.Lock()
+CATALOG_LOCK = threading.RLock()
 
 
 def safe_print(message, **kwargs):
@@ -40,6 +57,106 @@ def save_to_blacklist(model, filename=BLACKLIST_PATH):
         f.write(f"{model}\n")
 
 
+def load_model_stats(filename):
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json_atomic(data, path, **dump_kwargs):
+    """Write through a unique temp file in the same directory, then rename."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_model_stats(stats, filename):
+    try:
+        write_json_atomic(stats, filename, indent=2, sort_keys=True)
+    except OSError as e:
+        if DEBUG:
+            safe_print(f"⚠️ Could not save model stats: {e}")
+
+
+def update_model_stats(model, success, elapsed, filename=None):
+    filename = filename or STATS_PATH
+    with STATS_LOCK:
+        stats = load_model_stats(filename)
+        record_model_result(stats, model, success, elapsed)
+        save_model_stats(stats, filename)
+        return stats
+
+
+def _ewma(previous, value):
+    if previous is None:
+        return value
+    return (STATS_ALPHA * value) + ((1 - STATS_ALPHA) * previous)
+
+
+def record_model_result(stats, model, success, elapsed, now=None):
+    now = time.time() if now is None else now
+    entry = stats.setdefault(model, {
+        "latency": None,
+        "success": None,
+        "attempts": 0,
+        "failures": 0,
+        "cooldown_until": 0,
+    })
+    entry["attempts"] += 1
+    entry["success"] = _ewma(entry["success"], 1.0 if success else 0.0)
+
+    if success:
+        entry["latency"] = _ewma(entry["latency"], elapsed)
+        entry["failures"] = 0
+        entry["cooldown_until"] = 0
+    else:
+        # Consecutive failures double the cool-down, up to COOLDOWN_MAX.
+        entry["failures"] += 1
+        cooldown = min(COOLDOWN_BASE * 2 ** (entry["failures"] - 1), COOLDOWN_MAX)
+        entry["cooldown_until"] = now + cooldown
+    return entry
+
+
+def model_score(entry):
+    """
+    Expected seconds per successful answer; lower is tried first.
+    """
+    latency = entry.get("latency")
+    success = entry.get("success")
+    latency = DEFAULT_LATENCY if latency is None else latency
+    success = 1.0 if success is None else success
+    return latency / max(success, 0.05)
+
+
+def order_models(models, stats, now=None):
+    now = time.time() if now is None else now
+    # Shuffle first so models with equal scores keep being spread out.
+    shuffled = random.sample(models, len(models))
+    ready = [
+        model for model in shuffled
+        if stats.get(model, {}).get("cooldown_until", 0) <= now
+    ]
+    if not ready:
+        return sorted(
+            shuffled,
+            key=lambda model: stats[model].get("cooldown_until", 0)
+        )
+    return sorted(ready, key=lambda model: model_score(stats.get(model, {})))
+
+
 def extract_model_size(model_id):
     """
     Returns the approximate number of parameters in millions.
@@ -52,88 +169,188 @@ def extract_model_size(model_id):
     return size * (1_000 if scale == 'b' else 1)  # 1B = 1000M
 
 
-def list_free_models(selection="FreeAll", top_n=5):
-    blacklist = load_blacklist()
+def blacklist_signature(filename):
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
 
-    r = requests.get(
-        "https://openrouter.ai/api/v1/models",
-        headers={"Authorization": f"Bearer {OPENROUTER_API_KEY}"}
-    )
 
-    models = r.json().get("data", [])
+def load_catalog(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 
-    free = [
-        m for m in models
-        if (
+def save_catalog(catalog, path):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomic(catalog, path, ensure_ascii=False)
+    except OSError as e:
+        if DEBUG:
+            safe_print(f"⚠️ Could not save model catalog: {e}")
+
+
+def extract_free_models(models):
+    free_models = []
+    for m in models:
+        if not (
             m.get("pricing", {}).get("prompt") == "0" and
             m.get("pricing", {}).get("completion") == "0"
-        )
-    ]
+        ):
+            continue
+        model_id = m["id"]
+        free_models.append({
+            "id": model_id,
+            "context": m.get("context_length", 0) or 0,
+            "size": extract_model_size(model_id),
+        })
+    return free_models
 
-    if not free:
-        return []
+
+def rank_free_models(free_models, blacklist, top_n=CATALOG_TOP_N):
+    detailed_models = [m for m in free_models if m["id"] not in blacklist]
 
     if DEBUG:
-        safe_print(f"🔍 Free models found: {len(free)}")
+        for m in detailed_models:
+            safe_print(f'🧠 Model: {m["id"]}')
+            safe_print(f'📦 Params: {m["size"]}M')
+            safe_print(f'🧵 CTX: {m["context"]}\n')
+
+    by_size = sorted(detailed_models, key=lambda m: m["size"], reverse=True)
+    by_context = sorted(detailed_models, key=lambda m: m["context"], reverse=True)
+    by_score = sorted(
+        detailed_models,
+        key=lambda m: (m["size"] * 0.7) + (m["context"] / 1000 * 0.3),
+        reverse=True
+    )
+    return {
+        "FreeAll": [m["id"] for m in detailed_models],
+        "FreeTop": [m["id"] for m in by_size[:top_n]],
+        "FreeCtxMax": [m["id"] for m in by_context[:top_n]],
+        "FreeSmart": [m["id"] for m in by_score[:top_n]],
+    }
+
+
+def fetch_catalog(cached=None):
+    headers = {"Authorization": f"Bearer {OPENROUTER_API_KEY}"}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = get_session().get(
+        "https://openrouter.ai/api/v1/models",
+        headers=headers,
+        timeout=get_timeout()
+    )
 
-    detailed_models = []
-    for m in free:
-        model_id = m["id"]
-        if model_id in blacklist:
-            continue  # Ignorar modelos en blacklist
+    if r.status_code == 304 and cached:
+        cached["fetched_at"] = time.time()
+        return cached
 
-        context = m.get("context_length", 0)
-        size = extract_model_size(model_id)
-        detailed_models.append({
-            "id": model_id,
-            "context": context,
-            "size": size,
-            "description": m.get("description", "")
-        })
+    r.raise_for_status()
+    models = r.json().get("data", [])
+    return {
+        "fetched_at": time.time(),
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "free_models": extract_free_models(models),
+    }
+
+
+def get_catalog(max_age=None, path=None):
+    max_age = CATALOG_MAX_AGE if max_age is None else max_age
+    path = path or CATALOG_PATH
+    with CATALOG_LOCK:
+        catalog = load_catalog(path)
+        if catalog and time.time() - catalog.get("fetched_at", 0) < max_age:
+            return catalog, False
 
-        if DEBUG:
-            safe_print(f'🧠 Model: {model_id}')
-            # print(f'🗨️ Description: {m.get("description", "")}…')  # [:60]
-            safe_print(f'📦 Params: {size}M')
-            safe_print(f'🧵 CTX: {context}\n')
+        try:
+            catalog = fetch_catalog(catalog)
+            save_catalog(catalog, path)
+            return catalog, True
+        except Exception as e:
+            if not catalog:
+                raise
+            # A stale catalog is still better than no OpenRouter at all.
+            safe_print(f"⚠️ Using cached OpenRouter catalog ({e})")
+            return catalog, False
+
+
+def list_free_models(selection="FreeAll", top_n=CATALOG_TOP_N):
+    with CATALOG_LOCK:
+        return _list_free_models(selection, top_n)
+
+
+def _list_free_models(selection, top_n):
+    catalog, changed = get_catalog()
+    free_models = catalog.get("free_models", [])
+
+    if not free_models:
+        return []
+
+    if DEBUG:
+        safe_print(f"🔍 Free models found: {len(free_models)}")
+
+    # Rankings are stored alongside the catalog and only recomputed when
+    # the catalog or blacklist.txt changes.
+    signature = blacklist_signature(BLACKLIST_PATH)
+    rankings = catalog.get("rankings")
+    if (
+        changed or rankings is None or
+        catalog.get("blacklist_signature") != signature or
+        catalog.get("top_n") != top_n
+    ):
+        rankings = rank_free_models(
+            free_models, load_blacklist(BLACKLIST_PATH), top_n
+        )
+        catalog["rankings"] = rankings
+        catalog["blacklist_signature"] = signature
+        catalog["top_n"] = top_n
+        save_catalog(catalog, CATALOG_PATH)
 
-    if not detailed_models:
+    if not rankings["FreeAll"]:
         safe_print("⚠️ There are no valid models "
                    "available after applying blacklist.")
         return []
 
-    if selection == "FreeAll":
-        return [m["id"] for m in detailed_models]
+    if selection in rankings:
+        return list(rankings[selection])
 
-    elif selection == "FreeTop":
-        sorted_models = sorted(detailed_models, key=lambda
-                               m: m["size"], reverse=True)
-        return [m["id"] for m in sorted_models[:top_n]]
+    return [random.choice(rankings["FreeAll"])]
 
-    elif selection == "FreeCtxMax":
-        sorted_models = sorted(detailed_models, key=lambda
-                               m: m["context"], reverse=True)
-        return [m["id"] for m in sorted_models[:top_n]]
 
-    elif selection == "FreeSmart":
-        sorted_models = sorted(
-            detailed_models,
-            key=lambda m: (m["size"] * 0.7) + (m["context"] / 1000 * 0.3),
-            reverse=True
-        )
-        return [m["id"] for m in sorted_models[:top_n]]
-
-    else:
-        random_model = random.choice(detailed_models)
-        return [random_model["id"]]
+def read_completion_stream(response, on_delta):
+    parts = []
+    usage_data = {}
+    for chunk in iter_sse_events(response):
+        for choice in chunk.get("choices", []):
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        if chunk.get("usage"):
+            usage_data = chunk["usage"]
+    return {
+        "choices": [{"message": {"content": "".join(parts)}}],
+        "usage": usage_data,
+    }
 
 
-def query_with_fallback(models_to_use, prompt):
+def query_with_fallback(models_to_use, prompt, on_delta=None):
     provider = "OpenRouter"
     attempted_models = set()
+    stats = load_model_stats(STATS_PATH)
 
-    for model in random.sample(models_to_use, len(models_to_use)):
-        model = model.strip()
+    for model in order_models(
+        [model.strip() for model in models_to_use], stats
+    ):
         if model in attempted_models:
             continue  # Ya intentado, lo saltamos
 
@@ -144,7 +361,7 @@ def query_with_fallback(models_to_use, prompt):
                    end='', flush=True)
 
         try:
-            response = requests.post(
+            response = get_session().post(
                 url="https://openrouter.ai/api/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {OPENROUTER_API_KEY}",
@@ -154,15 +371,22 @@ def query_with_fallback(models_to_use, prompt):
                     "model": model,
                     "messages": [
                         {"role": "user", "content": prompt}
-                    ]
-                })
+                    ],
+                    "stream": on_delta is not None
+                }),
+                timeout=get_timeout(),
+                stream=on_delta is not None
             )
             elapsed_time = time.time() - start_time
             code = response.status_code
 
             if code == 200:
+                if on_delta is not None:
+                    data = read_completion_stream(response, on_delta)
+                else:
+                    data = response.json()
                 safe_print("✅")
-                data = response.json()
+                elapsed_time = time.time() - start_time
                 content = data["choices"][0]["message"]["content"].strip()
                 usage_data = data.get("usage", {})
                 usage = {
@@ -171,6 +395,7 @@ def query_with_fallback(models_to_use, prompt):
                         usage_data.get("completion_tokens", 0),
                     "total_tokens": usage_data.get("total_tokens", 0)
                 }
+                update_model_stats(model, True, elapsed_time)
                 return code, model, content, usage, elapsed_time
             # if "error" in data:
             #     error = data["error"]["message"]
@@ -183,17 +408,19 @@ def query_with_fallback(models_to_use, prompt):
 
             else:
                 safe_print(f"❌ Error {code} with model {model}")
+                update_model_stats(model, False, elapsed_time)
                 continue
 
         except Exception as e:
             safe_print(f"❌ Exception with model {model}: {e}")
+            update_model_stats(model, False, time.time() - start_time)
             continue
 
     safe_print("❌ No valid model responded.")
     return 666, None, "No response could be obtained from any model.", None, 0
 
 
-def query_model(prompt):
+def query_model(prompt, on_delta=None):
     if not OPENROUTER_API_KEY:
         return 0, None, None, None, 0
 
@@ -208,7 +435,7 @@ def query_model(prompt):
         models_to_use = [model]
 
     # print("models_to_use ->", models_to_use)
-    return query_with_fallback(models_to_use, prompt)
+    return query_with_fallback(models_to_use, prompt, on_delta)
 
     # return code, model, final_response, usage, elapsed_time
 
@@ -1,3 +1,5 @@
+import json
+
 from apis.types import ModelResponse
 
 
@@ -16,3 +18,27 @@ def normalize_response(provider_name, raw_response):
         elapsed=elapsed,
         error=error,
     )
+
+
+def iter_sse_events(response):
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            break
+        try:
+            yield json.loads(payload)
+        except ValueError:
+            continue
+
+
+def collect_responses_stream(stream, on_delta):
+    completed = None
+    for event in stream:
+        event_type = getattr(event, "type", "")
+        if event_type == "response.output_text.delta":
+            on_delta(getattr(event, "delta", "") or "")
+        elif event_type == "response.completed":
+            completed = getattr(event, "response", None)
+    return completed
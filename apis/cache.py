@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = "~/.gcm/cache"
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=86400, max_entries=500):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def build_key(self, provider, model, prompt, max_characters):
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw_key = "\x1f".join([
+            str(provider),
+            str(model or ""),
+            prompt_hash,
+            str(max_characters or ""),
+        ])
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+
+        if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(entry_path)
+            self._count(False)
+            return None
+
+        try:
+            # The file mtime doubles as the LRU timestamp.
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+        self._count(True)
+        return tuple(entry["response"])
+
+    def put(self, key, raw_response):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            entry_path = self._entry_path(key)
+            tmp_path = f"{entry_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "created": time.time(),
+                    "response": list(raw_response),
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError):
+            return
+        self.evict()
+
+    def evict(self):
+        if not self.max_entries:
+            return
+
+        try:
+            names = [
+                name for name in os.listdir(self.path)
+                if name.endswith(".json")
+            ]
+        except OSError:
+            return
+
+        overflow = len(names) - self.max_entries
+        if overflow <= 0:
+            return
+
+        entries = []
+        for name in names:
+            entry_path = os.path.join(self.path, name)
+            try:
+                entries.append((os.path.getmtime(entry_path), entry_path))
+            except OSError:
+                continue
+        entries.sort()
+        for _, entry_path in entries[:overflow]:
+            self._remove(entry_path)
+
+    def _remove(self, entry_path):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def scoped(self):
+        return ScopedResponseCache(self)
+
+
+class ScopedResponseCache:
+    """Shares a ResponseCache's entries but keeps its own hit/miss counters,
+    so concurrent batch repositories each record only their own lookups."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def build_key(self, *args):
+        return self.cache.build_key(*args)
+
+    def get(self, key):
+        response = self.cache.get(key)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(self, key, raw_response):
+        self.cache.put(key, raw_response)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def build_response_cache(config):
+    cache_cfg = config.get("response_cache") or {}
+    if not cache_cfg.get("enabled", False):
+        return None
+
+    return ResponseCache(
+        path=cache_cfg.get("path", DEFAULT_CACHE_PATH),
+        ttl=cache_cfg.get("ttl", 86400),
+        max_entries=cache_cfg.get("max_entries", 500),
+    )
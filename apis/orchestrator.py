@@ -1,6 +1,13 @@
+import queue
+import threading
+import time
+from functools import partial
+
 from apis.base import normalize_response
 from apis.types import CandidateMessage, ExecutionPlan
 
+DYNAMIC_MODELS = frozenset({"RANDOM", "FreeAll", "FreeTop", "FreeCtxMax", "FreeSmart"})
+
 
 def build_execution_plan(providers, config):
     generators = sorted(
@@ -17,6 +24,11 @@ def build_execution_plan(providers, config):
         key=lambda provider: provider.priority,
         reverse=True
     )
+    # Group summaries for large changesets go to the cheapest provider.
+    summarizers = sorted(
+        [provider for provider in providers if "summarize" in provider.roles],
+        key=lambda provider: provider.priority
+    )
 
     max_generators = config.get(
         "generator_count",
@@ -24,11 +36,23 @@ def build_execution_plan(providers, config):
     )
     judge_enabled = config.get("enable_judge", False)
     refiner_enabled = config.get("enable_refiner", False)
+    strategy = config.get("provider_strategy", "auto")
+
+    # "race" starts every available generator and keeps the first K valid
+    # answers instead of waiting on a fixed top-N selection.
+    required_candidates = None
+    if strategy == "race":
+        required_candidates = config.get("race_candidates", max_generators)
+    else:
+        generators = generators[:max_generators]
 
     return ExecutionPlan(
-        generators=generators[:max_generators],
+        generators=generators,
         judge=judges[0] if judge_enabled and judges else None,
         refiner=refiners[0] if refiner_enabled and refiners else None,
+        strategy=strategy,
+        required_candidates=required_candidates,
+        summarizer=summarizers[0] if summarizers else None,
     )
 
 
@@ -62,31 +86,156 @@ def validate_message(content, max_characters):
     return True, None
 
 
-def run_generators(generators, prompt, max_characters):
-    candidates = []
+def build_candidate(response, max_characters):
+    if response.code != 200 or not response.content:
+        return None
 
-    for provider in generators:
-        response = normalize_response(
-            provider.name,
-            provider.query_fn(prompt)
-        )
-        if response.code != 200 or not response.content:
-            continue
-
-        content = response.content[:max_characters] if max_characters else response.content
-        valid, _ = validate_message(content, max_characters)
-        if not valid:
-            continue
-
-        candidates.append(CandidateMessage(
-            provider=response.provider,
-            model=response.model,
-            content=content,
-            usage=response.usage,
-            elapsed=response.elapsed,
+    content = response.content[:max_characters] if max_characters else response.content
+    valid, _ = validate_message(content, max_characters)
+    if not valid:
+        return None
+
+    return CandidateMessage(
+        provider=response.provider,
+        model=response.model,
+        content=content,
+        usage=response.usage,
+        elapsed=response.elapsed,
+    )
+
+
+def query_provider(provider, prompt, cache=None, max_characters=None,
+                   on_delta=None):
+    def call_provider():
+        if on_delta is None:
+            return provider.query_fn(prompt)
+        return provider.query_fn(prompt, on_delta=on_delta)
+
+    # A model picked per call (random or ranked free models) is only known
+    # after the call, so its answer must not be replayed for a whole TTL.
+    if cache is None or DYNAMIC_MODELS.intersection(provider.models):
+        return normalize_response(provider.name, call_provider())
+
+    model_key = ",".join(provider.models)
+    key = cache.build_key(provider.name, model_key, prompt, max_characters)
+    start = time.perf_counter()
+    raw_response = cache.get(key)
+    if raw_response is None:
+        raw_response = call_provider()
+        if raw_response[0] == 200:
+            cache.put(key, raw_response)
+    else:
+        # Report the lookup, not the network latency of the original call.
+        code, model, content, usage = raw_response[:4]
+        raw_response = (code, model, content, usage, time.perf_counter() - start)
+        if on_delta is not None and isinstance(content, str):
+            on_delta(content)
+
+    return normalize_response(provider.name, raw_response)
+
+
+def bind_delta(on_delta, provider):
+    if on_delta is None:
+        return None
+    return partial(on_delta, provider.name)
+
+
+def run_generators(generators, prompt, max_characters,
+                   parallel=False, timeout=None, required=None, cache=None,
+                   on_delta=None):
+    if required is None and (not parallel or len(generators) < 2):
+        candidates = []
+        for provider in generators:
+            candidate = build_candidate(
+                query_provider(
+                    provider, prompt, cache, max_characters,
+                    bind_delta(on_delta, provider)
+                ),
+                max_characters
+            )
+            if candidate:
+                candidates.append(candidate)
+        return candidates
+
+    return run_generators_parallel(
+        generators, prompt, max_characters, timeout, required, cache, on_delta
+    )
+
+
+def iter_completed(tasks, timeout=None, max_workers=None):
+    """Run ``(key, fn)`` tasks on daemon threads and yield
+    ``(key, result, error)`` in completion order until ``timeout``.
+
+    Calls still running past the deadline, or when the consumer stops
+    early, are abandoned: daemon threads never keep the process alive at
+    exit, and queued tasks that have not started are skipped.
+    """
+    if not tasks:
+        return
+    pending = queue.Queue()
+    for task in tasks:
+        pending.put(task)
+    done = queue.Queue()
+    stopped = threading.Event()
+
+    def worker():
+        while not stopped.is_set():
+            try:
+                key, fn = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                done.put((key, fn(), None))
+            except Exception as error:
+                done.put((key, None, error))
+
+    for _ in range(min(max_workers or len(tasks), len(tasks))):
+        threading.Thread(target=worker, daemon=True).start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        for _ in range(len(tasks)):
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+            try:
+                yield done.get(timeout=remaining)
+            except queue.Empty:
+                return
+    finally:
+        stopped.set()
+
+
+def run_generators_parallel(generators, prompt, max_characters,
+                            timeout=None, required=None, cache=None,
+                            on_delta=None):
+    # Results are keyed by plan position so the output keeps the priority
+    # order of the ExecutionPlan, whatever order the providers finish in.
+    results = {}
+    tasks = [
+        (position, partial(
+            query_provider, provider, prompt, cache, max_characters,
+            bind_delta(on_delta, provider)
         ))
+        for position, provider in enumerate(generators)
+    ]
 
-    return candidates
+    completed = iter_completed(tasks, timeout)
+    try:
+        for position, response, error in completed:
+            if error is not None:
+                continue
+            candidate = build_candidate(response, max_characters)
+            if candidate:
+                results[position] = candidate
+            if required and len(results) >= required:
+                break
+    finally:
+        completed.close()
+
+    return [results[position] for position in sorted(results)]
 
 
 def build_judge_prompt(base_prompt, candidates, max_characters):
@@ -112,27 +261,16 @@ def build_judge_prompt(base_prompt, candidates, max_characters):
     ])
 
 
-def run_judge(judge, base_prompt, candidates, max_characters):
+def run_judge(judge, base_prompt, candidates, max_characters, cache=None):
     if not judge or len(candidates) < 2:
         return candidates[0] if candidates else None
 
     prompt = build_judge_prompt(base_prompt, candidates, max_characters)
-    response = normalize_response(judge.name, judge.query_fn(prompt))
-    if response.code != 200 or not response.content:
-        return candidates[0]
-
-    content = response.content[:max_characters] if max_characters else response.content
-    valid, _ = validate_message(content, max_characters)
-    if not valid:
-        return candidates[0]
-
-    return CandidateMessage(
-        provider=response.provider,
-        model=response.model,
-        content=content,
-        usage=response.usage,
-        elapsed=response.elapsed,
+    selected = build_candidate(
+        query_provider(judge, prompt, cache, max_characters),
+        max_characters
     )
+    return selected or candidates[0]
 
 
 def build_refiner_prompt(base_prompt, candidate, max_characters):
@@ -154,24 +292,41 @@ def build_refiner_prompt(base_prompt, candidate, max_characters):
     ])
 
 
-def run_refiner(refiner, base_prompt, candidate, max_characters):
+def run_refiner(refiner, base_prompt, candidate, max_characters, cache=None):
     if not refiner or not candidate:
         return candidate
 
     prompt = build_refiner_prompt(base_prompt, candidate, max_characters)
-    response = normalize_response(refiner.name, refiner.query_fn(prompt))
-    if response.code != 200 or not response.content:
-        return candidate
+    refined = build_candidate(
+        query_provider(refiner, prompt, cache, max_characters),
+        max_characters
+    )
+    return refined or candidate
 
-    content = response.content[:max_characters] if max_characters else response.content
-    valid, _ = validate_message(content, max_characters)
-    if not valid:
-        return candidate
 
-    return CandidateMessage(
-        provider=response.provider,
-        model=response.model,
-        content=content,
-        usage=response.usage,
-        elapsed=response.elapsed,
-    )
+def run_summarizer(summarizer, prompts, timeout=None, cache=None,
+                   max_workers=4, max_characters=160):
+    """Map step for large changesets: one short summary per prompt.
+
+    Summaries are free text, not commit messages, so they skip
+    build_candidate; failed or missing answers come back as None.
+    """
+    if not summarizer or not prompts:
+        return [None for _ in prompts]
+
+    def summarize(prompt):
+        response = query_provider(summarizer, prompt, cache, max_characters)
+        if response.code != 200 or not response.content:
+            return None
+        lines = [line.strip() for line in response.content.splitlines() if line.strip()]
+        return lines[0][:max_characters] if lines else None
+
+    summaries = [None for _ in prompts]
+    tasks = [
+        (position, partial(summarize, prompt))
+        for position, prompt in enumerate(prompts)
+    ]
+    for position, summary, error in iter_completed(tasks, timeout, max_workers):
+        if error is None:
+            summaries[position] = summary
+    return summaries
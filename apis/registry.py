@@ -1,11 +1,21 @@
+import importlib
 import os
 
 from apis.types import ProviderInfo
-from apis.OpenRouter.query_model import query_model as query_openrouter
-from apis.OpenAI.query_model import query_model as query_openai
-from apis.Ollama.query_model import query_model as query_ollama
-from apis.Codex.query_model import query_model as query_codex
-from apis.Claude.query_model import query_model as query_claude
+
+# Provider modules pull in requests and the OpenAI SDK, so each one is
+# imported only when its provider is enabled and has credentials.
+PROVIDER_MODULES = {
+    "OpenRouter": "apis.OpenRouter.query_model",
+    "OpenAI": "apis.OpenAI.query_model",
+    "Codex": "apis.Codex.query_model",
+    "Claude": "apis.Claude.query_model",
+    "Ollama": "apis.Ollama.query_model",
+}
+
+
+def load_provider_module(name):
+    return importlib.import_module(PROVIDER_MODULES[name])
 
 
 def _provider_enabled(config, provider_key, default=True):
@@ -33,18 +43,21 @@ def discover_available_providers(config):
         _provider_enabled(config, "openrouter") and
         os.getenv("OPENROUTER_API_KEY", "").strip()
     ):
+        module = load_provider_module("OpenRouter")
         providers.append(ProviderInfo(
             name="OpenRouter",
             available=True,
             roles=_provider_roles(config, "openrouter", ["generate"]),
             priority=_provider_priority(config, "openrouter", 40),
-            query_fn=query_openrouter,
+            query_fn=module.query_model,
+            models=[module.OPENROUTER_MODEL],
         ))
 
     if (
         _provider_enabled(config, "openai") and
         os.getenv("OPENAI_API_KEY", "").strip()
     ):
+        module = load_provider_module("OpenAI")
         providers.append(ProviderInfo(
             name="OpenAI",
             available=True,
@@ -52,13 +65,15 @@ def discover_available_providers(config):
                 config, "openai", ["generate", "judge", "refine"]
             ),
             priority=_provider_priority(config, "openai", 70),
-            query_fn=query_openai,
+            query_fn=module.query_model,
+            models=[module.resolve_model()],
         ))
 
     if (
         _provider_enabled(config, "codex") and
         os.getenv("CODEX_API_KEY", "").strip()
     ):
+        module = load_provider_module("Codex")
         providers.append(ProviderInfo(
             name="Codex",
             available=True,
@@ -66,13 +81,15 @@ def discover_available_providers(config):
                 config, "codex", ["generate", "judge", "refine"]
             ),
             priority=_provider_priority(config, "codex", 100),
-            query_fn=query_codex,
+            query_fn=module.query_model,
+            models=[module.CODEX_MODEL],
         ))
 
     if (
         _provider_enabled(config, "claude") and
         os.getenv("ANTHROPIC_API_KEY", "").strip()
     ):
+        module = load_provider_module("Claude")
         providers.append(ProviderInfo(
             name="Claude",
             available=True,
@@ -80,19 +97,22 @@ def discover_available_providers(config):
                 config, "claude", ["generate", "judge", "refine"]
             ),
             priority=_provider_priority(config, "claude", 95),
-            query_fn=query_claude,
+            query_fn=module.query_model,
+            models=[module.CLAUDE_MODEL],
         ))
 
-    if (
-        _provider_enabled(config, "ollama") and
-        os.getenv("OLLAMA_MODEL", config.get("ollama_model", "")).strip()
-    ):
+    ollama_model = os.getenv(
+        "OLLAMA_MODEL", config.get("ollama_model", "")
+    ).strip()
+    if _provider_enabled(config, "ollama") and ollama_model:
+        module = load_provider_module("Ollama")
         providers.append(ProviderInfo(
             name="Ollama",
             available=True,
             roles=_provider_roles(config, "ollama", ["generate"]),
             priority=_provider_priority(config, "ollama", 30),
-            query_fn=query_ollama,
+            query_fn=module.query_model,
+            models=[ollama_model],
         ))
 
     return providers
@@ -0,0 +1,62 @@
+import threading
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+
+_settings = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "timeout": DEFAULT_TIMEOUT,
+}
+_session = None
+_openai_clients = {}
+_lock = threading.Lock()
+
+
+def configure_transport(config):
+    global _session
+
+    transport_cfg = config.get("transport") or {}
+    with _lock:
+        _settings["pool_size"] = transport_cfg.get("pool_size", DEFAULT_POOL_SIZE)
+        _settings["timeout"] = transport_cfg.get("timeout", DEFAULT_TIMEOUT)
+        # Drop pooled connections built with the previous settings.
+        if _session is not None:
+            _session.close()
+        _session = None
+        _openai_clients.clear()
+
+
+def get_timeout():
+    return _settings["timeout"]
+
+
+def get_session():
+    global _session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        if _session is None:
+            pool_size = _settings["pool_size"]
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_openai_client(api_key):
+    from openai import OpenAI
+
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key, timeout=_settings["timeout"])
+            _openai_clients[api_key] = client
+        return client
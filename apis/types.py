@@ -19,7 +19,7 @@ class ProviderInfo:
     available: bool
     roles: List[str]
     priority: int
-    query_fn: Callable[[str], tuple]
+    query_fn: Callable[..., tuple]
     models: List[str] = field(default_factory=list)
     reason_unavailable: Optional[str] = None
 
@@ -38,3 +38,6 @@ class ExecutionPlan:
     generators: List[ProviderInfo]
     judge: Optional[ProviderInfo]
     refiner: Optional[ProviderInfo]
+    strategy: str = "auto"
+    required_candidates: Optional[int] = None
+    summarizer: Optional[ProviderInfo] = None
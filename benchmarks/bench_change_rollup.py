@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare the pre-aggregated change roll-up with the raw file list prompt.
+
+Usage: python benchmarks/bench_change_rollup.py [file_count]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from changeset import build_change_rollup, format_change_rollup  # noqa: E402
+
+
+def legacy_changes_text(changes):
+    summary = []
+    for key, files in changes.items():
+        if files:
+            quoted = [f'"{os.path.basename(file)}"' for file in files]
+            filenames = quoted[0] if len(quoted) == 1 else \
+                ", ".join(quoted[:-1]) + " and " + quoted[-1]
+            summary.append(f"{key}: {filenames}")
+    return "; ".join(summary)
+
+
+def build_changes(count):
+    """Image imports mirrored under two roots, vendored code and a few edits."""
+    mirrored_images = count // 5
+    edits = count // 50
+    vendored = count - mirrored_images * 2 - edits * 2
+    changes = {"Add": [], "Change": [], "Delete": []}
+    for index in range(mirrored_images):
+        album = f"album{index // 500:02d}"
+        changes["Add"].append(f"Sources/{album}/{index % 500:04d}.png")
+        changes["Add"].append(f"Outputs/{album}/{index % 500:04d}.png")
+    for index in range(vendored):
+        changes["Add"].append(f"vendor/pkg{index // 40}/module_{index % 40}.js")
+    for index in range(edits):
+        changes["Change"].append(f"src/feature{index % 30}/handler{index}.py")
+        changes["Delete"].append(f"legacy/report_{index}.txt")
+    return changes
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 50_000
+    changes = build_changes(count)
+
+    start = time.perf_counter()
+    legacy = legacy_changes_text(changes)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rollup = build_change_rollup(changes)
+    compact = format_change_rollup(rollup)
+    rollup_elapsed = time.perf_counter() - start
+
+    for label, text, elapsed in (
+        ("raw file list", legacy, legacy_elapsed),
+        ("roll-up", compact, rollup_elapsed),
+    ):
+        print(f"{label:<14} {elapsed * 1000:8.1f}ms  {len(text):>10,d} chars  "
+              f"~{len(text) // 4:>9,d} tokens")
+
+    print(f"files          {sum(map(len, changes.values())):>10,d}  "
+          f"(mirrored duplicates: {rollup.duplicates:,d})")
+    print(f"prompt shrink  {len(legacy) / max(len(compact), 1):8.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Track cold-start import time of the gcm CLI modules with ``-X importtime``.
+
+Usage: python benchmarks/bench_import_time.py [--runs N] [--max-ms MS] [module ...]
+
+Exits with status 1 when a module's median import time exceeds --max-ms or
+when a module pulls in one of the heavy dependencies that should only load
+on first use.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ("gcm", "report_history")
+LAZY_MODULES = ("openai", "rich", "requests")
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_import(module, python=sys.executable):
+    """Return (cumulative microseconds, imported top-level module names)."""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name.split(".")[0])
+        if name == module and len(match.group(3)) == 1:
+            cumulative = int(match.group(2))
+    return cumulative, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    failures = 0
+    for module in args.modules:
+        timings = []
+        imported = set()
+        for _ in range(args.runs):
+            cumulative, imported = measure_import(module)
+            timings.append(cumulative / 1000)
+        median = statistics.median(timings)
+        eager = sorted(imported.intersection(LAZY_MODULES))
+        print(f"{module:<16} median {median:8.1f}ms  min {min(timings):8.1f}ms  "
+              f"eager: {', '.join(eager) or 'none'}")
+        if eager or (args.max_ms is not None and median > args.max_ms):
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compare the streaming porcelain v2 -z parser with line slicing.
+
+Usage: python benchmarks/bench_status_parse.py [untracked_count]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gcm import classify_changes  # noqa: E402
+from utils import iter_nul_records, iter_status_v2_z  # noqa: E402
+
+
+def build_output(count):
+    records = ["# branch.oid 1234abcd", "# branch.head main"]
+    for index in range(count // 100):
+        records.append(f"1 .M N... 100644 100644 100644 aaa aaa src/module_{index}.py")
+        records.append(f"2 R. N... 100644 100644 100644 aaa aaa R100 lib/new_{index}.py")
+        records.append(f"lib/old_{index}.py")
+    for index in range(count):
+        records.append(f"? build/output {index // 1000}/artifact_{index}.o")
+    return ("\0".join(records) + "\0").encode("utf-8")
+
+
+def legacy_classify(lines):
+    changes = {"Add": [], "Change": [], "Delete": []}
+    for line in lines:
+        code = line[:2].strip()
+        file = line[2:].lstrip() if len(line) > 3 else line.strip()
+        if code in {"A", "??"}:
+            changes["Add"].append(file)
+        elif code == "M":
+            changes["Change"].append(file)
+        elif code == "D":
+            changes["Delete"].append(file)
+    return changes
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 300_000
+    output = build_output(count)
+    short_output = "\n".join(
+        f"?? build/output {index // 1000}/artifact_{index}.o" for index in range(count)
+    ).encode("utf-8")
+
+    start = time.perf_counter()
+    legacy = legacy_classify(short_output.decode("utf-8").splitlines())
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = io.TextIOWrapper(io.BytesIO(output), encoding="utf-8", newline="")
+    changes = classify_changes(iter_status_v2_z(iter_nul_records(stream)))
+    streamed_elapsed = time.perf_counter() - start
+
+    print(f"untracked      {count:>10,d}  ({len(output) / 1e6:.1f} MB of -z output)")
+    print(f"line slicing   {legacy_elapsed * 1000:8.1f}ms  "
+          f"{sum(map(len, legacy.values())):>10,d} entries (untracked only)")
+    print(f"porcelain v2   {streamed_elapsed * 1000:8.1f}ms  "
+          f"{sum(map(len, changes.values())):>10,d} entries (incl. renames)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
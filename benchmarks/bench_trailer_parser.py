@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare the single-pass trailer parser with the previous three-regex parsing.
+
+Usage: python benchmarks/bench_trailer_parser.py [message_count]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_history import normalize_os_name, parse_commit_trailer  # noqa: E402
+
+
+def legacy_parse_os(message):
+    if not message:
+        return None
+    match = re.search(r"🌐:\s*(WINDOWS|LINUX|MACOS|CYGWIN|GITBASH)\b", message)
+    if match:
+        return normalize_os_name(match.group(1))
+    header_match = re.search(r"\[💻[^\]\r\n]*([🪟🐧🍎])\]", message)
+    if header_match:
+        return {"🪟": "WINDOWS", "🐧": "LINUX", "🍎": "MACOS"}.get(header_match.group(1))
+    return None
+
+
+def legacy_parse_provider(message):
+    if not message:
+        return None
+    match = re.search(r"🤖:\s*(.+?)\s+🧠:", message)
+    return match.group(1).strip() if match else None
+
+
+def legacy_parse_elapsed(message):
+    if not message:
+        return None
+    match = re.search(r"⏱️:\s*([0-9]+(?:\.[0-9]+)?)\s+secs\b", message)
+    return float(match.group(1)) if match else None
+
+
+def build_messages(count):
+    providers = ["OpenAI", "Codex", "Claude", "Ollama", "OpenRouter"]
+    environments = ["LINUX", "WINDOWS", "MACOS"]
+    padding = " " * 16
+    messages = []
+    for index in range(count):
+        messages.append("\n".join([
+            f"[💻host{index % 7}🐧] 🔀: 📝: report_history.py",
+            f"{padding}ℹ️: feat: speed up report aggregation for run {index}",
+            f"{padding}ℹ️: Parse every gcm stamp field in one pass.",
+            f"{padding}🎯: Staged: 2 files changed, {index % 97} insertions(+)",
+            f"{padding}🆔: {index:011,d} | 🕒: 2026-10-18 12:00:00.000 | "
+            f"🌐: {environments[index % 3]} | "
+            f"🤖: {providers[index % 5]} 🧠: model-{index % 11} | "
+            f"⏱️: {index % 50 + 0.25:.2f} secs",
+        ]))
+    return messages
+
+
+def run_legacy(messages):
+    for message in messages:
+        legacy_parse_os(message)
+        legacy_parse_provider(message)
+        legacy_parse_elapsed(message)
+
+
+def run_single_pass(messages):
+    for message in messages:
+        parse_commit_trailer(message)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 1_000_000
+
+    messages = build_messages(count)
+    for message in messages[:1000]:
+        trailer = parse_commit_trailer(message)
+        assert (trailer.os, trailer.provider, trailer.elapsed) == (
+            legacy_parse_os(message),
+            legacy_parse_provider(message),
+            legacy_parse_elapsed(message),
+        )
+
+    timings = {}
+    for label, runner in (("three regexes", run_legacy), ("single pass", run_single_pass)):
+        start = time.perf_counter()
+        runner(messages)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<14} {timings[label]:8.2f}s  "
+              f"({count / timings[label]:,.0f} messages/s)")
+
+    print(f"speedup        {timings['three regexes'] / timings['single pass']:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
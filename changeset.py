@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Deterministic roll-ups of the changed files for the commit prompt.
+
+Instead of asking the model to normalize, group and count a raw file list,
+the changes are pre-aggregated in code:
+
+* paths are normalized (git's quoted/escaped form decoded, ``\\`` to ``/``);
+* files mirrored file by file under several roots (``Sources/x`` and
+  ``Outputs/x``) with the same change type count once, under the root
+  listed first;
+* files are grouped by directory and extension, with numbered sequences
+  collapsed to ranges (``001.png..079.png``);
+* totals are computed per change type and per top-level directory;
+* untracked files arrive already counted per directory (``Untracked``, an
+  ``utils.UntrackedSummary``) and are folded in as additions; wholly
+  untracked directories are listed apart, since their size is unknown.
+
+Past ``large_change_threshold`` files the largest groups can also be
+described in parallel by a cheap "summarize" provider (map), and only the
+compact group lines reach the generators (reduce).
+"""
+
+import re
+from collections import defaultdict
+from itertools import combinations
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+CHANGE_TYPES = ("Add", "Change", "Delete")
+CHANGE_VERBS = {"Add": "added", "Change": "modified", "Delete": "removed"}
+DEFAULT_LARGE_CHANGE_THRESHOLD = 200
+MAX_PROMPT_GROUPS = 12
+MAX_PROMPT_DIRECTORIES = 5
+MAX_GROUP_ITEMS = 8
+MIN_SEQUENCE_LENGTH = 3
+MIN_MIRROR_FILES = 5
+
+NUMBERED_STEM_PATTERN = re.compile(r"^(.*?)(\d+)$")
+
+
+def normalize_path(path):
+    """Decode git's quoted path form and use forward slashes."""
+    path = path.strip()
+    if path[:1] == '"' and path[-1:] == '"' and len(path) > 1:
+        path = (
+            path[1:-1]
+            .encode("latin-1", "backslashreplace")
+            .decode("unicode_escape")
+            .encode("latin-1")
+            .decode("utf-8", "replace")
+        )
+    if "\\" in path:
+        path = path.replace("\\", "/")
+    return path.rstrip("/")
+
+
+def _format_counts(counts):
+    return ", ".join(
+        f"{counts[change_type]} {CHANGE_VERBS[change_type]}"
+        for change_type in CHANGE_TYPES
+        if counts[change_type]
+    )
+
+
+def _empty_counts():
+    return dict.fromkeys(CHANGE_TYPES, 0)
+
+
+@dataclass
+class ChangeGroup:
+    directory: str
+    extension: str
+    counts: Dict[str, int] = field(default_factory=_empty_counts)
+    numbered: Dict[Tuple[str, int], List[int]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    names: List[str] = field(default_factory=list)
+    unnamed: int = 0
+    untracked: int = 0
+
+    @property
+    def key(self):
+        return f"{self.directory or '.'}/*{self.extension}"
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def add(self, change_type, basename):
+        self.counts[change_type] += 1
+        stem = basename[:len(basename) - len(self.extension)] if self.extension else basename
+        match = NUMBERED_STEM_PATTERN.match(stem)
+        if match:
+            prefix, digits = match.groups()
+            # Zero-padded names only continue runs of the same width.
+            width = len(digits) if digits[0] == "0" and len(digits) > 1 else 0
+            self.numbered[(prefix, width)].append(int(digits))
+        elif len(self.names) < MAX_GROUP_ITEMS:
+            self.names.append(basename)
+        else:
+            self.unnamed += 1
+
+    def add_untracked(self, count):
+        self.counts["Add"] += count
+        self.untracked += count
+
+    def items(self):
+        """Numbered runs as ranges, then the remaining names."""
+        ranges = []
+        names = list(self.names)
+        for (prefix, width), numbers in sorted(self.numbered.items()):
+            numbers = sorted(set(numbers))
+            start = 0
+            for index in range(1, len(numbers) + 1):
+                if index < len(numbers) and numbers[index] == numbers[index - 1] + 1:
+                    continue
+                run = numbers[start:index]
+                labels = [f"{prefix}{number:0{width}d}{self.extension}" for number in run]
+                if len(run) >= MIN_SEQUENCE_LENGTH:
+                    ranges.append(f"{labels[0]}..{labels[-1]}")
+                else:
+                    names.extend(labels)
+                start = index
+        items = ranges + names
+        hidden = max(len(items) - MAX_GROUP_ITEMS, 0) + self.unnamed
+        items = items[:MAX_GROUP_ITEMS]
+        if hidden:
+            items.append(f"+{hidden} more")
+        if self.untracked:
+            items.append(f"{self.untracked} untracked")
+        return items
+
+    def describe(self):
+        return f"{self.key}: {_format_counts(self.counts)} [{', '.join(self.items())}]"
+
+
+@dataclass
+class ChangeRollup:
+    totals: Dict[str, int] = field(default_factory=_empty_counts)
+    directories: Dict[str, Dict[str, int]] = field(
+        default_factory=lambda: defaultdict(_empty_counts)
+    )
+    groups: List[ChangeGroup] = field(default_factory=list)
+    duplicates: int = 0
+    untracked_trees: List[str] = field(default_factory=list)
+    untracked_truncated: bool = False
+
+    @property
+    def total(self):
+        return sum(self.totals.values())
+
+
+def find_mirror_roots(paths, min_shared=MIN_MIRROR_FILES):
+    """Map each top-level directory that mirrors another one to that root.
+
+    Two roots mirror each other when at least ``min_shared`` of their
+    files match path for path below the root, and the shared files are
+    most of both roots. The root seen first is kept.
+    """
+    order = {}
+    contents = defaultdict(set)
+    for path in paths:
+        root, _, rest = path.partition("/")
+        if rest:
+            order.setdefault(root, len(order))
+            contents[root].add(rest)
+
+    owners = defaultdict(list)
+    for root in order:
+        for rest in contents[root]:
+            owners[rest].append(root)
+    shared = defaultdict(int)
+    for roots in owners.values():
+        for pair in combinations(roots, 2):
+            shared[pair] += 1
+
+    mirrors = {}
+    for (kept, mirror), count in sorted(
+        shared.items(), key=lambda item: (order[item[0][0]], order[item[0][1]])
+    ):
+        if (
+            count >= min_shared
+            and count * 2 > len(contents[kept])
+            and count * 2 > len(contents[mirror])
+            and mirror not in mirrors
+        ):
+            mirrors[mirror] = mirrors.get(kept, kept)
+    return mirrors
+
+
+def build_change_rollup(changes):
+    """Normalize, dedupe, group and count the output of classify_changes.
+
+    Mirror roots are detected per change type, so a copy is only collapsed
+    when it was added, modified or removed alongside its original; an add
+    under one root and a delete under another are both counted.
+    """
+    rollup = ChangeRollup()
+    groups = {}
+    for change_type in CHANGE_TYPES:
+        paths = [normalize_path(path) for path in changes.get(change_type, [])]
+        mirrors = find_mirror_roots(paths)
+        known = set(paths)
+        for path in paths:
+            root, _, rest = path.partition("/")
+            if root in mirrors and f"{mirrors[root]}/{rest}" in known:
+                rollup.duplicates += 1
+                continue
+
+            directory, _, basename = path.rpartition("/")
+            stem, dot, extension = basename.rpartition(".")
+            # Same rule as os.path.splitext: a leading dot is not an extension.
+            extension = f".{extension.lower()}" if stem.strip(".") and dot else ""
+            group = groups.get((directory, extension))
+            if group is None:
+                group = groups[(directory, extension)] = ChangeGroup(directory, extension)
+            group.add(change_type, basename)
+            rollup.totals[change_type] += 1
+            rollup.directories[directory.partition("/")[0] or "."][change_type] += 1
+
+    untracked = changes.get("Untracked")
+    if untracked:
+        for directory, count in untracked.directories.items():
+            directory = normalize_path(directory)
+            group = groups.get((directory, ""))
+            if group is None:
+                group = groups[(directory, "")] = ChangeGroup(directory, "")
+            group.add_untracked(count)
+            rollup.totals["Add"] += count
+            rollup.directories[directory.partition("/")[0] or "."]["Add"] += count
+        rollup.untracked_trees = [normalize_path(tree) for tree in untracked.trees]
+        rollup.untracked_truncated = untracked.truncated
+
+    rollup.groups = sorted(groups.values(), key=lambda group: (-group.total, group.key))
+    return rollup
+
+
+def count_changes(changes):
+    untracked = changes.get("Untracked")
+    return sum(
+        len(changes.get(change_type, [])) for change_type in CHANGE_TYPES
+    ) + (untracked.total if untracked else 0)
+
+
+def is_large_changeset(changes, threshold=DEFAULT_LARGE_CHANGE_THRESHOLD):
+    return bool(threshold) and count_changes(changes) > threshold
+
+
+def build_group_prompt(group):
+    return "\n".join([
+        "Describe this group of changed files in one short phrase "
+        "(at most 12 words) for a commit message.",
+        "Do not list file names or paths; say what kind of content it is.",
+        "",
+        f"Group: {group.describe()}",
+    ])
+
+
+def format_change_rollup(rollup, summaries=None, max_groups=MAX_PROMPT_GROUPS):
+    """Totals, per-directory roll-ups and one line per group, largest first."""
+    summaries = summaries or {}
+    totals = f"Totals: {_format_counts(rollup.totals)}"
+    if rollup.duplicates:
+        totals = f"{totals} ({rollup.duplicates} mirrored across roots counted once)"
+    if rollup.untracked_truncated:
+        totals = f"{totals} (more untracked files not counted)"
+    lines = [totals]
+
+    directories = sorted(
+        rollup.directories.items(), key=lambda item: (-sum(item[1].values()), item[0])
+    )
+    if len(directories) > 1:
+        shown = [
+            f"{directory} ({_format_counts(counts)})"
+            for directory, counts in directories[:MAX_PROMPT_DIRECTORIES]
+        ]
+        if len(directories) > MAX_PROMPT_DIRECTORIES:
+            shown.append(f"+{len(directories) - MAX_PROMPT_DIRECTORIES} more")
+        lines.append(f"By directory: {', '.join(shown)}")
+
+    for group in rollup.groups[:max_groups]:
+        summary = summaries.get(group.key)
+        line = group.describe()
+        lines.append(f"{line} ({summary})" if summary else line)
+
+    others = rollup.groups[max_groups:]
+    if others:
+        counts = _empty_counts()
+        for group in others:
+            for change_type in CHANGE_TYPES:
+                counts[change_type] += group.counts[change_type]
+        lines.append(f"others ({len(others)} groups): {_format_counts(counts)}")
+
+    trees = rollup.untracked_trees
+    if trees:
+        shown = sorted(f"{tree}/" for tree in trees)[:MAX_GROUP_ITEMS]
+        if len(trees) > MAX_GROUP_ITEMS:
+            shown.append(f"+{len(trees) - MAX_GROUP_ITEMS} more")
+        lines.append(
+            f"untracked directories, contents not counted ({len(trees)}): "
+            f"[{', '.join(shown)}]"
+        )
+    return "; ".join(lines)
+
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Bounded diff context for the commit message prompt.
+
+``git diff -U0`` is streamed line by line; for every file only the added
+and removed line counts and a handful of changed signatures (functions,
+classes, hunk headers) are kept, and the result is packed into a token
+budget estimated at ``len(text) / 4``. Large diffs are never buffered in
+memory: git is stopped as soon as the file list alone outgrows the budget.
+"""
+
+import re
+import subprocess
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import List
+
+from utils import git_command
+
+DEFAULT_TOKEN_BUDGET = 600
+CHARS_PER_TOKEN = 4
+MAX_SIGNATURES_PER_FILE = 8
+MAX_SIGNATURE_CHARS = 120
+
+SIGNATURE_PATTERN = re.compile(
+    r"\s*(?:(?:export|public|private|protected|internal|static|async|pub|"
+    r"abstract|final|default)\s+)*"
+    r"(?:def|class|function|func|fn|interface|struct|enum|trait|impl|"
+    r"module|type|record|namespace)\s+[\w$.<>]+"
+)
+HUNK_HEADER_PATTERN = re.compile(r"^@@ [^@]* @@ ?(.*)$")
+
+
+@dataclass
+class FileDiffContext:
+    path: str
+    added: int = 0
+    removed: int = 0
+    binary: bool = False
+    signatures: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self):
+        return self.added + self.removed
+
+    def header(self):
+        if self.binary:
+            return f"{self.path} (binary)"
+        return f"{self.path} (+{self.added} -{self.removed})"
+
+    def add_signature(self, marker, text):
+        if len(self.signatures) >= MAX_SIGNATURES_PER_FILE:
+            return
+        signature = f"{marker} {text.strip()[:MAX_SIGNATURE_CHARS]}"
+        if signature not in self.signatures:
+            self.signatures.append(signature)
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _strip_diff_path(value):
+    value = value.strip()
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+    if value[:2] in ("a/", "b/"):
+        value = value[2:]
+    return value
+
+
+def collect_diff_context(lines, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Fold ``git diff -U0`` output into per-file counts and signatures.
+
+    Returns ``(files, complete)``; ``complete`` is False when reading stopped
+    early because the file headers alone no longer fit the budget.
+    """
+    files = []
+    current = None
+    in_hunk = False
+    header_chars = 0
+    max_header_chars = token_budget * CHARS_PER_TOKEN
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("diff --git "):
+            if header_chars > max_header_chars:
+                return files, False
+            _, _, new_path = line.partition(" b/")
+            current = FileDiffContext(_strip_diff_path(new_path or line[11:]))
+            files.append(current)
+            header_chars += len(current.header()) + 1
+            in_hunk = False
+        elif current is None:
+            continue
+        elif line.startswith("@@"):
+            in_hunk = True
+            match = HUNK_HEADER_PATTERN.match(line)
+            # git's hunk header names the enclosing function or class.
+            if match and SIGNATURE_PATTERN.match(match.group(1)):
+                current.add_signature("~", match.group(1))
+        elif in_hunk and line.startswith("+"):
+            current.added += 1
+            if SIGNATURE_PATTERN.match(line, 1):
+                current.add_signature("+", line[1:])
+        elif in_hunk and line.startswith("-"):
+            current.removed += 1
+            if SIGNATURE_PATTERN.match(line, 1):
+                current.add_signature("-", line[1:])
+        elif not in_hunk:
+            if line.startswith("+++ ") and line[4:] != "/dev/null":
+                current.path = _strip_diff_path(line[4:])
+            elif line.startswith("Binary files "):
+                current.binary = True
+    return files, True
+
+
+def pack_diff_context(files, token_budget=DEFAULT_TOKEN_BUDGET, complete=True):
+    """Pick file headers, then signatures round-robin, until the budget is full.
+
+    Files with the most changed lines win; the output keeps diff order.
+    """
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    ranked = sorted(range(len(files)), key=lambda index: -files[index].changed)
+    # Keep room for the trailing "... more files" line.
+    budget_chars -= len(f"... {len(files)} more file(s) not shown")
+    used = 0
+    included = []
+    for index in ranked:
+        cost = len(files[index].header()) + 1
+        if used + cost > budget_chars:
+            break
+        included.append(index)
+        used += cost
+
+    picked = {index: [] for index in included}
+    progress = True
+    depth = 0
+    while progress:
+        progress = False
+        for index in included:
+            signatures = files[index].signatures
+            if depth >= len(signatures):
+                continue
+            cost = len(signatures[depth]) + 3
+            if used + cost <= budget_chars:
+                picked[index].append(signatures[depth])
+                used += cost
+                progress = True
+        depth += 1
+
+    lines = []
+    for index in sorted(included):
+        lines.append(files[index].header())
+        lines.extend(f"  {signature}" for signature in picked[index])
+    omitted = len(files) - len(included)
+    if not complete:
+        lines.append("... more files not shown")
+    elif omitted:
+        lines.append(f"... {omitted} more file(s) not shown")
+    return "\n".join(lines)
+
+
+def iter_git_diff_lines(cwd=None, cached=True):
+    args = ["diff", "--cached"] if cached else ["diff"]
+    process = subprocess.Popen(
+        git_command(*args, "-U0", "--no-color", "--no-ext-diff", cwd=cwd),
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    try:
+        yield from process.stdout
+    finally:
+        # Stop git when the consumer stops early on a huge diff.
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+
+
+def get_diff_context_config(config):
+    diff_cfg = config.get("diff_context") or {}
+    return (
+        diff_cfg.get("enabled", False),
+        diff_cfg.get("token_budget", DEFAULT_TOKEN_BUDGET),
+    )
+
+
+def build_diff_context(config, cwd=None, cached=True):
+    enabled, token_budget = get_diff_context_config(config)
+    if not enabled:
+        return ""
+    try:
+        with closing(iter_git_diff_lines(cwd, cached)) as lines:
+            files, complete = collect_diff_context(lines, token_budget)
+    except OSError:
+        return ""
+    if not files:
+        return ""
+    return pack_diff_context(files, token_budget, complete)
@@ -5,31 +5,33 @@
 import os
 import sys
 import json
+import importlib.util
 import re
 import yaml
 import shutil
 import socket
-import requests
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from utils import detect_environment, ENVIRONMENT_EMOJI, \
                   format_usage, get_commit_count, normalize_os_name, \
-                  run_git_command
+                  run_git_command, collect_repo_snapshot, \
+                  DEFAULT_UNTRACKED_POLICY
 from version import load_version_config, update_version_file
 from apis.registry import get_available_provider_pairs, discover_available_providers
 from apis.orchestrator import build_execution_plan, run_generators, \
-                              run_judge, run_refiner
-
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.text import Text
-    HAS_RICH = True
-except ImportError:
-    HAS_RICH = False
-    Console = None
-    Panel = None
-    Text = None
+                              run_judge, run_refiner, run_summarizer
+from apis.cache import build_response_cache
+from apis.transport import configure_transport, get_session
+from history_store import get_history_store
+from diff_context import build_diff_context
+from changeset import DEFAULT_LARGE_CHANGE_THRESHOLD, MAX_PROMPT_GROUPS, \
+                      build_change_rollup, build_group_prompt, \
+                      format_change_rollup, is_large_changeset
+
+# rich is imported on first render, not at startup.
+HAS_RICH = importlib.util.find_spec("rich") is not None
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -45,7 +47,6 @@ def load_config(path=None):
 
 
 config = load_config()
-version_config = load_version_config()
 
 USE_OLLAMA = os.getenv("USE_OLLAMA", "True")
 USE_OLLAMA = True if USE_OLLAMA == "True" else False
@@ -63,9 +64,32 @@ HISTORY_PATH = os.path.expanduser(
 HISTORY_JSON_PATH = os.path.expanduser(
     config.get("history_json_path", "~/.gcm_history.jsonl")
 )
+HISTORY_FORMAT = config.get("history_format", "jsonl")
+HISTORY_BINARY_PATH = os.path.expanduser(
+    config.get("history_binary_path", "~/.gcm_history.gch")
+)
+HISTORY_ENTRY_PATH = (
+    HISTORY_BINARY_PATH if HISTORY_FORMAT == "binary" else HISTORY_JSON_PATH
+)
 INCLUDE_LOCATION = config.get("include_location", False)
 MAX_CHARACTERS = config.get("max_characters", 160)
 SUGGESTED_MESSAGES = config.get("suggested_messages", 1)
+PARALLEL_GENERATORS = config.get("parallel_generators", False)
+GENERATOR_TIMEOUT = config.get("generator_timeout", None)
+STREAM_OUTPUT = config.get("stream_output", False)
+BATCH_CONCURRENCY = config.get("batch_concurrency", 4)
+BATCH_MESSAGE_FILE = "GCM_PROPOSED_MSG"
+LARGE_CHANGE_THRESHOLD = config.get(
+    "large_change_threshold", DEFAULT_LARGE_CHANGE_THRESHOLD
+)
+STATUS_CONFIG = config.get("status") or {}
+UNTRACKED_FILES = STATUS_CONFIG.get("untracked_files", DEFAULT_UNTRACKED_POLICY)
+if UNTRACKED_FILES is False:
+    # YAML reads a bare `no` as false.
+    UNTRACKED_FILES = "no"
+UNTRACKED_LIMIT = STATUS_CONFIG.get("untracked_limit", 0)
+UNTRACKED_CACHE = STATUS_CONFIG.get("untracked_cache", False)
+FSMONITOR = STATUS_CONFIG.get("fsmonitor", False)
 
 EMOJIS = config.get("emojis", {
     "header": "🔀",
@@ -79,7 +103,15 @@ EMOJIS = config.get("emojis", {
 
 PROMPT_TEMPLATE = config.get("prompt_template", "")
 columns = shutil.get_terminal_size().columns
-RICH_CONSOLE = Console() if HAS_RICH else None
+_rich_console = None
+
+
+def get_rich_console():
+    global _rich_console
+    if _rich_console is None:
+        from rich.console import Console
+        _rich_console = Console()
+    return _rich_console
 
 
 def safe_print(message):
@@ -117,8 +149,12 @@ def render_commit_options(messages, recommended_index=None):
             safe_print("=" * columns)
         return
 
-    RICH_CONSOLE.print()
-    RICH_CONSOLE.print(
+    from rich.panel import Panel
+    from rich.text import Text
+
+    console = get_rich_console()
+    console.print()
+    console.print(
         Panel.fit("📝 Suggested Commit Messages", border_style="cyan")
     )
 
@@ -130,7 +166,7 @@ def render_commit_options(messages, recommended_index=None):
             body.append(format_usage(usage), style="dim")
         body.append("\n")
         body.append(f"⏱️ Elapsed: {elapsed:.2f} secs", style="dim")
-        RICH_CONSOLE.print(
+        console.print(
             Panel(
                 body,
                 title=build_commit_option_title(
@@ -141,66 +177,68 @@ def render_commit_options(messages, recommended_index=None):
         )
 
 
-def is_git_repo():
-    return os.path.isdir(".git")
-
+class GenerationStream:
+    def __init__(self, provider_names):
+        self._texts = {name: "" for name in provider_names}
+        self._lock = threading.Lock()
+        self._live = None
 
-def get_available_apis():
-    return get_available_provider_pairs(config)
+    def __enter__(self):
+        from rich.live import Live
 
+        self._live = Live(
+            self._render(),
+            console=get_rich_console(),
+            refresh_per_second=8,
+            transient=True,
+        )
+        self._live.start()
+        return self
 
-def get_machine_name():
-    return socket.gethostname()
+    def __exit__(self, exc_type, exc, tb):
+        self._live.stop()
+        return False
 
+    def on_delta(self, provider, text):
+        with self._lock:
+            self._texts[provider] = self._texts.get(provider, "") + text
+            self._live.update(self._render())
 
-def get_git_changes():
-    try:
-        result = run_git_command(
-            ["status", "--porcelain"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip().splitlines()
-    except subprocess.CalledProcessError as e:
-        safe_print(f"Error ejecutando git: {e}")
-        sys.exit(1)
+    def _render(self):
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.text import Text
 
+        return Group(*[
+            Panel(
+                Text(text or "…"),
+                title=f"✍️ Streaming · 🤖 {provider}",
+                border_style="blue",
+            )
+            for provider, text in self._texts.items()
+        ])
 
-def get_git_diff_summary():
-    summaries = []
-    commands = [
-        ("Staged", ["git", "diff", "--cached", "--shortstat"]),
-        ("Unstaged", ["git", "diff", "--shortstat"]),
-    ]
 
-    for label, command in commands:
-        try:
-            result = subprocess.run(
-                ["git", "-c", f"safe.directory={os.path.abspath(os.getcwd())}", *command[1:]],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            output = result.stdout.strip()
-            if output:
-                summaries.append(f"{label}: {output}")
-        except subprocess.CalledProcessError:
-            continue
+def is_git_repo():
+    return os.path.isdir(".git")
 
-    return "\n".join(summaries)
 
+def get_available_apis():
+    return get_available_provider_pairs(config)
 
-def format_file_list(file_list):
-    if not file_list:
-        return ""
 
-    quoted_files = [f'"{file}"' for file in file_list]
+def get_machine_name():
+    return socket.gethostname()
 
-    if len(quoted_files) == 1:
-        return quoted_files[0]
 
-    return ", ".join(quoted_files[:-1]) + " and " + quoted_files[-1]
+def get_repo_snapshot(cwd=None):
+    return collect_repo_snapshot(
+        cwd=cwd,
+        untracked_files=UNTRACKED_FILES,
+        untracked_limit=UNTRACKED_LIMIT,
+        untracked_cache=UNTRACKED_CACHE,
+        fsmonitor=FSMONITOR,
+    )
 
 
 def format_count_label(count, noun="file"):
@@ -216,40 +254,102 @@ def build_change_rollup_summary(changes):
         "Delete": EMOJIS.get("delete", "Delete"),
     }
 
+    untracked = changes.get("Untracked")
     for key in ("Add", "Change", "Delete"):
-        files = changes.get(key, [])
-        if files:
-            sections.append(f"{labels[key]}: {format_count_label(len(files))}")
+        count = len(changes.get(key, []))
+        trees = 0
+        if key == "Add" and untracked:
+            count += untracked.files
+            trees = len(untracked.trees)
+        label_parts = []
+        if count:
+            label = format_count_label(count)
+            if key == "Add" and untracked and untracked.truncated:
+                label = f"{label}+"
+            label_parts.append(label)
+        if trees:
+            # Their size is unknown: they are never added to the file count.
+            noun = "directory" if trees == 1 else "directories"
+            label_parts.append(f"{trees} untracked {noun}")
+        if label_parts:
+            sections.append(f"{labels[key]}: {', '.join(label_parts)}")
 
     return "; ".join(sections)
 
 
-def classify_changes(lines):
+def classify_status_code(code):
+    """Map a porcelain XY code to Add, Change or Delete.
+
+    Unmerged paths (any U, or the both-added/both-deleted AA and DD) are
+    changes; otherwise a deletion on either side wins, then additions and
+    copies; renames, type changes and modifications are changes.
+    """
+    if code == "??":
+        return "Add"
+    if "U" in code or code in ("AA", "DD"):
+        return "Change"
+    if "D" in code:
+        return "Delete"
+    if "A" in code or "C" in code:
+        return "Add"
+    return "Change"
+
+
+def classify_changes(entries, untracked=None):
+    """Group (XY, path) entries by change type.
+
+    Untracked files stay counted per directory under "Untracked" instead
+    of being listed under "Add".
+    """
     changes = {"Add": [], "Change": [], "Delete": []}
-    for line in lines:
-        code = line[:2].strip()
-        file = line[2:].lstrip() if len(line) > 3 else line.strip()
-
-        if code in {"A", "??"}:
-            changes["Add"].append(file)
-        elif code == "M":
-            changes["Change"].append(file)
-        elif code == "D":
-            changes["Delete"].append(file)
+    if untracked is not None and untracked.total:
+        changes["Untracked"] = untracked
+    classified = {}
+    for code, path in entries:
+        key = classified.get(code)
+        if key is None:
+            key = classified[code] = classify_status_code(code)
+        changes[key].append(path)
     return changes
 
 
-def build_prompt(changes, diff_summary="", note=""):
-    summary = []
-    for key, files in changes.items():
-        if files:
-            filenames = format_file_list([os.path.basename(f) for f in files])
-            summary.append(f"{key}: {filenames}")
+def summarize_changes(changes, summarizer=None, cache=None):
+    """Roll up the changes in code; for large changesets the summarizer
+    also describes the biggest groups."""
+    rollup = build_change_rollup(changes)
+    summaries = {}
+    if summarizer and is_large_changeset(changes, LARGE_CHANGE_THRESHOLD):
+        top_groups = rollup.groups[:MAX_PROMPT_GROUPS]
+        results = run_summarizer(
+            summarizer,
+            [build_group_prompt(group) for group in top_groups],
+            timeout=GENERATOR_TIMEOUT,
+            cache=cache,
+        )
+        summaries = {
+            group.key: summary
+            for group, summary in zip(top_groups, results)
+            if summary
+        }
+    return format_change_rollup(rollup, summaries)
+
+
+def build_prompt(changes, diff_summary="", note="", diff_context="",
+                 change_rollup=None):
+    if change_rollup is None:
+        change_rollup = summarize_changes(changes)
+
+    diff = diff_summary or "No diff available."
+    if diff_context:
+        diff = (
+            f"{diff}\n\nChanged files and signatures (context only; never "
+            f"quote or list these paths or names):\n{diff_context}"
+        )
 
     prompt_filled = PROMPT_TEMPLATE.format(
         note=note.strip(),
-        changes="; ".join(summary),
-        diff=diff_summary or "No diff available."
+        changes=change_rollup,
+        diff=diff
     )
     return prompt_filled
 
@@ -300,7 +400,7 @@ def apply_commit_line_replacements(line):
 
 def get_location():
     try:
-        r = requests.get("https://ipinfo.io/json", timeout=5)
+        r = get_session().get("https://ipinfo.io/json", timeout=5)
         data = r.json()
         city = data.get("city", "Unknown city")
         region = data.get("region", "")
@@ -317,9 +417,20 @@ def amend_commit_message():
     )
 
 
+def build_commit_stamp(commit_count=None, cwd=None):
+    if commit_count is None:
+        commit_count = get_commit_count(cwd)
+    return {
+        "number": f"{commit_count + 1:011,}",
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        "location": get_location() if INCLUDE_LOCATION else None,
+    }
+
+
 def build_commit_message(env, emoji, machine, summary,
                          suggestion, diff_summary,
-                         provider, model, elapsed):
+                         provider, model, elapsed, cwd=None,
+                         stamp=None):
     header = f"[💻{machine}{emoji}]"
     padding = " " * (len(header) + 3)
 
@@ -345,16 +456,17 @@ def build_commit_message(env, emoji, machine, summary,
                 line = apply_commit_line_replacements(line)
                 lines.append(f"{padding}{EMOJIS.get('summary')}: {line}")
 
-    commit_count = get_commit_count() + 1
-    commit_number_str = f"{commit_count:011,}"
-    timestamp_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    # Every candidate of one run shares the same stamp, so the commit
+    # count and location lookups happen once per invocation.
+    if stamp is None:
+        stamp = build_commit_stamp(cwd=cwd)
     commit_id_parts = [
-        f"🆔: {commit_number_str}",
-        f"🕒: {timestamp_str}",
+        f"🆔: {stamp['number']}",
+        f"🕒: {stamp['timestamp']}",
     ]
 
-    if INCLUDE_LOCATION:
-        commit_id_parts.append(f"📍: {get_location()}")
+    if stamp.get("location"):
+        commit_id_parts.append(f"📍: {stamp['location']}")
 
     commit_id_parts.extend([
         f"{ENVIRONMENT_EMOJI}: {env}",
@@ -376,8 +488,8 @@ def save_to_history(message, path):
         safe_print(f"⚠️ Could not save history: {e}")
 
 
-def get_project_metadata():
-    project_path = os.path.abspath(os.getcwd())
+def get_project_metadata(project_path=None):
+    project_path = os.path.abspath(project_path or os.getcwd())
     project_name = os.path.basename(project_path) or project_path
     return {
         "name": project_name,
@@ -387,19 +499,21 @@ def get_project_metadata():
 
 def create_history_entry(final_message, selected_index, displayed_messages,
                          candidates, selected_candidate, plan, prompt,
-                         diff_summary, user_note, outcome="committed"):
+                         diff_summary, user_note, outcome="committed",
+                         cache_stats=None, project_path=None):
     environment_name, _ = detect_environment(EMOJIS)
     history_os = normalize_os_name(environment_name)
     return {
         "timestamp": datetime.now().isoformat(timespec="milliseconds"),
         "outcome": outcome,
         "os": history_os,
-        "project": get_project_metadata(),
+        "project": get_project_metadata(project_path),
         "selected_index": selected_index,
         "user_note": user_note,
         "prompt_length": len(prompt or ""),
         "diff_summary": diff_summary,
         "final_message": final_message,
+        "cache": cache_stats,
         "selected_candidate": {
             "provider": getattr(selected_candidate, "provider", None),
             "model": getattr(selected_candidate, "model", None),
@@ -410,6 +524,7 @@ def create_history_entry(final_message, selected_index, displayed_messages,
             "generators": [provider.name for provider in plan.generators],
             "judge": plan.judge.name if plan.judge else None,
             "refiner": plan.refiner.name if plan.refiner else None,
+            "strategy": plan.strategy,
         },
         "displayed_messages": [
             {
@@ -436,23 +551,17 @@ def create_history_entry(final_message, selected_index, displayed_messages,
     }
 
 
-def save_history_entry(entry, path):
+def save_history_entry(entry, path, history_format="jsonl"):
     try:
+        if history_format == "binary":
+            get_history_store(path).append(entry)
+            return
         with open(os.path.expanduser(path), "a", encoding="utf-8") as f:
             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
     except Exception as e:
         safe_print(f"⚠️ Could not save structured history: {e}")
 
 
-def has_staged_changes():
-    result = run_git_command(
-        ["diff", "--cached", "--name-only"],
-        capture_output=True,
-        text=True
-    )
-    return bool(result.stdout.strip())
-
-
 def confirm_stage_all_changes():
     if not USE_CONFIRM:
         safe_print("❌ No changes staged. Stage files explicitly before committing.")
@@ -473,15 +582,186 @@ def confirm_stage_all_changes():
             sys.exit(0)
 
 
+def write_proposed_message(message, cwd):
+    result = run_git_command(
+        ["rev-parse", "--git-path", BATCH_MESSAGE_FILE],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    message_path = os.path.join(cwd, result.stdout.strip())
+    with open(message_path, "w", encoding="utf-8") as f:
+        f.write(message + "\n")
+    return message_path
+
+
+def run_batch_repo(repo_path, providers, user_note, env, emoji,
+                   machine_name, response_cache):
+    if not os.path.exists(os.path.join(repo_path, ".git")):
+        return repo_path, "skipped", "not a git repository"
+
+    # Entries are shared across the batch; hit/miss counts are per repo.
+    if response_cache is not None:
+        response_cache = response_cache.scoped()
+
+    try:
+        snapshot = get_repo_snapshot(cwd=repo_path)
+    except (OSError, subprocess.CalledProcessError):
+        return repo_path, "failed", "git status failed"
+    changes = classify_changes(snapshot.status_entries, snapshot.untracked)
+    if not any(changes.values()):
+        return repo_path, "clean", None
+
+    diff_summary = snapshot.diff_summary
+    diff_context = build_diff_context(
+        config, cwd=repo_path, cached=snapshot.has_staged_changes
+    )
+    plan = build_execution_plan(providers, config)
+    change_rollup = summarize_changes(changes, plan.summarizer, response_cache)
+    prompt = build_prompt(
+        changes, diff_summary, user_note, diff_context, change_rollup
+    )
+    candidates = run_generators(
+        plan.generators,
+        prompt,
+        MAX_CHARACTERS,
+        parallel=PARALLEL_GENERATORS,
+        timeout=GENERATOR_TIMEOUT,
+        required=plan.required_candidates,
+        cache=response_cache,
+    )
+    if not candidates:
+        return repo_path, "failed", "no valid suggestions"
+
+    selected_candidate = run_judge(
+        plan.judge, prompt, candidates, MAX_CHARACTERS, cache=response_cache
+    )
+    selected_candidate = run_refiner(
+        plan.refiner, prompt, selected_candidate, MAX_CHARACTERS,
+        cache=response_cache
+    )
+    message = build_commit_message(
+        env, emoji, machine_name, build_change_rollup_summary(changes),
+        selected_candidate.content, diff_summary,
+        selected_candidate.provider, selected_candidate.model,
+        selected_candidate.elapsed, cwd=repo_path,
+        stamp=build_commit_stamp(snapshot.commit_count)
+    )
+    displayed = [(
+        selected_candidate.provider,
+        selected_candidate.model,
+        message,
+        selected_candidate.usage,
+        selected_candidate.elapsed,
+    )]
+
+    # Batch never stages on its own: without confirmation it commits what
+    # is already staged, otherwise it leaves a proposal for the user.
+    if USE_CONFIRM or not snapshot.has_staged_changes:
+        detail = write_proposed_message(message, repo_path)
+        outcome = "proposed"
+    else:
+        try:
+            run_git_command(["commit", "-m", message], cwd=repo_path, check=True)
+        except subprocess.CalledProcessError as e:
+            return repo_path, "failed", f"git commit failed: {e}"
+        outcome = "committed"
+        detail = None
+
+    if SAVE_HISTORY and outcome == "committed":
+        save_to_history(message, HISTORY_PATH)
+        save_history_entry(create_history_entry(
+            final_message=message,
+            selected_index=1,
+            displayed_messages=displayed,
+            candidates=candidates,
+            selected_candidate=selected_candidate,
+            plan=plan,
+            prompt=prompt,
+            diff_summary=diff_summary,
+            user_note=user_note,
+            outcome=outcome,
+            cache_stats=response_cache.stats() if response_cache else None,
+            project_path=repo_path,
+        ), HISTORY_ENTRY_PATH, HISTORY_FORMAT)
+
+    return repo_path, outcome, detail
+
+
+def run_batch(user_note):
+    from report_history import load_registered_repos
+
+    repos = load_registered_repos()
+    if not repos:
+        safe_print("ℹ️ No registered repositories in ~/.gcm/repos.txt.")
+        return 0
+
+    providers = discover_available_providers(config)
+    if not providers:
+        safe_print(
+            "❌ No AI providers configured. Set OpenAI, OpenRouter, "
+            "Ollama, Codex, or Claude credentials first."
+        )
+        return 1
+
+    env, emoji = detect_environment()
+    machine_name = get_machine_name()
+    response_cache = build_response_cache(config)
+    safe_print(f"📦 Batch mode: {len(repos)} repositories")
+
+    def process_repo(repo_path):
+        # One repository failing must not abort the rest of the batch.
+        try:
+            return run_batch_repo(
+                repo_path, providers, user_note, env, emoji,
+                machine_name, response_cache
+            )
+        except Exception as e:
+            return repo_path, "failed", f"{type(e).__name__}: {e}"
+
+    with ThreadPoolExecutor(max_workers=max(1, BATCH_CONCURRENCY)) as executor:
+        results = list(executor.map(process_repo, repos))
+
+    status_emojis = {
+        "committed": "✅",
+        "proposed": "📝",
+        "clean": "ℹ️",
+        "skipped": "⚠️",
+        "failed": "❌",
+    }
+    failures = 0
+    for repo_path, outcome, detail in results:
+        line = f"{status_emojis.get(outcome, '•')} {outcome:<9} {repo_path}"
+        if detail:
+            line = f"{line} ({detail})"
+        safe_print(line)
+        if outcome == "failed":
+            failures += 1
+
+    return 1 if failures else 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        configure_transport(config)
+        sys.exit(run_batch(sys.argv[2] if len(sys.argv) > 2 else "None"))
+
     if not is_git_repo():
         safe_print("❌ This directory is not a valid Git repository (missing .git).")
         sys.exit(1)
 
+    configure_transport(config)
     env, emoji = detect_environment()
     machine_name = get_machine_name()
 
-    changes = classify_changes(get_git_changes())
+    try:
+        snapshot = get_repo_snapshot()
+    except subprocess.CalledProcessError as e:
+        safe_print(f"Error ejecutando git: {e}")
+        sys.exit(1)
+
+    changes = classify_changes(snapshot.status_entries, snapshot.untracked)
     if not any(changes.values()):
         safe_print("ℹ️ No changes detected. Nothing to do.")
         sys.exit(0)
@@ -494,28 +774,72 @@ if __name__ == "__main__":
         )
         sys.exit(0)
 
-    version = update_version_file(version_config)
+    version = update_version_file(
+        load_version_config(), commit_count=snapshot.commit_count
+    )
     if version:
         safe_print(f"🔖 Version: {version}")
 
-    diff_summary = get_git_diff_summary()
+    diff_summary = snapshot.diff_summary
     summary = build_change_rollup_summary(changes)
 
     user_note = sys.argv[1] if len(sys.argv) > 1 else "None"
 
-    prompt = build_prompt(changes, diff_summary, user_note)
+    diff_context = build_diff_context(
+        config, cached=snapshot.has_staged_changes
+    )
     providers = discover_available_providers(config)
     plan = build_execution_plan(providers, config)
 
     if plan.generators:
         generator_names = ", ".join(provider.name for provider in plan.generators)
-        safe_print(f"🤖 Generators selected: {generator_names}")
+        if plan.strategy == "race":
+            safe_print(
+                f"🏁 Racing generators for {plan.required_candidates} "
+                f"option(s): {generator_names}"
+            )
+        else:
+            safe_print(f"🤖 Generators selected: {generator_names}")
     if plan.judge:
         safe_print(f"⚖️ Using {plan.judge.name} as judge.")
     if plan.refiner:
         safe_print(f"✨ Using {plan.refiner.name} as refiner.")
 
-    candidates = run_generators(plan.generators, prompt, MAX_CHARACTERS)
+    response_cache = build_response_cache(config)
+    if is_large_changeset(changes, LARGE_CHANGE_THRESHOLD):
+        summarizer_name = plan.summarizer.name if plan.summarizer else "code only"
+        safe_print(
+            f"🗂️ Large changeset: grouping by directory and extension "
+            f"({summarizer_name})."
+        )
+    change_rollup = summarize_changes(changes, plan.summarizer, response_cache)
+    prompt = build_prompt(
+        changes, diff_summary, user_note, diff_context, change_rollup
+    )
+    generator_options = {
+        "parallel": PARALLEL_GENERATORS,
+        "timeout": GENERATOR_TIMEOUT,
+        "required": plan.required_candidates,
+        "cache": response_cache,
+    }
+    if STREAM_OUTPUT and HAS_RICH:
+        with GenerationStream(
+            provider.name for provider in plan.generators
+        ) as stream:
+            candidates = run_generators(
+                plan.generators,
+                prompt,
+                MAX_CHARACTERS,
+                on_delta=stream.on_delta,
+                **generator_options,
+            )
+    else:
+        candidates = run_generators(
+            plan.generators,
+            prompt,
+            MAX_CHARACTERS,
+            **generator_options,
+        )
 
     if len(candidates) == 0:
         safe_print("\n⚠️ There are no suggested confirmation messages!\n")
@@ -525,17 +849,21 @@ if __name__ == "__main__":
         plan.judge,
         prompt,
         candidates,
-        MAX_CHARACTERS
+        MAX_CHARACTERS,
+        cache=response_cache,
     )
     selected_candidate = run_refiner(
         plan.refiner,
         prompt,
         selected_candidate,
-        MAX_CHARACTERS
+        MAX_CHARACTERS,
+        cache=response_cache,
     )
+    cache_stats = response_cache.stats() if response_cache else None
 
     messages = []
     seen = set()
+    commit_stamp = build_commit_stamp(snapshot.commit_count)
 
     ordered_candidates = list(candidates)
     if selected_candidate:
@@ -558,7 +886,8 @@ if __name__ == "__main__":
         message = build_commit_message(
             env, emoji, machine_name, summary,
             candidate.content, diff_summary,
-            candidate.provider, candidate.model, candidate.elapsed
+            candidate.provider, candidate.model, candidate.elapsed,
+            stamp=commit_stamp
         )
         messages.append((
             candidate.provider,
@@ -578,7 +907,8 @@ if __name__ == "__main__":
             env, emoji, machine_name, summary,
             selected_candidate.content, diff_summary,
             selected_candidate.provider, selected_candidate.model,
-            selected_candidate.elapsed
+            selected_candidate.elapsed,
+            stamp=commit_stamp
         )
         for idx, (_, _, msg, _, _) in enumerate(messages, 1):
             if msg == selected_message:
@@ -618,15 +948,18 @@ if __name__ == "__main__":
                         diff_summary=diff_summary,
                         user_note=user_note,
                         outcome="canceled",
+                        cache_stats=cache_stats,
+                    )
+                    save_history_entry(
+                        history_entry, HISTORY_ENTRY_PATH, HISTORY_FORMAT
                     )
-                    save_history_entry(history_entry, HISTORY_JSON_PATH)
                 safe_print("🚫 Commit canceled by user.")
                 sys.exit(0)
     else:
         selected_index = 1
         message = messages[0][2]
 
-    if not has_staged_changes():
+    if not snapshot.has_staged_changes:
         confirm_stage_all_changes()
 
     try:
@@ -646,8 +979,11 @@ if __name__ == "__main__":
                 diff_summary=diff_summary,
                 user_note=user_note,
                 outcome="committed",
+                cache_stats=cache_stats,
+            )
+            save_history_entry(
+                history_entry, HISTORY_ENTRY_PATH, HISTORY_FORMAT
             )
-            save_history_entry(history_entry, HISTORY_JSON_PATH)
 
     except subprocess.CalledProcessError as e:
         safe_print(f"❌ Error executing git commit: {e}")
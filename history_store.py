@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""Compact binary backend for the structured gcm history.
+
+A history named ``history.gch`` is made of three append-only files:
+
+* ``history.gch``          fixed-layout records with the numeric fields
+                           (timestamps, indexes, elapsed times, token counts)
+                           packed with ``struct``; providers, models, projects
+                           and other repeated labels are ids into the string
+                           table.
+* ``history.gch.strings``  string table, one length-prefixed UTF-8 string per id.
+* ``history.gch.text``     large text (messages, candidate contents, diff
+                           summaries); records hold ``(offset, length)`` refs.
+
+Reports only decode the small records and the final message, so they no
+longer parse every candidate's text just to count provider selections.
+"""
+
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b"GCMH1\n"
+NONE_ID = 0xFFFFFFFF
+NONE_LENGTH = 0xFFFFFFFF
+
+OUTCOMES = ("committed", "canceled")
+
+# timestamp, outcome, flags, os, project name, project path, selected index,
+# prompt length, judge, refiner, strategy, selected provider, selected model,
+# selected elapsed, selected content, final message, diff summary, user note,
+# cache hits, cache misses, generator/displayed/candidate counts.
+HEADER = struct.Struct("<dBBIIIiiIIIIId" + "QI" * 4 + "ii" + "HHH")
+DISPLAYED = struct.Struct("<hIIdiiiQI")
+CANDIDATE = struct.Struct("<IIdiiiQI")
+TIMESTAMP = struct.Struct("<d")
+STRING_ID = struct.Struct("<I")
+LENGTH = struct.Struct("<I")
+
+FLAG_SELECTED = 1
+FLAG_CACHE = 2
+
+_lock = threading.Lock()
+_stores = {}
+
+
+@contextmanager
+def _locked_file(f):
+    """Exclusive OS lock on ``f``, held across processes (gcm in two
+    terminals, or gcm next to ``gcm --batch``)."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _to_float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+def _from_float(value):
+    return None if math.isnan(value) else value
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return -1
+
+
+def _from_int(value):
+    return None if value < 0 else value
+
+
+def _parse_timestamp(value):
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _format_timestamp(value):
+    if math.isnan(value):
+        return None
+    return datetime.fromtimestamp(value).isoformat(timespec="milliseconds")
+
+
+def _usage_tokens(usage):
+    usage = usage if isinstance(usage, dict) else {}
+    return (
+        _to_int(usage.get("prompt_tokens")),
+        _to_int(usage.get("completion_tokens")),
+        _to_int(usage.get("total_tokens")),
+    )
+
+
+def _build_usage(prompt_tokens, completion_tokens, total_tokens):
+    if prompt_tokens < 0 and completion_tokens < 0 and total_tokens < 0:
+        return None
+    return {
+        "prompt_tokens": _from_int(prompt_tokens),
+        "completion_tokens": _from_int(completion_tokens),
+        "total_tokens": _from_int(total_tokens),
+    }
+
+
+class BinaryHistoryStore:
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.strings_path = f"{self.path}.strings"
+        self.text_path = f"{self.path}.text"
+        self._strings = []
+        self._string_ids = {}
+        self._strings_size = 0
+
+    def _sync_strings(self):
+        # Pick up strings appended by another writer since the last read.
+        try:
+            size = os.path.getsize(self.strings_path)
+        except OSError:
+            return
+        if size <= self._strings_size:
+            return
+        with open(self.strings_path, "rb") as f:
+            f.seek(self._strings_size)
+            data = f.read()
+        position = 0
+        while position + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, position)
+            end = position + LENGTH.size + length
+            if end > len(data):
+                break
+            value = data[position + LENGTH.size:end].decode("utf-8")
+            self._string_ids.setdefault(value, len(self._strings))
+            self._strings.append(value)
+            position = end
+        self._strings_size += position
+
+    def _intern(self, value, strings_file):
+        if value is None:
+            return NONE_ID
+        value = str(value)
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            encoded = value.encode("utf-8")
+            strings_file.write(LENGTH.pack(len(encoded)) + encoded)
+            self._strings_size += LENGTH.size + len(encoded)
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _string(self, string_id):
+        if string_id == NONE_ID or string_id >= len(self._strings):
+            return None
+        return self._strings[string_id]
+
+    @staticmethod
+    def _write_text(value, text_file):
+        if value is None:
+            return 0, NONE_LENGTH
+        encoded = str(value).encode("utf-8")
+        offset = text_file.tell()
+        text_file.write(encoded)
+        return offset, len(encoded)
+
+    @staticmethod
+    def _read_text(text_file, offset, length):
+        if length == NONE_LENGTH:
+            return None
+        text_file.seek(offset)
+        return text_file.read(length).decode("utf-8", errors="replace")
+
+    def append(self, entry):
+        with _lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # The records file lock covers the string ids and text offsets
+            # handed out below, so other processes cannot reuse them.
+            with open(self.path, "ab") as f, _locked_file(f):
+                self._sync_strings()
+                record = bytearray()
+                # Text and strings are flushed before the record that points
+                # at them, so a crash can only leave unreferenced bytes behind.
+                with open(self.strings_path, "ab") as strings_file, \
+                        open(self.text_path, "ab") as text_file:
+                    text_file.seek(0, os.SEEK_END)
+                    record += self._pack(entry, strings_file, text_file)
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                f.write(LENGTH.pack(len(record)) + bytes(record))
+
+    def _pack(self, entry, strings_file, text_file):
+        def intern(value):
+            return self._intern(value, strings_file)
+
+        def text(value):
+            return self._write_text(value, text_file)
+
+        project = entry.get("project")
+        if not isinstance(project, dict):
+            project = {"name": project, "path": None}
+        plan = entry.get("plan") or {}
+        selected = entry.get("selected_candidate")
+        cache = entry.get("cache")
+        generators = plan.get("generators") or []
+        displayed = entry.get("displayed_messages") or []
+        candidates = entry.get("raw_candidates") or []
+
+        outcome = entry.get("outcome", "committed")
+        outcome_code = OUTCOMES.index(outcome) if outcome in OUTCOMES else 255
+        flags = (FLAG_SELECTED if selected else 0) | (FLAG_CACHE if isinstance(cache, dict) else 0)
+        selected = selected or {}
+        cache = cache if isinstance(cache, dict) else {}
+        selected_index = entry.get("selected_index")
+
+        packed = bytearray(HEADER.pack(
+            _parse_timestamp(entry.get("timestamp")),
+            outcome_code,
+            flags,
+            intern(entry.get("os")),
+            intern(project.get("name")),
+            intern(project.get("path")),
+            selected_index if isinstance(selected_index, int) else -1,
+            _to_int(entry.get("prompt_length")),
+            intern(plan.get("judge")),
+            intern(plan.get("refiner")),
+            intern(plan.get("strategy")),
+            intern(selected.get("provider")),
+            intern(selected.get("model")),
+            _to_float(selected.get("elapsed")),
+            *text(selected.get("content")),
+            *text(entry.get("final_message")),
+            *text(entry.get("diff_summary")),
+            *text(entry.get("user_note")),
+            _to_int(cache.get("hits")),
+            _to_int(cache.get("misses")),
+            len(generators),
+            len(displayed),
+            len(candidates),
+        ))
+        for provider in generators:
+            packed += STRING_ID.pack(intern(provider))
+        for position, item in enumerate(displayed, 1):
+            packed += DISPLAYED.pack(
+                _to_int(item.get("index", position)),
+                intern(item.get("provider")),
+                intern(item.get("model")),
+                _to_float(item.get("elapsed")),
+                *_usage_tokens(item.get("usage")),
+                *text(item.get("message")),
+            )
+        for item in candidates:
+            packed += CANDIDATE.pack(
+                intern(item.get("provider")),
+                intern(item.get("model")),
+                _to_float(item.get("elapsed")),
+                *_usage_tokens(item.get("usage")),
+                *text(item.get("content")),
+            )
+        return packed
+
+    def iter_records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a gcm binary history")
+            while True:
+                prefix = f.read(LENGTH.size)
+                if len(prefix) < LENGTH.size:
+                    return
+                (length,) = LENGTH.unpack(prefix)
+                record = f.read(length)
+                if len(record) < length:
+                    # Torn write at the tail: ignore the partial record.
+                    return
+                yield record
+
+    def iter_entries(self, load_text=False, since=None, until=None):
+        """Yield history entries shaped like the JSONL ones.
+
+        Only the final message is read from the text sidecar unless
+        ``load_text`` is set; the report needs nothing else. ``since`` and
+        ``until`` (epoch seconds) are checked on the packed timestamp before
+        anything else is decoded.
+        """
+        self._sync_strings()
+        text_file = open(self.text_path, "rb") if os.path.exists(self.text_path) else None
+        try:
+            for record in self.iter_records():
+                if since is not None or until is not None:
+                    (timestamp,) = TIMESTAMP.unpack_from(record, 0)
+                    if math.isnan(timestamp):
+                        continue
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp > until:
+                        continue
+                yield self._unpack(record, text_file, load_text)
+        finally:
+            if text_file is not None:
+                text_file.close()
+
+    def _unpack(self, record, text_file, load_text):
+        string = self._string
+
+        def text(offset, length, required=False):
+            if text_file is None or not (load_text or required):
+                return None
+            return self._read_text(text_file, offset, length)
+
+        (
+            timestamp, outcome_code, flags, os_id, project_name, project_path,
+            selected_index, prompt_length, judge, refiner, strategy,
+            selected_provider, selected_model, selected_elapsed,
+            content_offset, content_length, final_offset, final_length,
+            diff_offset, diff_length, note_offset, note_length,
+            cache_hits, cache_misses, generator_count, displayed_count,
+            candidate_count,
+        ) = HEADER.unpack_from(record, 0)
+        position = HEADER.size
+
+        generators = []
+        for _ in range(generator_count):
+            (string_id,) = STRING_ID.unpack_from(record, position)
+            position += STRING_ID.size
+            generators.append(string(string_id))
+
+        displayed = []
+        for _ in range(displayed_count):
+            (index, provider, model, elapsed, prompt_tokens, completion_tokens,
+             total_tokens, offset, length) = DISPLAYED.unpack_from(record, position)
+            position += DISPLAYED.size
+            displayed.append({
+                "index": _from_int(index),
+                "provider": string(provider),
+                "model": string(model),
+                "elapsed": _from_float(elapsed),
+                "usage": _build_usage(prompt_tokens, completion_tokens, total_tokens),
+                "message": text(offset, length),
+            })
+
+        candidates = []
+        for _ in range(candidate_count):
+            (provider, model, elapsed, prompt_tokens, completion_tokens,
+             total_tokens, offset, length) = CANDIDATE.unpack_from(record, position)
+            position += CANDIDATE.size
+            candidates.append({
+                "provider": string(provider),
+                "model": string(model),
+                "elapsed": _from_float(elapsed),
+                "usage": _build_usage(prompt_tokens, completion_tokens, total_tokens),
+                "content": text(offset, length),
+            })
+
+        return {
+            "timestamp": _format_timestamp(timestamp),
+            "outcome": OUTCOMES[outcome_code] if outcome_code < len(OUTCOMES) else None,
+            "os": string(os_id),
+            "project": {"name": string(project_name), "path": string(project_path)},
+            "selected_index": selected_index if selected_index >= 0 else None,
+            "user_note": text(note_offset, note_length),
+            "prompt_length": _from_int(prompt_length),
+            "diff_summary": text(diff_offset, diff_length),
+            "final_message": text(final_offset, final_length, required=True),
+            "cache": {
+                "hits": _from_int(cache_hits),
+                "misses": _from_int(cache_misses),
+            } if flags & FLAG_CACHE else None,
+            "selected_candidate": {
+                "provider": string(selected_provider),
+                "model": string(selected_model),
+                "elapsed": _from_float(selected_elapsed),
+                "content": text(content_offset, content_length),
+            } if flags & FLAG_SELECTED else None,
+            "plan": {
+                "generators": generators,
+                "judge": string(judge),
+                "refiner": string(refiner),
+                "strategy": string(strategy),
+            },
+            "displayed_messages": displayed,
+            "raw_candidates": candidates,
+        }
+
+
+def get_history_store(path):
+    path = os.path.expanduser(path)
+    with _lock:
+        store = _stores.get(path)
+        if store is None:
+            store = BinaryHistoryStore(path)
+            _stores[path] = store
+        return store
+
+
+def convert_jsonl_to_binary(jsonl_path, binary_path):
+    jsonl_path = os.path.expanduser(jsonl_path)
+    store = get_history_store(binary_path)
+    if os.path.exists(store.path) and os.path.getsize(store.path) > 0:
+        raise FileExistsError(f"{store.path} already exists")
+
+    converted = 0
+    skipped = 0
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            store.append(entry)
+            converted += 1
+    return converted, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert the gcm JSONL history into the binary history store."
+    )
+    parser.add_argument("jsonl_path", nargs="?", default="~/.gcm_history.jsonl")
+    parser.add_argument("binary_path", nargs="?", default="~/.gcm_history.gch")
+    args = parser.parse_args(argv)
+
+    try:
+        converted, skipped = convert_jsonl_to_binary(args.jsonl_path, args.binary_path)
+    except (OSError, ValueError) as exc:
+        print(f"❌ {exc}")
+        return 1
+
+    print(f"✅ Converted {converted} entries into {os.path.expanduser(args.binary_path)}")
+    if skipped:
+        print(f"⚠️ Skipped {skipped} malformed lines")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
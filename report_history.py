@@ -1,27 +1,34 @@
 #!/usr/bin/env python3
 
+import argparse
+import csv
+import io
 import json
+import math
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 from collections import Counter
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from typing import NamedTuple, Optional
 
 import yaml
 
+from history_store import get_history_store
+
 RICH_IMPORT_ERROR = None
 
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.table import Table
-    from rich.text import Text
-    HAS_RICH = True
-except ImportError as exc:
-    HAS_RICH = False
-    RICH_IMPORT_ERROR = exc
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+EXACT_SAMPLE_LIMIT = 512
 
 
 def load_config(path=None):
@@ -32,22 +39,178 @@ def load_config(path=None):
         return yaml.safe_load(f)
 
 
-def load_history_entries(path):
+WINDOW_UNITS = {
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+}
+ROLLING_PERIODS = ("daily", "weekly")
+# The JSONL history is only roughly in timestamp order: local clocks go
+# back an hour at a DST fall-back and --batch threads append as they
+# finish. Window scans start and stop this far outside the bounds.
+HISTORY_ORDER_TOLERANCE = timedelta(hours=1)
+
+
+class TimeWindow(NamedTuple):
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def __bool__(self):
+        return self.since is not None or self.until is not None
+
+    def contains(self, timestamp):
+        if timestamp is None:
+            return not self
+        if self.since is not None and timestamp < self.since:
+            return False
+        if self.until is not None and timestamp > self.until:
+            return False
+        return True
+
+
+def parse_window_length(value):
+    match = re.fullmatch(r"\s*([0-9]+)\s*([mhdw])\s*", str(value or "").lower())
+    if not match:
+        raise ValueError(f"Invalid window '{value}' (use e.g. 12h, 7d or 2w)")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+def _parse_date_only(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def parse_time_bound(value, now=None, end_of_day=False):
+    """Parse an ISO date/datetime or a relative length such as ``7d`` (ago).
+
+    History timestamps are naive local time, so aware datetimes (``Z`` or
+    ``+02:00``) are converted to it. A date-only bound means the start of
+    that day, or its end with ``end_of_day``.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    day = _parse_date_only(text)
+    if day is not None:
+        return datetime.combine(day, time.max if end_of_day else time.min)
+    try:
+        parsed = datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith(("Z", "z")) else text)
+    except ValueError:
+        return (now or datetime.now()) - parse_window_length(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def build_time_window(since=None, until=None, window=None, now=None):
+    if window and since is not None:
+        raise ValueError("--window cannot be combined with --since")
+    now = now or datetime.now()
+    since_time = parse_time_bound(since, now)
+    until_time = parse_time_bound(until, now, end_of_day=True)
+    if window:
+        end = until_time or now
+        if until is not None and _parse_date_only(str(until).strip()):
+            # The window covers whole days up to and including ``until``.
+            end = datetime.combine(until_time.date() + timedelta(days=1), time.min)
+        since_time = end - parse_window_length(window)
+    return TimeWindow(since_time, until_time)
+
+
+def parse_entry_timestamp(entry):
+    value = entry.get("timestamp")
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _read_line_timestamp(line):
+    try:
+        return parse_entry_timestamp(json.loads(line))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _first_timestamp_from(f, position):
+    # Align on the first line that starts at or after ``position``.
+    f.seek(max(position - 1, 0))
+    if position:
+        f.readline()
+    for line in iter(f.readline, b""):
+        timestamp = _read_line_timestamp(line)
+        if timestamp is not None:
+            return timestamp
+    return None
+
+
+def seek_history_offset(f, since):
+    """Binary-search a timestamp-ordered JSONL file for the first entry >= since.
+
+    The history is append-only, so lines are in timestamp order up to
+    HISTORY_ORDER_TOLERANCE (callers seek that much early); this reads
+    O(log n) lines instead of parsing everything before ``since``.
+    """
+    f.seek(0, os.SEEK_END)
+    low, high = 0, f.tell()
+    while low < high:
+        middle = (low + high) // 2
+        timestamp = _first_timestamp_from(f, middle)
+        if timestamp is None or timestamp >= since:
+            high = middle
+        else:
+            low = middle + 1
+    f.seek(max(low - 1, 0))
+    if low:
+        f.readline()
+    return f.tell()
+
+
+def iter_history_entries(path, history_format="jsonl", window=None):
+    window = window or TimeWindow()
+    if history_format == "binary":
+        for entry in get_history_store(path).iter_entries(
+            since=window.since.timestamp() if window.since else None,
+            until=window.until.timestamp() if window.until else None,
+        ):
+            if window.contains(parse_entry_timestamp(entry)):
+                yield entry
+        return
+
     history_path = os.path.expanduser(path)
     if not os.path.exists(history_path):
-        return []
+        return
 
-    entries = []
-    with open(history_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
+    with open(history_path, "rb") as f:
+        if window.since is not None:
+            seek_history_offset(f, window.since - HISTORY_ORDER_TOLERANCE)
+        for raw_line in f:
+            line = raw_line.decode("utf-8", errors="replace").strip()
             if not line:
                 continue
             try:
-                entries.append(json.loads(line))
+                entry = json.loads(line)
             except json.JSONDecodeError:
                 continue
-    return entries
+            if window:
+                timestamp = parse_entry_timestamp(entry)
+                if (
+                    window.until is not None and timestamp is not None
+                    and timestamp > window.until + HISTORY_ORDER_TOLERANCE
+                ):
+                    break
+                if not window.contains(timestamp):
+                    continue
+            yield entry
+
+
+def load_history_entries(path):
+    return list(iter_history_entries(path))
 
 
 def get_repos_registry_path():
@@ -166,51 +329,121 @@ def build_empty_overview():
     }
 
 
-def parse_os_from_commit_message(message):
-    if not message:
+class CommitTrailer(NamedTuple):
+    number: Optional[str] = None
+    timestamp: Optional[str] = None
+    location: Optional[str] = None
+    os: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    elapsed: Optional[float] = None
+
+
+EMPTY_TRAILER = CommitTrailer()
+
+# The stamp line exactly as gcm writes it, matched in one go:
+# 🆔: n | 🕒: ts [| 📍: loc] | 🌐: env | 🤖: provider 🧠: model | ⏱️: s secs
+# Anything that deviates falls back to the per-field scan below.
+STAMP_LINE_PATTERN = re.compile(
+    r"🆔: ([^|\n]*) \| "
+    r"🕒: ([^|\n]*) \| "
+    r"(?:📍: ([^|\n]*) \| )?"
+    r"🌐: (WINDOWS|LINUX|MACOS|CYGWIN|GITBASH) \| "
+    r"🤖:\s*([^|\n]*?)\s+🧠:\s*([^|\n]*?)\s*\| "
+    r"⏱️: ([0-9]+(?:\.[0-9]+)?) secs\b"
+)
+STAMP_OS_NAMES = {
+    "WINDOWS": "WINDOWS",
+    "CYGWIN": "WINDOWS",
+    "GITBASH": "WINDOWS",
+    "LINUX": "LINUX",
+    "MACOS": "MACOS",
+}
+# Older messages spread the fields over several lines; one alternation
+# per field lets a single finditer pass pick them up.
+LEGACY_TRAILER_PATTERN = re.compile(
+    r"🌐:\s*(?P<os>WINDOWS|LINUX|MACOS|CYGWIN|GITBASH)\b"
+    r"|🤖:\s*(?P<provider>.+?)\s+🧠:\s*(?P<model>[^|\n]*?)\s*(?=\||$)"
+    r"|⏱️:\s*(?P<elapsed>[0-9]+(?:\.[0-9]+)?)\s+secs\b",
+    re.MULTILINE,
+)
+HEADER_OS_PATTERN = re.compile(r"\[💻[^\]\r\n]*([🪟🐧🍎])\]")
+HEADER_OS_EMOJIS = {
+    "🪟": "WINDOWS",
+    "🐧": "LINUX",
+    "🍎": "MACOS",
+}
+
+
+def _parse_elapsed(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
         return None
 
-    match = re.search(r"🌐:\s*(WINDOWS|LINUX|MACOS|CYGWIN|GITBASH)\b", message)
-    if match:
-        return normalize_os_name(match.group(1))
-
-    header_match = re.search(r"\[💻[^\]\r\n]*([🪟🐧🍎])\]", message)
-    if header_match:
-        emoji_map = {
-            "🪟": "WINDOWS",
-            "🐧": "LINUX",
-            "🍎": "MACOS",
-        }
-        return emoji_map.get(header_match.group(1))
 
-    return None
+def _parse_legacy_trailer(message):
+    fields = {}
+    for match in LEGACY_TRAILER_PATTERN.finditer(message):
+        for name, value in match.groupdict().items():
+            if value is not None and name not in fields:
+                fields[name] = value
+
+    os_name = normalize_os_name(fields.get("os"))
+    if not os_name:
+        header_match = HEADER_OS_PATTERN.search(message)
+        if header_match:
+            os_name = HEADER_OS_EMOJIS.get(header_match.group(1))
+
+    provider = fields.get("provider")
+    return CommitTrailer(
+        os=os_name,
+        provider=provider.strip() if provider else None,
+        model=fields.get("model") or None,
+        elapsed=_parse_elapsed(fields.get("elapsed")),
+    )
 
 
-def parse_provider_from_commit_message(message):
+def parse_commit_trailer(message):
     if not message:
-        return None
+        return EMPTY_TRAILER
+
+    stamp_start = message.rfind("🆔:")
+    if stamp_start >= 0:
+        match = STAMP_LINE_PATTERN.match(message, stamp_start)
+        if match:
+            number, timestamp, location, os_name, provider, model, elapsed = match.groups()
+            return CommitTrailer(
+                number, timestamp, location, STAMP_OS_NAMES[os_name],
+                provider, model or None, float(elapsed),
+            )
+    return _parse_legacy_trailer(message)
 
-    match = re.search(r"🤖:\s*(.+?)\s+🧠:", message)
-    if not match:
-        return None
-    return match.group(1).strip()
+
+def parse_os_from_commit_message(message):
+    return parse_commit_trailer(message).os
+
+
+def parse_provider_from_commit_message(message):
+    return parse_commit_trailer(message).provider
 
 
 def parse_elapsed_from_commit_message(message):
-    if not message:
-        return None
+    return parse_commit_trailer(message).elapsed
 
-    match = re.search(r"⏱️:\s*([0-9]+(?:\.[0-9]+)?)\s+secs\b", message)
-    if not match:
-        return None
 
-    try:
-        return float(match.group(1))
-    except ValueError:
-        return None
+def build_git_log_window_args(since=None, until=None):
+    args = []
+    if since is not None:
+        args.append(f"--since={since.isoformat()}")
+    if until is not None:
+        args.append(f"--until={until.isoformat()}")
+    return args
 
 
-def load_git_log_messages(project_path):
+def load_git_log_messages(project_path, since=None, until=None):
     safe_path = os.path.abspath(project_path)
     try:
         result = subprocess.run(
@@ -220,6 +453,7 @@ def load_git_log_messages(project_path):
                 f"safe.directory={safe_path}",
                 "log",
                 "--pretty=format:%B%x1e",
+                *build_git_log_window_args(since, until),
             ],
             capture_output=True,
             text=True,
@@ -236,22 +470,317 @@ def load_git_log_messages(project_path):
     return [message.strip() for message in result.stdout.split("\x1e") if message.strip()]
 
 
+def run_git_log_command(project_path, args):
+    safe_path = os.path.abspath(project_path)
+    return subprocess.run(
+        ["git", "-c", f"safe.directory={safe_path}", *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        cwd=project_path,
+    )
+
+
+def get_repo_head(project_path):
+    result = run_git_log_command(project_path, ["rev-parse", "--verify", "-q", "HEAD"])
+    if result.returncode == 0:
+        return result.stdout.strip() or None
+
+    check = run_git_log_command(project_path, ["rev-parse", "--git-dir"])
+    if check.returncode != 0:
+        raise subprocess.CalledProcessError(
+            check.returncode, check.args, check.stdout, check.stderr
+        )
+    # Unborn branch: no commits to index yet.
+    return None
+
+
+def is_ancestor_commit(project_path, ancestor, head):
+    result = run_git_log_command(
+        project_path, ["merge-base", "--is-ancestor", ancestor, head]
+    )
+    return result.returncode == 0
+
+
+def load_git_log_commits(project_path, since_head=None, head="HEAD"):
+    revision = f"{since_head}..{head}" if since_head else head
+    result = run_git_log_command(
+        project_path, ["log", "--pretty=format:%H%x1f%ct%x1f%B%x1e", revision]
+    )
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, result.stdout, result.stderr
+        )
+
+    commits = []
+    for record in result.stdout.split("\x1e"):
+        record = record.strip()
+        if not record:
+            continue
+        sha, _, rest = record.partition("\x1f")
+        committed_at, _, message = rest.partition("\x1f")
+        message = message.strip()
+        if message:
+            commits.append((sha.strip(), int(committed_at or 0), message))
+    return commits
+
+
+class GitLogIndex:
+    """Persistent SQLite index of parsed gcm commit stamps per repository."""
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path="~/.gcm/report_index.sqlite3"):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                # The index is only a cache of git log: rebuild it on upgrade.
+                conn.executescript(
+                    "DROP TABLE IF EXISTS commits; DROP TABLE IF EXISTS repos;"
+                )
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS repos (
+                    repo TEXT PRIMARY KEY,
+                    head TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS commits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    repo TEXT NOT NULL,
+                    sha TEXT NOT NULL,
+                    committed_at INTEGER NOT NULL,
+                    message TEXT NOT NULL,
+                    os TEXT,
+                    provider TEXT,
+                    elapsed REAL,
+                    UNIQUE (repo, sha)
+                );
+                CREATE INDEX IF NOT EXISTS commits_repo ON commits (repo, id);
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def refresh(self, project_path):
+        repo = os.path.abspath(project_path)
+        head = get_repo_head(project_path)
+
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT head FROM repos WHERE repo = ?", (repo,)
+            ).fetchone()
+            indexed_head = row[0] if row else None
+            if head is not None and indexed_head == head:
+                return
+
+            since_head = None
+            if indexed_head and head and is_ancestor_commit(project_path, indexed_head, head):
+                since_head = indexed_head
+            else:
+                # First run, empty repo or rewritten history: start over.
+                conn.execute("DELETE FROM commits WHERE repo = ?", (repo,))
+
+            if head is None:
+                conn.execute("DELETE FROM repos WHERE repo = ?", (repo,))
+                return
+
+            rows = []
+            # git log lists newest first; insert oldest first so ids grow with time.
+            commits = load_git_log_commits(project_path, since_head, head)
+            for sha, committed_at, message in reversed(commits):
+                trailer = parse_commit_trailer(message)
+                rows.append((
+                    repo, sha, committed_at, message,
+                    trailer.os, trailer.provider, trailer.elapsed,
+                ))
+            conn.executemany(
+                "INSERT OR REPLACE INTO commits "
+                "(repo, sha, committed_at, message, os, provider, elapsed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO repos (repo, head) VALUES (?, ?)",
+                (repo, head),
+            )
+
+    @staticmethod
+    def _window_clause(since, until):
+        clause = ""
+        params = []
+        if since is not None:
+            clause += " AND committed_at >= ?"
+            params.append(int(since.timestamp()))
+        if until is not None:
+            clause += " AND committed_at <= ?"
+            params.append(int(until.timestamp()))
+        return clause, params
+
+    def load_messages(self, project_path, since=None, until=None):
+        self.refresh(project_path)
+        clause, params = self._window_clause(since, until)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT message FROM commits WHERE repo = ?{clause} ORDER BY id DESC",
+                (os.path.abspath(project_path), *params),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_os_counts(self, project_path, since=None, until=None):
+        self.refresh(project_path)
+        clause, params = self._window_clause(since, until)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT os, COUNT(*) FROM commits "
+                f"WHERE repo = ? AND os IS NOT NULL{clause} GROUP BY os",
+                (os.path.abspath(project_path), *params),
+            ).fetchall()
+        return Counter(dict(rows))
+
+
+def build_git_log_store(config, window=None):
+    return GitLogStore(
+        build_git_log_index(config),
+        workers=config.get("report_workers", 1),
+        window=window,
+    )
+
+
+def build_git_log_index(config):
+    index_cfg = config.get("git_log_index") or {}
+    if not index_cfg.get("enabled", False):
+        return None
+    try:
+        return GitLogIndex(index_cfg.get("path", "~/.gcm/report_index.sqlite3"))
+    except (OSError, sqlite3.Error) as exc:
+        print(f"Git log index disabled: {exc}", file=sys.stderr)
+        return None
+
+
+class GitLogStore:
+    """Per-report cache so each repository's git log is read only once."""
+
+    def __init__(self, index=None, workers=1, window=None):
+        self.index = index
+        self.workers = max(1, int(workers or 1))
+        self.window = window or TimeWindow()
+        self._messages = {}
+        self._errors = {}
+        self._os_counts = {}
+
+    def _load_messages(self, project_path):
+        window_args = {}
+        if self.window:
+            window_args = {"since": self.window.since, "until": self.window.until}
+        if self.index is not None:
+            try:
+                return self.index.load_messages(project_path, **window_args)
+            except sqlite3.Error:
+                pass
+        return load_git_log_messages(project_path, **window_args)
+
+    def _fetch(self, project_path):
+        try:
+            return self._load_messages(project_path), None
+        except (OSError, subprocess.SubprocessError) as exc:
+            return None, exc
+
+    def prefetch(self, project_paths):
+        pending = {}
+        for project_path in project_paths:
+            if not project_path:
+                continue
+            key = os.path.abspath(project_path)
+            if key in self._messages or key in self._errors or key in pending:
+                continue
+            pending[key] = project_path
+
+        if len(pending) < 2 or self.workers < 2:
+            return
+
+        # Scans overlap on subprocess and disk wait; results are stored by
+        # path so later lookups stay in the caller's (serial) order.
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+            results = list(executor.map(self._fetch, pending.values()))
+        for key, (messages, error) in zip(pending, results):
+            if error is not None:
+                self._errors[key] = error
+            else:
+                self._messages[key] = messages
+
+    def get(self, project_path):
+        key = os.path.abspath(project_path)
+        if key in self._messages:
+            return self._messages[key]
+        if key in self._errors:
+            raise self._errors[key]
+
+        try:
+            messages = self._load_messages(project_path)
+        except (OSError, subprocess.SubprocessError) as exc:
+            self._errors[key] = exc
+            raise
+        self._messages[key] = messages
+        return messages
+
+    def get_os_counts(self, project_path):
+        key = os.path.abspath(project_path)
+        if key not in self._os_counts:
+            if self.index is not None and key not in self._messages:
+                try:
+                    self._os_counts[key] = self.index.load_os_counts(
+                        project_path, self.window.since, self.window.until
+                    )
+                    return self._os_counts[key]
+                except sqlite3.Error:
+                    pass
+            counts = Counter()
+            for message in self.get(project_path):
+                os_name = parse_os_from_commit_message(message)
+                if os_name:
+                    counts[os_name] += 1
+            self._os_counts[key] = counts
+        return self._os_counts[key]
+
+
 def build_git_log_entry(project_path, message):
     normalized_path = os.path.abspath(project_path)
     project_name = os.path.basename(normalized_path) or normalized_path
-    provider = parse_provider_from_commit_message(message)
-    elapsed = parse_elapsed_from_commit_message(message)
+    trailer = parse_commit_trailer(message)
+    provider = trailer.provider
+    elapsed = trailer.elapsed
 
     displayed_messages = []
     selected_candidate = {}
     if provider:
-        displayed_messages.append({"provider": provider, "elapsed": elapsed})
+        displayed_messages.append({
+            "provider": provider,
+            "model": trailer.model,
+            "elapsed": elapsed,
+        })
         selected_candidate["provider"] = provider
         if isinstance(elapsed, (int, float)):
             selected_candidate["elapsed"] = elapsed
 
+    timestamp = None
+    if trailer.timestamp:
+        try:
+            timestamp = datetime.fromisoformat(trailer.timestamp).isoformat(
+                timespec="milliseconds"
+            )
+        except ValueError:
+            timestamp = None
+
     return {
-        "os": parse_os_from_commit_message(message),
+        "timestamp": timestamp,
+        "os": trailer.os,
         "outcome": "committed",
         "project": {
             "name": project_name,
@@ -263,8 +792,9 @@ def build_git_log_entry(project_path, message):
     }
 
 
-def load_git_log_entries(project_paths):
-    entries = []
+def iter_git_log_entries(project_paths, log_store=None):
+    log_store = log_store or GitLogStore()
+    log_store.prefetch(project_paths)
     seen_paths = set()
 
     for project_path in project_paths:
@@ -274,164 +804,138 @@ def load_git_log_entries(project_paths):
         seen_paths.add(normalized_path)
 
         try:
-            log_messages = load_git_log_messages(normalized_path)
+            log_messages = log_store.get(normalized_path)
         except (OSError, subprocess.SubprocessError):
             continue
 
         for message in log_messages:
-            entries.append(build_git_log_entry(normalized_path, message))
-
-    return entries
-
-
-def summarize_selected_commits(entries, summary):
-    committed_entries = [entry for entry in entries if entry.get("outcome", "committed") != "canceled"]
-    entries_by_project_path = defaultdict(list)
-    fallback_entries = []
-
-    for entry in committed_entries:
-        project_path = get_project_path(entry)
-        if project_path:
-            entries_by_project_path[project_path].append(entry)
+            yield build_git_log_entry(normalized_path, message)
+
+
+def load_git_log_entries(project_paths, log_store=None):
+    return list(iter_git_log_entries(project_paths, log_store))
+
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch).
+
+    Values land in logarithmic buckets, so any quantile is within
+    ``relative_accuracy`` of the true sample and memory is capped at
+    ``max_bins`` buckets whatever the number of samples.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        # Fold the two lowest buckets together; high latencies matter most.
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for index, bin_count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + bin_count
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, quantile):
+        if not self.count:
+            return None
+        rank = quantile * (self.count - 1)
+        cumulative = self.zero_count
+        if rank < cumulative:
+            return max(self.min, 0.0)
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if rank < cumulative:
+                # Bucket midpoint, clamped to the observed range.
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, quantiles):
+        return [self.quantile(quantile) for quantile in quantiles]
+
+
+class ElapsedStats:
+    """Elapsed-time samples for one report key.
+
+    The mean is always exact. The first ``EXACT_SAMPLE_LIMIT`` samples are
+    kept as is; past that they are folded into a DDSketch, so memory per key
+    stays bounded whatever the size of the history. Both paths pick the
+    sample at rank ``floor(q * (count - 1))``, like DDSketch.quantile.
+    """
+
+    __slots__ = ("count", "total", "_samples", "_sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self._samples = []
+        self._sketch = None
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        if self._sketch is not None:
+            self._sketch.add(value)
         else:
-            fallback_entries.append(entry)
-
-    for project_path, project_entries in entries_by_project_path.items():
-        try:
-            log_messages = load_git_log_messages(project_path)
-        except (OSError, subprocess.SubprocessError):
-            fallback_entries.extend(project_entries)
-            continue
-
-        message_counts = Counter(log_messages)
-        for entry in project_entries:
-            final_message = (entry.get("final_message") or "").strip()
-            project_name = get_project_name(entry)
-            selected_provider = None
-            selected_elapsed = None
-
-            if final_message and message_counts.get(final_message, 0) > 0:
-                message_counts[final_message] -= 1
-                selected_provider = parse_provider_from_commit_message(final_message)
-                selected_elapsed = parse_elapsed_from_commit_message(final_message)
-
-            if not selected_provider:
-                fallback_entries.append(entry)
-                continue
-
-            key = (project_name, selected_provider)
-            summary["selection_by_project_provider"][key] += 1
-            if isinstance(selected_elapsed, (int, float)):
-                summary["avg_selected_elapsed_by_project_provider"][key].append(
-                    selected_elapsed
-                )
-
-    for entry in fallback_entries:
-        project_name = get_project_name(entry)
-        selected_candidate = entry.get("selected_candidate") or {}
-        selected_provider = selected_candidate.get("provider")
-        selected_elapsed = selected_candidate.get("elapsed")
-        if not selected_provider:
-            continue
-
-        key = (project_name, selected_provider)
-        summary["selection_by_project_provider"][key] += 1
-        if isinstance(selected_elapsed, (int, float)):
-            summary["avg_selected_elapsed_by_project_provider"][key].append(
-                selected_elapsed
-            )
-
-
-def summarize_committed_os(entries, summary):
-    project_paths = []
-    seen_paths = set()
-    fallback_entries = []
-
-    for entry in entries:
-        project_path = get_project_path(entry)
-        if project_path and project_path not in seen_paths:
-            seen_paths.add(project_path)
-            project_paths.append(project_path)
-        elif not project_path and entry.get("outcome", "committed") != "canceled":
-            fallback_entries.append(entry)
-
-    for project_path in project_paths:
-        try:
-            log_messages = load_git_log_messages(project_path)
-        except (OSError, subprocess.SubprocessError):
-            continue
-
-        for message in log_messages:
-            os_name = parse_os_from_commit_message(message)
-            if not os_name:
-                continue
-            summary["runs_by_os"][os_name] += 1
-            summary["os_total_runs"] += 1
-
-    for entry in fallback_entries:
-        os_name = get_entry_os_name(entry)
-        if os_name:
-            summary["runs_by_os"][os_name] += 1
-            summary["os_total_runs"] += 1
-
-
-def summarize_os_for_scope(entries, project_paths=None):
-    overview = build_empty_overview()
-    project_paths = project_paths or []
-    seen_paths = set()
-    fallback_entries = []
-
-    for project_path in project_paths:
-        if project_path and project_path not in seen_paths:
-            seen_paths.add(project_path)
-
-    for project_path in seen_paths:
-        try:
-            log_messages = load_git_log_messages(project_path)
-        except (OSError, subprocess.SubprocessError):
-            continue
-
-        for message in log_messages:
-            os_name = parse_os_from_commit_message(message)
-            if not os_name:
-                continue
-            overview["runs_by_os"][os_name] += 1
-            overview["os_total_runs"] += 1
-
-    if not seen_paths:
-        for entry in entries:
-            if entry.get("outcome", "committed") == "canceled":
-                continue
-            fallback_entries.append(entry)
-
-    for entry in fallback_entries:
-        os_name = get_entry_os_name(entry)
-        if os_name:
-            overview["runs_by_os"][os_name] += 1
-            overview["os_total_runs"] += 1
-
-    return overview
-
-
-def collect_project_paths_from_entries(entries):
-    project_paths = []
-    seen_paths = set()
-
-    for entry in entries:
-        project_path = get_project_path(entry)
-        if not project_path:
-            continue
-        if project_path in seen_paths:
-            continue
-        seen_paths.add(project_path)
-        project_paths.append(project_path)
-
-    return project_paths
-
-
-def summarize_entries(entries):
-    summary = {
-        "total_runs": len(entries),
+            self._samples.append(value)
+            if len(self._samples) > EXACT_SAMPLE_LIMIT:
+                self._sketch = DDSketch()
+                for sample in self._samples:
+                    self._sketch.add(sample)
+                self._samples = None
+        self.count += 1
+        self.total += value
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def quantiles(self, quantiles=LATENCY_QUANTILES):
+        if not self.count:
+            return [None for _ in quantiles]
+        if self._sketch is not None:
+            return self._sketch.quantiles(quantiles)
+        ordered = sorted(self._samples)
+        return [ordered[int(quantile * (self.count - 1))] for quantile in quantiles]
+
+    def quantile(self, quantile):
+        return self.quantiles((quantile,))[0]
+
+
+def build_empty_summary():
+    return {
+        "total_runs": 0,
         "os_total_runs": 0,
         "total_commits": 0,
         "total_canceled": 0,
@@ -443,17 +947,85 @@ def summarize_entries(entries):
         "judge_usage_by_project_provider": defaultdict(int),
         "refiner_usage_by_project_provider": defaultdict(int),
         "generator_usage_by_project_provider": defaultdict(int),
-        "avg_selected_elapsed_by_project_provider": defaultdict(list),
-        "avg_displayed_elapsed_by_project_provider": defaultdict(list),
+        "avg_selected_elapsed_by_project_provider": defaultdict(ElapsedStats),
+        "avg_displayed_elapsed_by_project_provider": defaultdict(ElapsedStats),
+        "elapsed_by_provider": defaultdict(ElapsedStats),
+        "elapsed_by_provider_model": defaultdict(ElapsedStats),
         "selected_indexes": defaultdict(int),
     }
 
-    for entry in entries:
+
+class HistoryAggregator:
+    """Single-pass aggregation of history entries.
+
+    Entries are consumed one at a time, so they can come straight from
+    iter_history_entries(); memory is bounded by the number of projects and
+    providers, not by the size of the history file.
+    """
+
+    def __init__(self, log_store=None, registered_repos=None, project_path=None,
+                 project_name=None, match_selected=True, rolling=None):
+        self.log_store = log_store or GitLogStore()
+        self.match_selected = match_selected
+        self.rolling = rolling
+        self.buckets = {}
+        self.registered_repos = registered_repos or []
+        self.project_path = project_path
+        self.project_name = project_name
+        self._normalized_project_path = (
+            os.path.abspath(project_path) if project_path else None
+        )
+
+        self.summary = build_empty_summary()
+        self.global_overview = build_empty_overview()
+        self.project_overview = build_empty_overview()
+
+        self._entry_paths = []
+        self._project_entry_paths = []
+        self._seen_entry_paths = set()
+        self._seen_project_paths = set()
+        self._message_counts = {}
+        self._summary_fallback_os = Counter()
+        self._global_fallback_os = Counter()
+        self._project_fallback_os = Counter()
+
+    @property
+    def total_runs(self):
+        return self.summary["total_runs"]
+
+    def consume(self, entries):
+        for entry in entries:
+            self.add(entry)
+        return self
+
+    def _get_message_counts(self, project_path):
+        if project_path not in self._message_counts:
+            try:
+                counts = Counter(self.log_store.get(project_path))
+            except (OSError, subprocess.SubprocessError):
+                counts = None
+            self._message_counts[project_path] = counts
+        return self._message_counts[project_path]
+
+    def _matches_project(self, entry, project_name, entry_path):
+        if self._normalized_project_path:
+            return (
+                entry_path is not None
+                and os.path.abspath(entry_path) == self._normalized_project_path
+            )
+        if self.project_name:
+            return project_name == self.project_name
+        return True
+
+    def add(self, entry):
+        summary = self.summary
         project_name = get_project_name(entry)
-        summary["projects"].add(project_name)
-        outcome = entry.get("outcome", "committed")
-        is_committed = outcome != "canceled"
+        project_path = get_project_path(entry)
+        is_committed = entry.get("outcome", "committed") != "canceled"
+        entry_os = get_entry_os_name(entry) if is_committed else None
 
+        summary["total_runs"] += 1
+        summary["projects"].add(project_name)
         if is_committed:
             summary["total_commits"] += 1
         else:
@@ -463,6 +1035,9 @@ def summarize_entries(entries):
         if selected_index is not None:
             summary["selected_indexes"][str(selected_index)] += 1
 
+        if self.rolling:
+            self._add_to_bucket(entry, is_committed)
+
         plan = entry.get("plan") or {}
         for provider in plan.get("generators") or []:
             summary["generator_usage_by_project_provider"][(project_name, provider)] += 1
@@ -486,82 +1061,168 @@ def summarize_entries(entries):
                 summary["canceled_displayed_by_project_provider"][key] += 1
             if isinstance(elapsed, (int, float)):
                 summary["avg_displayed_elapsed_by_project_provider"][key].append(elapsed)
+                summary["elapsed_by_provider"][provider].append(elapsed)
+                model = displayed.get("model")
+                if model:
+                    summary["elapsed_by_provider_model"][(provider, model)].append(elapsed)
 
-    summarize_committed_os(entries, summary)
-    summarize_selected_commits(entries, summary)
-    return summary
-
+        if project_path:
+            if project_path not in self._seen_entry_paths:
+                self._seen_entry_paths.add(project_path)
+                self._entry_paths.append(project_path)
+        elif entry_os:
+            self._summary_fallback_os[entry_os] += 1
+
+        if is_committed and self.match_selected:
+            self._add_selected_commit(entry, project_name, project_path)
+
+        self._add_to_overview(self.global_overview, project_name, is_committed)
+        if entry_os:
+            self._global_fallback_os[entry_os] += 1
+
+        if self._matches_project(entry, project_name, project_path):
+            self._add_to_overview(self.project_overview, project_name, is_committed)
+            if project_path and project_path not in self._seen_project_paths:
+                self._seen_project_paths.add(project_path)
+                self._project_entry_paths.append(project_path)
+            if entry_os:
+                self._project_fallback_os[entry_os] += 1
+
+    def _add_to_bucket(self, entry, is_committed):
+        timestamp = parse_entry_timestamp(entry)
+        if timestamp is None:
+            return
+        bucket_start = timestamp.date()
+        if self.rolling == "weekly":
+            bucket_start -= timedelta(days=bucket_start.weekday())
+
+        bucket = self.buckets.get(bucket_start)
+        if bucket is None:
+            bucket = {
+                "runs": 0,
+                "commits": 0,
+                "elapsed": ElapsedStats(),
+                "elapsed_by_provider": defaultdict(ElapsedStats),
+            }
+            self.buckets[bucket_start] = bucket
+        bucket["runs"] += 1
+        if is_committed:
+            bucket["commits"] += 1
+        for displayed in entry.get("displayed_messages") or []:
+            provider = displayed.get("provider")
+            elapsed = displayed.get("elapsed")
+            if provider and isinstance(elapsed, (int, float)):
+                bucket["elapsed"].append(elapsed)
+                bucket["elapsed_by_provider"][provider].append(elapsed)
 
-def build_overview_summary(entries, project_path=None, project_name=None):
-    overview = build_empty_overview()
-    normalized_path = os.path.abspath(project_path) if project_path else None
-    filtered_entries = []
-    filtered_project_paths = []
-    seen_paths = set()
+    def _add_selected_commit(self, entry, project_name, project_path):
+        selected_provider = None
+        selected_elapsed = None
 
-    for entry in entries:
-        entry_project_name = get_project_name(entry)
-        entry_project_path = get_project_path(entry)
-        entry_project_path_normalized = (
-            os.path.abspath(entry_project_path) if entry_project_path else None
-        )
+        # Prefer the stamp of the commit that actually landed in git.
+        message_counts = self._get_message_counts(project_path) if project_path else None
+        if message_counts is not None:
+            final_message = (entry.get("final_message") or "").strip()
+            if final_message and message_counts.get(final_message, 0) > 0:
+                message_counts[final_message] -= 1
+                trailer = parse_commit_trailer(final_message)
+                selected_provider = trailer.provider
+                selected_elapsed = trailer.elapsed
 
-        matches_project = True
-        if normalized_path:
-            matches_project = entry_project_path_normalized == normalized_path
-        elif project_name:
-            matches_project = entry_project_name == project_name
+        if not selected_provider:
+            selected_candidate = entry.get("selected_candidate") or {}
+            selected_provider = selected_candidate.get("provider")
+            selected_elapsed = selected_candidate.get("elapsed")
+            if not selected_provider:
+                return
 
-        if not matches_project:
-            continue
+        key = (project_name, selected_provider)
+        self.summary["selection_by_project_provider"][key] += 1
+        if isinstance(selected_elapsed, (int, float)):
+            self.summary["avg_selected_elapsed_by_project_provider"][key].append(
+                selected_elapsed
+            )
 
-        filtered_entries.append(entry)
-        overview["projects"].add(entry_project_name)
+    @staticmethod
+    def _add_to_overview(overview, project_name, is_committed):
+        overview["projects"].add(project_name)
         overview["total_runs"] += 1
-        if entry_project_path and entry_project_path not in seen_paths:
-            seen_paths.add(entry_project_path)
-            filtered_project_paths.append(entry_project_path)
-
-        if entry.get("outcome", "committed") == "canceled":
-            overview["total_canceled"] += 1
-        else:
+        if is_committed:
             overview["total_commits"] += 1
+        else:
+            overview["total_canceled"] += 1
 
-    scope_paths = [project_path] if project_path else filtered_project_paths
-    os_summary = summarize_os_for_scope(filtered_entries, scope_paths)
-    overview["runs_by_os"] = os_summary["runs_by_os"]
-    overview["os_total_runs"] = os_summary["os_total_runs"]
-    return overview
-
-
-def build_global_overview(entries, registered_repos=None):
-    overview = build_empty_overview()
-    filtered_entries = list(entries)
-    registered_paths = []
-    seen_paths = set()
-
-    for repo_path in registered_repos or []:
-        normalized = os.path.abspath(repo_path)
-        if normalized in seen_paths:
-            continue
-        seen_paths.add(normalized)
-        registered_paths.append(normalized)
-
-    if not registered_paths:
-        registered_paths = collect_project_paths_from_entries(entries)
+    def _add_log_os_counts(self, target, project_paths):
+        loaded = False
+        for project_path in project_paths:
+            try:
+                os_counts = self.log_store.get_os_counts(project_path)
+            except (OSError, subprocess.SubprocessError):
+                continue
+            loaded = True
+            for os_name, count in os_counts.items():
+                target["runs_by_os"][os_name] += count
+                target["os_total_runs"] += count
+        return loaded
+
+    @staticmethod
+    def _add_fallback_os(target, os_counts):
+        for os_name, count in os_counts.items():
+            target["runs_by_os"][os_name] += count
+            target["os_total_runs"] += count
+
+    def _unique_paths(self, project_paths):
+        unique_paths = []
+        seen_paths = set()
+        for project_path in project_paths:
+            if project_path and project_path not in seen_paths:
+                seen_paths.add(project_path)
+                unique_paths.append(project_path)
+        return unique_paths
+
+    def build_summary(self):
+        self._add_log_os_counts(self.summary, self._entry_paths)
+        self._add_fallback_os(self.summary, self._summary_fallback_os)
+        return self.summary
+
+    def build_global_overview(self):
+        registered_paths = self._unique_paths(
+            os.path.abspath(repo_path) for repo_path in self.registered_repos
+        )
+        scope_paths = registered_paths or self._entry_paths
+        self._add_log_os_counts(self.global_overview, scope_paths)
+        if not scope_paths:
+            self._add_fallback_os(self.global_overview, self._global_fallback_os)
+        return self.global_overview
+
+    def build_project_overview(self):
+        scope_paths = [self.project_path] if self.project_path else self._project_entry_paths
+        self._add_log_os_counts(self.project_overview, scope_paths)
+        if not scope_paths:
+            self._add_fallback_os(self.project_overview, self._project_fallback_os)
+        return self.project_overview
+
+
+def summarize_entries(entries, log_store=None):
+    return HistoryAggregator(log_store).consume(entries).build_summary()
+
+
+def build_overview_summary(entries, project_path=None, project_name=None,
+                           log_store=None):
+    aggregator = HistoryAggregator(
+        log_store,
+        project_path=project_path,
+        project_name=project_name,
+        match_selected=False,
+    )
+    return aggregator.consume(entries).build_project_overview()
 
-    for entry in filtered_entries:
-        overview["projects"].add(get_project_name(entry))
-        overview["total_runs"] += 1
-        if entry.get("outcome", "committed") == "canceled":
-            overview["total_canceled"] += 1
-        else:
-            overview["total_commits"] += 1
 
-    os_summary = summarize_os_for_scope(filtered_entries, registered_paths)
-    overview["runs_by_os"] = os_summary["runs_by_os"]
-    overview["os_total_runs"] = os_summary["os_total_runs"]
-    return overview
+def build_global_overview(entries, registered_repos=None, log_store=None):
+    aggregator = HistoryAggregator(
+        log_store, registered_repos=registered_repos, match_selected=False
+    )
+    return aggregator.consume(entries).build_global_overview()
 
 
 def compute_provider_rows(summary):
@@ -617,9 +1278,72 @@ def compute_provider_rows(summary):
     return rows
 
 
+def compute_latency_rows(summary):
+    """p50/p90/p99 of shown-candidate latency per provider, then per model."""
+    rows = []
+    elapsed_by_provider = summary.get("elapsed_by_provider") or {}
+    elapsed_by_provider_model = summary.get("elapsed_by_provider_model") or {}
+    models_by_provider = defaultdict(list)
+    for provider, model in elapsed_by_provider_model:
+        models_by_provider[provider].append(model)
+
+    def build_row(provider, model, stats):
+        p50, p90, p99 = stats.quantiles(LATENCY_QUANTILES)
+        return {
+            "provider": provider,
+            "model": model,
+            "samples": len(stats),
+            "avg": stats.mean(),
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+        }
+
+    for provider in sorted(elapsed_by_provider, key=str.lower):
+        rows.append(build_row(provider, None, elapsed_by_provider[provider]))
+        for model in sorted(models_by_provider[provider], key=str.lower):
+            rows.append(build_row(
+                provider, model, elapsed_by_provider_model[(provider, model)]
+            ))
+    return rows
+
+
+def compute_rolling_rows(buckets, rolling="daily"):
+    """One row per daily/weekly bucket, followed by per-provider latency rows."""
+    rows = []
+    for bucket_start in sorted(buckets):
+        bucket = buckets[bucket_start]
+        if rolling == "weekly":
+            year, week, _ = bucket_start.isocalendar()
+            label = f"{year}-W{week:02d}"
+        else:
+            label = bucket_start.isoformat()
+
+        def build_row(provider, stats, runs=None, commits=None):
+            p50, p90, _ = stats.quantiles(LATENCY_QUANTILES)
+            return {
+                "bucket": label,
+                "provider": provider,
+                "runs": runs,
+                "commits": commits,
+                "acceptance": safe_pct(commits, runs) if runs else None,
+                "samples": len(stats),
+                "avg": stats.mean(),
+                "p50": p50,
+                "p90": p90,
+            }
+
+        rows.append(build_row(None, bucket["elapsed"], bucket["runs"], bucket["commits"]))
+        for provider in sorted(bucket["elapsed_by_provider"], key=str.lower):
+            rows.append(build_row(provider, bucket["elapsed_by_provider"][provider]))
+    return rows
+
+
 def _avg(values):
     if not values:
         return None
+    if isinstance(values, ElapsedStats):
+        return values.mean()
     return sum(values) / len(values)
 
 
@@ -678,8 +1402,20 @@ def get_acceptance_style(value):
     return "red"
 
 
-def render_summary(entries, summary, provider_rows, global_overview, project_overview, project_label):
-    if HAS_RICH:
+def has_rich():
+    """Import rich on first table render; machine-readable formats never load it."""
+    global RICH_IMPORT_ERROR
+    try:
+        import rich  # noqa: F401
+    except ImportError as exc:
+        RICH_IMPORT_ERROR = exc
+        return False
+    return True
+
+
+def render_summary(entries, summary, provider_rows, global_overview, project_overview, project_label,
+                   rolling_rows=None):
+    if has_rich():
         _render_rich_summary(
             entries,
             summary,
@@ -687,6 +1423,7 @@ def render_summary(entries, summary, provider_rows, global_overview, project_ove
             global_overview,
             project_overview,
             project_label,
+            rolling_rows,
         )
         return
     _render_plain_summary(
@@ -696,10 +1433,31 @@ def render_summary(entries, summary, provider_rows, global_overview, project_ove
         global_overview,
         project_overview,
         project_label,
+        rolling_rows,
     )
 
 
+def _format_rolling_cells(row):
+    is_bucket = row["provider"] is None
+    return [
+        row["bucket"] if is_bucket else "",
+        row["provider"] or "(all)",
+        str(row["runs"]) if is_bucket else "",
+        str(row["commits"]) if is_bucket else "",
+        format_pct(row["acceptance"]) if row["acceptance"] is not None else "",
+        str(row["samples"]),
+        format_seconds(row["avg"]),
+        format_seconds(row["p50"]),
+        format_seconds(row["p90"]),
+    ]
+
+
+ROLLING_HEADERS = ["Period", "Provider", "Runs", "Commits", "Accept", "Shown", "Avg", "P50", "P90"]
+
+
 def _build_overview_text(overview, provider_rows=None):
+    from rich.text import Text
+
     total_runs = overview["total_runs"]
     total_commits = overview["total_commits"]
     total_canceled = overview["total_canceled"]
@@ -733,7 +1491,12 @@ def _build_overview_text(overview, provider_rows=None):
     return overview_text
 
 
-def _render_rich_summary(entries, summary, provider_rows, global_overview, project_overview, project_label):
+def _render_rich_summary(entries, summary, provider_rows, global_overview, project_overview, project_label,
+                         rolling_rows=None):
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.table import Table
+
     console = Console()
     console.print(
         Panel(
@@ -782,6 +1545,37 @@ def _render_rich_summary(entries, summary, provider_rows, global_overview, proje
         )
     console.print(provider_table)
 
+    latency_table = Table(title="Shown Latency Percentiles", header_style="bold cyan")
+    latency_table.add_column("Provider", style="bold")
+    latency_table.add_column("Model")
+    latency_table.add_column("Samples", justify="right")
+    latency_table.add_column("Avg", justify="right")
+    latency_table.add_column("P50", justify="right")
+    latency_table.add_column("P90", justify="right")
+    latency_table.add_column("P99", justify="right")
+    for row in compute_latency_rows(summary):
+        latency_table.add_row(
+            row["provider"] if row["model"] is None else "",
+            row["model"] or "(all)",
+            str(row["samples"]),
+            format_seconds(row["avg"]),
+            format_seconds(row["p50"]),
+            format_seconds(row["p90"]),
+            format_seconds(row["p99"]),
+        )
+    console.print(latency_table)
+
+    if rolling_rows:
+        rolling_table = Table(title="Rolling Activity", header_style="bold cyan")
+        for header in ROLLING_HEADERS:
+            if header in {"Period", "Provider"}:
+                rolling_table.add_column(header, style="bold")
+            else:
+                rolling_table.add_column(header, justify="right")
+        for row in rolling_rows:
+            rolling_table.add_row(*_format_rolling_cells(row))
+        console.print(rolling_table)
+
     idx_table = Table(title="Selection Position", header_style="bold magenta")
     idx_table.add_column("Choice")
     idx_table.add_column("Count", justify="right")
@@ -820,7 +1614,8 @@ def _print_plain_overview(title, overview, provider_rows=None):
     print()
 
 
-def _render_plain_summary(entries, summary, provider_rows, global_overview, project_overview, project_label):
+def _render_plain_summary(entries, summary, provider_rows, global_overview, project_overview, project_label,
+                          rolling_rows=None):
     _print_plain_overview("History Overview Global", global_overview, provider_rows)
     _print_plain_overview(f"History Overview Project ({project_label})", project_overview)
     print("Acceptance Relative And Average Time")
@@ -858,6 +1653,31 @@ def _render_plain_summary(entries, summary, provider_rows, global_overview, proj
     ]
     _print_plain_table(provider_headers, provider_rows_text)
 
+    print()
+    print("Shown Latency Percentiles")
+    latency_headers = ["Provider", "Model", "Samples", "Avg", "P50", "P90", "P99"]
+    latency_rows = [
+        [
+            row["provider"],
+            row["model"] or "(all)",
+            str(row["samples"]),
+            format_seconds(row["avg"]),
+            format_seconds(row["p50"]),
+            format_seconds(row["p90"]),
+            format_seconds(row["p99"]),
+        ]
+        for row in compute_latency_rows(summary)
+    ]
+    _print_plain_table(latency_headers, latency_rows)
+
+    if rolling_rows:
+        print()
+        print("Rolling Activity")
+        _print_plain_table(
+            ROLLING_HEADERS,
+            [_format_rolling_cells(row) for row in rolling_rows],
+        )
+
     print()
     print("Selection Position")
     idx_headers = ["Choice", "Count", "Rate"]
@@ -882,7 +1702,7 @@ def _print_plain_table(headers, rows):
     terminal_width = shutil.get_terminal_size(fallback=(120, 24)).columns
     numeric_columns = {
         idx for idx, header in enumerate(headers)
-        if header not in {"Project", "Provider"}
+        if header not in {"Project", "Provider", "Model", "Period"}
     }
     widths = []
     for idx, header in enumerate(headers):
@@ -895,7 +1715,7 @@ def _print_plain_table(headers, rows):
         overflow = minimum_width - terminal_width
         text_indexes = [
             idx for idx, header in enumerate(headers)
-            if header in {"Project", "Provider"}
+            if header in {"Project", "Provider", "Model", "Period"}
         ]
         for text_idx in text_indexes:
             if overflow <= 0:
@@ -929,40 +1749,215 @@ def _print_plain_table(headers, rows):
         print(format_row(row))
 
 
-def main():
+REPORT_FORMATS = ("table", "json", "csv", "prometheus")
+EXPORT_LABELS = ("scope", "project", "provider", "model", "period", "os", "choice")
+EXPORT_COUNTERS = ("total_runs", "total_commits", "total_canceled", "os_total_runs")
+
+
+def _serialize_overview(overview):
+    return {
+        **{key: overview[key] for key in EXPORT_COUNTERS},
+        "projects": sorted(overview["projects"], key=str.lower),
+        "runs_by_os": dict(sorted(overview["runs_by_os"].items())),
+    }
+
+
+def build_report_payload(summary, provider_rows, global_overview, project_overview, project_label,
+                         latency_rows=None, rolling_rows=None):
+    """Plain-data view of a report, ready for json.dumps."""
+    return {
+        "project": project_label,
+        "summary": {
+            **_serialize_overview(summary),
+            "selected_indexes": {
+                choice: count
+                for choice, count in sorted(
+                    summary["selected_indexes"].items(), key=lambda item: int(item[0])
+                )
+            },
+        },
+        "global_overview": _serialize_overview(global_overview),
+        "project_overview": _serialize_overview(project_overview),
+        "providers": provider_rows,
+        "latency": compute_latency_rows(summary) if latency_rows is None else latency_rows,
+        "rolling": rolling_rows or [],
+    }
+
+
+def iter_report_metrics(payload):
+    """Flatten a report payload into (section, labels, metric, value) samples."""
+    for scope in ("summary", "global_overview", "project_overview"):
+        overview = payload[scope]
+        labels = {"scope": scope}
+        if scope == "project_overview":
+            labels["project"] = payload["project"]
+        for key in EXPORT_COUNTERS:
+            yield "history", labels, key.replace("total_", ""), overview[key]
+        yield "history", labels, "projects", len(overview["projects"])
+        for os_name, count in overview["runs_by_os"].items():
+            yield "history", {**labels, "os": os_name}, "runs_by_os", count
+
+    for choice, count in payload["summary"]["selected_indexes"].items():
+        yield "history", {"choice": choice}, "selected_index", count
+
+    for row in payload["providers"]:
+        labels = {"project": row["project"], "provider": row["provider"]}
+        for metric, value in row.items():
+            if metric not in labels and value is not None:
+                yield "provider", labels, metric, value
+
+    for row in payload["latency"]:
+        labels = {"provider": row["provider"], "model": row["model"]}
+        for metric in ("samples", "avg", "p50", "p90", "p99"):
+            if row[metric] is not None:
+                yield "latency", labels, metric, row[metric]
+
+    for row in payload["rolling"]:
+        labels = {"period": row["bucket"], "provider": row["provider"]}
+        for metric in ("runs", "commits", "acceptance", "samples", "avg", "p50", "p90"):
+            if row[metric] is not None:
+                yield "rolling", labels, metric, row[metric]
+
+
+def format_report_json(payload):
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def format_report_csv(payload):
+    """Long-format CSV: one metric sample per row, labels as columns."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["section", *EXPORT_LABELS, "metric", "value"])
+    for section, labels, metric, value in iter_report_metrics(payload):
+        writer.writerow([
+            section,
+            *(labels.get(label) or "" for label in EXPORT_LABELS),
+            metric,
+            value,
+        ])
+    return output.getvalue()
+
+
+def _escape_prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_report_prometheus(payload):
+    """Prometheus text exposition format, one gauge family per metric."""
+    families = defaultdict(list)
+    for section, labels, metric, value in iter_report_metrics(payload):
+        name = f"gcm_{section}_{metric}"
+        label_text = ",".join(
+            f'{label}="{_escape_prometheus_label(labels[label])}"'
+            for label in EXPORT_LABELS
+            if labels.get(label) is not None
+        )
+        sample = f"{name}{{{label_text}}}" if label_text else name
+        families[name].append(f"{sample} {value!r}")
+
+    lines = []
+    for name, samples in families.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+REPORT_FORMATTERS = {
+    "json": format_report_json,
+    "csv": format_report_csv,
+    "prometheus": format_report_prometheus,
+}
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Summarize gcm provider acceptance and latency."
+    )
+    parser.add_argument("--since", help="only runs at or after this ISO date/datetime or age (e.g. 30d)")
+    parser.add_argument("--until", help="only runs at or before this ISO date (whole day)/datetime or age")
+    parser.add_argument("--window", help="length of the window ending at --until or now (e.g. 7d, 2w); not with --since")
+    parser.add_argument(
+        "--rolling",
+        choices=ROLLING_PERIODS,
+        help="add a daily or weekly time-series of runs, acceptance and latency",
+    )
+    parser.add_argument(
+        "--format",
+        choices=REPORT_FORMATS,
+        default="table",
+        help="print terminal tables (default) or export json, csv or prometheus metrics",
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_argument_parser()
+    args = parser.parse_args([] if argv is None else argv)
+    try:
+        window = build_time_window(args.since, args.until, args.window)
+    except ValueError as exc:
+        parser.error(str(exc))
+
     config = load_config()
-    history_path = config.get("history_json_path", "~/.gcm_history.jsonl")
-    entries = load_history_entries(history_path)
+    history_format = config.get("history_format", "jsonl")
+    if history_format == "binary":
+        history_path = config.get("history_binary_path", "~/.gcm_history.gch")
+    else:
+        history_path = config.get("history_json_path", "~/.gcm_history.jsonl")
     current_project_path = os.path.abspath(os.getcwd())
     current_project_name = os.path.basename(current_project_path) or current_project_path
     registered_repos = load_registered_repos()
+    log_store = build_git_log_store(config, window)
+    log_store.prefetch([*registered_repos, current_project_path])
+
+    def build_aggregator(entries):
+        aggregator = HistoryAggregator(
+            log_store,
+            registered_repos=registered_repos,
+            project_path=current_project_path,
+            project_name=current_project_name,
+            rolling=args.rolling,
+        )
+        return aggregator.consume(entries)
 
-    if not entries:
+    aggregator = build_aggregator(iter_history_entries(history_path, history_format, window))
+    if not aggregator.total_runs:
         git_log_paths = [current_project_path, *registered_repos]
-        entries = load_git_log_entries(git_log_paths)
-        if not entries:
+        aggregator = build_aggregator(iter_git_log_entries(git_log_paths, log_store))
+        if not aggregator.total_runs and args.format == "table":
             print(f"No structured history found at {os.path.expanduser(history_path)}")
             print("No git history found for the current or registered repositories.")
             return 0
 
-    summary = summarize_entries(entries)
-    global_overview = build_global_overview(entries, registered_repos)
-    project_overview = build_overview_summary(
-        entries,
-        project_path=current_project_path,
-        project_name=current_project_name,
-    )
+    summary = aggregator.build_summary()
+    global_overview = aggregator.build_global_overview()
+    project_overview = aggregator.build_project_overview()
     provider_rows = compute_provider_rows(summary)
+    rolling_rows = (
+        compute_rolling_rows(aggregator.buckets, args.rolling) if args.rolling else None
+    )
+    if args.format != "table":
+        payload = build_report_payload(
+            summary,
+            provider_rows,
+            global_overview,
+            project_overview,
+            current_project_name,
+            rolling_rows=rolling_rows,
+        )
+        sys.stdout.write(REPORT_FORMATTERS[args.format](payload))
+        return 0
     render_summary(
-        entries,
+        None,
         summary,
         provider_rows,
         global_overview,
         project_overview,
         current_project_name,
+        rolling_rows,
     )
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(sys.argv[1:]))
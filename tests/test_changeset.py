@@ -0,0 +1,114 @@
+import unittest
+
+import changeset
+from utils import UntrackedSummary
+
+
+class ChangesetTests(unittest.TestCase):
+    def test_rollup_collapses_sequences_and_mirrored_roots(self):
+        changes = {
+            "Add": [
+                *(f"Sources/Kali/{index:03d}.png" for index in range(1, 80)),
+                *(f"Outputs/Kali/{index:03d}.png" for index in range(1, 80)),
+                '"docs/caf\\303\\251.md"',
+            ],
+            "Change": ["src/app.py", "src\\util.py"],
+            "Delete": ["old/1.txt", "old/2.txt", "old/7.txt"],
+        }
+
+        rollup = changeset.build_change_rollup(changes)
+
+        self.assertEqual(rollup.totals, {"Add": 80, "Change": 2, "Delete": 3})
+        self.assertEqual(rollup.duplicates, 79)
+        self.assertEqual(
+            [group.describe() for group in rollup.groups],
+            [
+                "Sources/Kali/*.png: 79 added [001.png..079.png]",
+                "old/*.txt: 3 removed [1.txt, 2.txt, 7.txt]",
+                "src/*.py: 2 modified [app.py, util.py]",
+                "docs/*.md: 1 added [café.md]",
+            ],
+        )
+        self.assertEqual(
+            changeset.format_change_rollup(rollup, max_groups=2),
+            "Totals: 80 added, 2 modified, 3 removed (79 mirrored across roots counted once); "
+            "By directory: Sources (79 added), old (3 removed), src (2 modified), docs (1 added); "
+            "Sources/Kali/*.png: 79 added [001.png..079.png]; "
+            "old/*.txt: 3 removed [1.txt, 2.txt, 7.txt]; "
+            "others (2 groups): 1 added, 2 modified",
+        )
+
+    def test_untracked_counts_fold_into_totals_and_groups(self):
+        untracked = UntrackedSummary(
+            directories={"build/out": 4000, "": 2}, files=4002,
+            trees=["dist", "node_modules"], truncated=True,
+        )
+        changes = {"Change": ["src/app.py"], "Untracked": untracked}
+
+        rollup = changeset.build_change_rollup(changes)
+
+        self.assertEqual(changeset.count_changes(changes), 4005)
+        self.assertEqual(rollup.totals, {"Add": 4002, "Change": 1, "Delete": 0})
+        self.assertEqual(
+            changeset.format_change_rollup(rollup),
+            "Totals: 4002 added, 1 modified (more untracked files not counted); "
+            "By directory: build (4000 added), . (2 added), src (1 modified); "
+            "build/out/*: 4000 added [4000 untracked]; "
+            "./*: 2 added [2 untracked]; "
+            "src/*.py: 1 modified [app.py]; "
+            "untracked directories, contents not counted (2): [dist/, node_modules/]",
+        )
+
+    def test_unrelated_roots_with_shared_names_are_not_deduplicated(self):
+        changes = {
+            "Add": [
+                "frontend/src/index.js",
+                "frontend/src/app.js",
+                "frontend/src/router.js",
+                "backend/src/index.js",
+                "backend/src/db.js",
+                "backend/src/models.js",
+            ],
+        }
+
+        rollup = changeset.build_change_rollup(changes)
+
+        self.assertEqual(rollup.duplicates, 0)
+        self.assertEqual(rollup.totals["Add"], 6)
+
+    def test_small_roots_and_other_change_types_are_never_mirrors(self):
+        changes = {
+            "Change": ["frontend/package.json", "backend/package.json"],
+            "Add": [
+                "src/__init__.py",
+                "tests/__init__.py",
+                *(f"Sources/{index}.png" for index in range(6)),
+            ],
+            "Delete": [f"Outputs/{index}.png" for index in range(6)],
+        }
+
+        rollup = changeset.build_change_rollup(changes)
+
+        self.assertEqual(rollup.duplicates, 0)
+        self.assertEqual(rollup.totals, {"Add": 8, "Change": 2, "Delete": 6})
+        self.assertIn("frontend/*.json: 1 modified [package.json]",
+                      [group.describe() for group in rollup.groups])
+        self.assertEqual(changeset.find_mirror_roots(
+            ["frontend/package.json", "backend/package.json"]
+        ), {})
+
+    def test_group_items_cap_names_and_count_the_rest(self):
+        changes = {"Add": [f"vendor/{name}.js" for name in "abcdefghijkl"]}
+
+        group = changeset.build_change_rollup(changes).groups[0]
+
+        self.assertTrue(changeset.is_large_changeset(changes, threshold=10))
+        self.assertFalse(changeset.is_large_changeset(changes, threshold=0))
+        self.assertEqual(
+            group.items(),
+            ["a.js", "b.js", "c.js", "d.js", "e.js", "f.js", "g.js", "h.js", "+4 more"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import subprocess
+import unittest
+from tempfile import TemporaryDirectory
+
+import diff_context
+
+
+SAMPLE_DIFF = """\
+diff --git a/report.py b/report.py
+index 1111111..2222222 100644
+--- a/report.py
++++ b/report.py
+@@ -10,0 +11,3 @@ class Report:
++    def render(self, rows):
++        return rows
++
+@@ -40 +43 @@ def load(path):
+-    return open(path).read()
++    return read_text(path)
+diff --git a/old.py b/old.py
+deleted file mode 100644
+index 3333333..0000000
+--- a/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-def legacy():
+-    pass
+diff --git a/logo.png b/logo.png
+index 4444444..5555555 100644
+Binary files a/logo.png and b/logo.png differ
+"""
+
+
+class DiffContextTests(unittest.TestCase):
+    def test_collect_counts_lines_and_signatures_per_file(self):
+        files, complete = diff_context.collect_diff_context(
+            SAMPLE_DIFF.splitlines(keepends=True)
+        )
+
+        self.assertTrue(complete)
+        self.assertEqual(
+            [(item.path, item.added, item.removed, item.binary) for item in files],
+            [
+                ("report.py", 4, 1, False),
+                ("old.py", 0, 2, False),
+                ("logo.png", 0, 0, True),
+            ],
+        )
+        self.assertEqual(
+            files[0].signatures,
+            ["~ class Report:", "+ def render(self, rows):", "~ def load(path):"],
+        )
+        self.assertEqual(files[1].signatures, ["- def legacy():"])
+
+    def test_pack_respects_token_budget_and_prefers_largest_files(self):
+        files = [
+            diff_context.FileDiffContext("small.py", 1, 0, signatures=["+ def tiny():"]),
+            diff_context.FileDiffContext(
+                "big.py", 300, 20,
+                signatures=[f"+ def handler_{index}(request):" for index in range(8)],
+            ),
+        ]
+
+        packed = diff_context.pack_diff_context(files, token_budget=12)
+        unbounded = diff_context.pack_diff_context(files, token_budget=1000)
+
+        self.assertLessEqual(diff_context.estimate_tokens(packed), 12)
+        self.assertEqual(packed, "big.py (+300 -20)\n... 1 more file(s) not shown")
+        self.assertEqual(
+            unbounded.splitlines()[:2], ["small.py (+1 -0)", "  + def tiny():"]
+        )
+        self.assertEqual(unbounded.count("def handler_"), 8)
+
+    def test_collect_stops_reading_once_file_list_exceeds_budget(self):
+        consumed = []
+
+        def lines():
+            for index in range(10000):
+                consumed.append(index)
+                yield f"diff --git a/file{index}.py b/file{index}.py\n"
+                yield "@@ -1 +1 @@\n"
+                yield "+x = 1\n"
+
+        files, complete = diff_context.collect_diff_context(lines(), token_budget=50)
+        packed = diff_context.pack_diff_context(files, 50, complete)
+
+        self.assertFalse(complete)
+        self.assertLess(len(consumed), 20)
+        self.assertTrue(packed.endswith("... more files not shown"))
+        self.assertLessEqual(diff_context.estimate_tokens(packed), 50)
+
+    def test_build_diff_context_streams_staged_diff(self):
+        with TemporaryDirectory() as tmpdir:
+            subprocess.run(["git", "init", "-q", tmpdir], check=True)
+            with open(os.path.join(tmpdir, "app.py"), "w", encoding="utf-8") as f:
+                f.write("def main():\n    return 0\n")
+            subprocess.run(["git", "add", "app.py"], cwd=tmpdir, check=True)
+
+            disabled = diff_context.build_diff_context({}, cwd=tmpdir)
+            enabled = diff_context.build_diff_context(
+                {"diff_context": {"enabled": True}}, cwd=tmpdir
+            )
+
+        self.assertEqual(disabled, "")
+        self.assertEqual(enabled, "app.py (+2 -0)\n  + def main():")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,14 @@
 import unittest
 from unittest.mock import patch
-from tempfile import mkstemp
+from tempfile import mkstemp, TemporaryDirectory
 import json
 import os
+import subprocess
 
 import gcm
 from apis.types import CandidateMessage, ExecutionPlan, ProviderInfo
+from apis.cache import ResponseCache
+from utils import UntrackedSummary
 
 
 class GcmTests(unittest.TestCase):
@@ -52,22 +55,6 @@ class GcmTests(unittest.TestCase):
             ["OpenRouter", "OpenAI", "Codex", "Claude", "Ollama"]
         )
 
-    def test_get_git_diff_summary_combines_staged_and_unstaged(self):
-        responses = [
-            type("Result", (), {"stdout": " 1 file changed, 2 insertions(+)\n"})(),
-            type("Result", (), {"stdout": " 2 files changed, 3 deletions(-)\n"})(),
-        ]
-
-        with patch("gcm.subprocess.run", side_effect=responses) as run_mock:
-            summary = gcm.get_git_diff_summary()
-
-        self.assertEqual(
-            summary,
-            "Staged: 1 file changed, 2 insertions(+)\n"
-            "Unstaged: 2 files changed, 3 deletions(-)"
-        )
-        self.assertEqual(run_mock.call_count, 2)
-
     def test_build_commit_message_omits_location_by_default(self):
         with patch("gcm.get_commit_count", return_value=41):
             message = gcm.build_commit_message(
@@ -118,6 +105,34 @@ class GcmTests(unittest.TestCase):
         self.assertIn("⚠️: 2 files changed, 3 deletions(-)", message)
         self.assertNotIn("Unstaged:", message)
 
+    def test_build_commit_message_reuses_run_stamp(self):
+        stamp = {
+            "number": "00,000,000,042",
+            "timestamp": "2026-01-02 03:04:05.678",
+            "location": None,
+        }
+
+        with patch("gcm.get_commit_count") as get_commit_count_mock:
+            messages = [
+                gcm.build_commit_message(
+                    env="LINUX",
+                    emoji="🐧",
+                    machine="box",
+                    summary="📝: 1 file",
+                    suggestion=suggestion,
+                    diff_summary="",
+                    provider="OpenAI",
+                    model="gpt-5-mini",
+                    elapsed=1.0,
+                    stamp=stamp,
+                )
+                for suggestion in ("fix: one", "fix: two")
+            ]
+
+        get_commit_count_mock.assert_not_called()
+        for message in messages:
+            self.assertIn("🆔: 00,000,000,042 | 🕒: 2026-01-02 03:04:05.678", message)
+
     def test_build_change_rollup_summary_uses_counts_not_filenames(self):
         summary = gcm.build_change_rollup_summary(
             {
@@ -131,6 +146,104 @@ class GcmTests(unittest.TestCase):
         self.assertNotIn("README.md", summary)
         self.assertNotIn("test.bash", summary)
 
+    def test_classify_changes_keeps_untracked_files_counted(self):
+        untracked = UntrackedSummary()
+        for path in ("build/a.o", "build/b.o", "dist/"):
+            untracked.add(path)
+        untracked.truncated = True
+
+        changes = gcm.classify_changes([("M ", "app.py")], untracked)
+
+        self.assertEqual(changes["Add"], [])
+        self.assertIs(changes["Untracked"], untracked)
+        self.assertEqual(untracked.directories, {"build": 2})
+        self.assertEqual(untracked.trees, ["dist"])
+        self.assertEqual(
+            gcm.build_change_rollup_summary(changes), "🆕: 2 files+, 1 untracked directory; 📝: 1 file"
+        )
+        self.assertNotIn("Untracked", gcm.classify_changes([], UntrackedSummary()))
+
+    def test_build_prompt_uses_rollups_and_summarizes_large_changesets(self):
+        changes = {
+            "Add": [f"images/{index:03d}.png" for index in range(1, 80)],
+            "Change": ["README.md"],
+            "Delete": [],
+        }
+        summarizer = ProviderInfo(
+            name="Ollama",
+            available=True,
+            roles=["summarize"],
+            priority=30,
+            query_fn=lambda prompt: (
+                200, "llama3", "lab screenshots" if ".png" in prompt else "", None, 0.1
+            ),
+        )
+
+        with patch.multiple("gcm", LARGE_CHANGE_THRESHOLD=10,
+                            PROMPT_TEMPLATE="{changes}|{diff}|{note}"):
+            rollup = gcm.summarize_changes(changes, summarizer)
+            prompt = gcm.build_prompt(changes, "Staged: 80 files changed", "None", "", rollup)
+            code_only = gcm.build_prompt(changes)
+
+        self.assertEqual(
+            rollup,
+            "Totals: 79 added, 1 modified; By directory: images (79 added), . (1 modified); "
+            "images/*.png: 79 added [001.png..079.png] (lab screenshots); "
+            "./*.md: 1 modified [README.md]",
+        )
+        self.assertTrue(prompt.startswith(rollup))
+        self.assertNotIn("002.png", prompt)
+        self.assertNotIn("lab screenshots", code_only)
+        self.assertIn("images/*.png: 79 added [001.png..079.png];", code_only)
+
+    def test_build_prompt_labels_diff_context_as_not_quotable(self):
+        with patch.multiple("gcm", PROMPT_TEMPLATE="{diff}"):
+            prompt = gcm.build_prompt(
+                {"Change": ["app.py"]}, "Staged: 1 file changed", "",
+                "app.py (+2 -0)\n  + def main():", "rollup",
+            )
+
+        self.assertEqual(
+            prompt,
+            "Staged: 1 file changed\n\n"
+            "Changed files and signatures (context only; never quote or list "
+            "these paths or names):\napp.py (+2 -0)\n  + def main():",
+        )
+
+    def test_classify_changes_handles_every_porcelain_code(self):
+        changes = gcm.classify_changes([
+            ("??", "untracked.txt"),
+            ("A ", "added.py"),
+            ("AM", "added_then_edited.py"),
+            ("C ", "copy.py"),
+            ("M ", "staged.py"),
+            ("MM", "staged_and_unstaged.py"),
+            ("R ", "renamed.py"),
+            ("RM", "renamed_then_edited.py"),
+            ("T ", "link"),
+            ("UU", "conflict.txt"),
+            ("AA", "both_added.txt"),
+            ("AU", "added_by_us.txt"),
+            ("UA", "added_by_them.txt"),
+            ("DU", "deleted_by_us.txt"),
+            ("UD", "deleted_by_them.txt"),
+            ("DD", "both_deleted.txt"),
+            (" D", "removed.txt"),
+            ("RD", "renamed_then_removed.py"),
+            ("AD", "added_then_removed.py"),
+        ])
+
+        self.assertEqual(changes, {
+            "Add": ["untracked.txt", "added.py", "added_then_edited.py", "copy.py"],
+            "Change": [
+                "staged.py", "staged_and_unstaged.py", "renamed.py",
+                "renamed_then_edited.py", "link", "conflict.txt",
+                "both_added.txt", "added_by_us.txt", "added_by_them.txt",
+                "deleted_by_us.txt", "deleted_by_them.txt", "both_deleted.txt",
+            ],
+            "Delete": ["removed.txt", "renamed_then_removed.py", "added_then_removed.py"],
+        })
+
     def test_sanitize_suggestion_line_redacts_filename_lists(self):
         sanitized = gcm.sanitize_suggestion_line(
             'feat: update "test.bash", "test.bat" and "test_runner.py"'
@@ -261,6 +374,134 @@ class GcmTests(unittest.TestCase):
 
         self.assertEqual(json.loads(saved), entry)
 
+    def _make_repo(self, root, name):
+        repo_path = os.path.join(root, name)
+        os.makedirs(repo_path)
+        for args in (
+            ["init", "-q"],
+            ["config", "user.name", "gcm"],
+            ["config", "user.email", "gcm@example.com"],
+        ):
+            subprocess.run(["git", *args], cwd=repo_path, check=True)
+        with open(os.path.join(repo_path, "app.py"), "w", encoding="utf-8") as f:
+            f.write("print('hi')\n")
+        subprocess.run(["git", "add", "app.py"], cwd=repo_path, check=True)
+        return repo_path
+
+    def _batch_provider(self):
+        return ProviderInfo(
+            name="Ollama",
+            available=True,
+            roles=["generate"],
+            priority=30,
+            query_fn=lambda prompt: (200, "llama3", "feat: add app", None, 0.1),
+        )
+
+    def test_run_batch_commits_staged_changes_without_confirmation(self):
+        with TemporaryDirectory() as root:
+            repo_path = self._make_repo(root, "one")
+            with patch("report_history.load_registered_repos",
+                       return_value=[repo_path]), \
+                    patch("gcm.discover_available_providers",
+                          return_value=[self._batch_provider()]), \
+                    patch.multiple("gcm", USE_CONFIRM=False, SAVE_HISTORY=False,
+                                   INCLUDE_LOCATION=False), \
+                    patch("gcm.build_response_cache", return_value=None), \
+                    patch("sys.stdout"):
+                exit_code = gcm.run_batch("None")
+
+            log = subprocess.run(
+                ["git", "log", "--pretty=%B"],
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+        self.assertEqual(exit_code, 0)
+        self.assertIn("🤖: Ollama 🧠: llama3", log)
+
+    def test_run_batch_writes_proposal_when_confirmation_is_enabled(self):
+        with TemporaryDirectory() as root:
+            repo_path = self._make_repo(root, "two")
+            with patch("report_history.load_registered_repos",
+                       return_value=[repo_path]), \
+                    patch("gcm.discover_available_providers",
+                          return_value=[self._batch_provider()]), \
+                    patch.multiple("gcm", USE_CONFIRM=True, SAVE_HISTORY=False,
+                                   INCLUDE_LOCATION=False), \
+                    patch("gcm.build_response_cache", return_value=None), \
+                    patch("sys.stdout"):
+                exit_code = gcm.run_batch("None")
+
+            proposal_path = os.path.join(repo_path, ".git", "GCM_PROPOSED_MSG")
+            with open(proposal_path, "r", encoding="utf-8") as f:
+                proposal = f.read()
+
+        self.assertEqual(exit_code, 0)
+        self.assertIn("✨: add app", proposal)
+        self.assertIn("🤖: Ollama 🧠: llama3", proposal)
+
+    def test_run_batch_reports_failing_repo_and_keeps_the_rest(self):
+        with TemporaryDirectory() as root:
+            good_path = self._make_repo(root, "good")
+            bad_path = self._make_repo(root, "bad")
+            real_write = gcm.write_proposed_message
+
+            def write_proposed_message(message, cwd):
+                if cwd == bad_path:
+                    raise OSError("disk full")
+                return real_write(message, cwd)
+
+            with patch("report_history.load_registered_repos",
+                       return_value=[bad_path, good_path]), \
+                    patch("gcm.discover_available_providers",
+                          return_value=[self._batch_provider()]), \
+                    patch.multiple("gcm", USE_CONFIRM=True, SAVE_HISTORY=False,
+                                   INCLUDE_LOCATION=False), \
+                    patch("gcm.build_response_cache", return_value=None), \
+                    patch("gcm.write_proposed_message",
+                          side_effect=write_proposed_message), \
+                    patch("gcm.safe_print") as print_mock:
+                exit_code = gcm.run_batch("None")
+
+            good_proposed = os.path.exists(
+                os.path.join(good_path, ".git", "GCM_PROPOSED_MSG")
+            )
+
+        lines = [call.args[0] for call in print_mock.call_args_list]
+        self.assertEqual(exit_code, 1)
+        self.assertTrue(good_proposed)
+        self.assertIn(f"❌ failed    {bad_path} (OSError: disk full)", lines)
+        self.assertTrue(any(
+            line.startswith(f"📝 proposed  {good_path} ") for line in lines
+        ))
+
+    def test_run_batch_records_cache_stats_per_repo(self):
+        with TemporaryDirectory() as root:
+            first = self._make_repo(root, "first")
+            second = self._make_repo(root, "second")
+            cache = ResponseCache(path=os.path.join(root, "cache"))
+            entries = []
+            with patch("report_history.load_registered_repos",
+                       return_value=[first, second]), \
+                    patch("gcm.discover_available_providers",
+                          return_value=[self._batch_provider()]), \
+                    patch.multiple("gcm", USE_CONFIRM=False, SAVE_HISTORY=True,
+                                   INCLUDE_LOCATION=False, BATCH_CONCURRENCY=1), \
+                    patch("gcm.build_response_cache", return_value=cache), \
+                    patch("gcm.save_to_history"), \
+                    patch("gcm.save_history_entry",
+                          side_effect=lambda entry, *args: entries.append(entry)), \
+                    patch("sys.stdout"):
+                gcm.run_batch("None")
+
+        self.assertEqual(
+            [entry["cache"] for entry in entries],
+            [{"hits": 0, "misses": 1}, {"hits": 1, "misses": 0}],
+        )
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+from tempfile import TemporaryDirectory
+
+import history_store
+import report_history
+
+
+def make_entry(outcome="committed", provider="Codex", elapsed=1.5):
+    return {
+        "timestamp": "2026-01-02T03:04:05.678",
+        "outcome": outcome,
+        "os": "LINUX",
+        "project": {"name": "GCM", "path": "/repos/GCM"},
+        "selected_index": 1 if outcome == "committed" else 0,
+        "user_note": "None",
+        "prompt_length": 1200,
+        "diff_summary": "Staged: 1 file changed, 2 insertions(+)",
+        "final_message": f"[💻host🐧] 🔀: update | 🤖: {provider} 🧠: gpt" if outcome == "committed" else "",
+        "cache": {"hits": 2, "misses": 1},
+        "selected_candidate": {
+            "provider": provider,
+            "model": "gpt-5",
+            "elapsed": elapsed,
+            "content": "feat: update",
+        },
+        "plan": {
+            "generators": ["OpenAI", provider],
+            "judge": "Claude",
+            "refiner": None,
+            "strategy": "auto",
+        },
+        "displayed_messages": [
+            {
+                "index": 1,
+                "provider": provider,
+                "model": "gpt-5",
+                "elapsed": elapsed,
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+                "message": "feat: update",
+            },
+        ],
+        "raw_candidates": [
+            {
+                "provider": "OpenAI",
+                "model": "gpt-4o",
+                "elapsed": 2.0,
+                "usage": None,
+                "content": "chore: update",
+            },
+        ],
+    }
+
+
+class HistoryStoreTests(unittest.TestCase):
+    def test_concurrent_processes_keep_strings_and_text_consistent(self):
+        script = "\n".join([
+            "import sys",
+            "import time",
+            "import history_store",
+            "store = history_store.BinaryHistoryStore(sys.argv[1])",
+            "time.sleep(max(float(sys.argv[3]) - time.time(), 0))",
+            "for index in range(400):",
+            "    label = f'{sys.argv[2]}-{index}'",
+            "    store.append({'project': {'name': label, 'path': None},",
+            "                  'final_message': label * 3})",
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.gch")
+            # Both writers start appending at the same moment.
+            start = str(time.time() + 1.0)
+            writers = [
+                subprocess.Popen(
+                    [sys.executable, "-c", script, path, name, start], cwd=root
+                )
+                for name in ("left", "right")
+            ]
+            for writer in writers:
+                self.assertEqual(writer.wait(), 0)
+
+            entries = list(history_store.BinaryHistoryStore(path).iter_entries())
+
+        self.assertEqual(len(entries), 800)
+        for entry in entries:
+            self.assertEqual(entry["final_message"], entry["project"]["name"] * 3)
+
+    def test_convert_jsonl_round_trips_entries(self):
+        entries = [make_entry(), make_entry("canceled", "OpenAI", 3.0)]
+
+        with TemporaryDirectory() as tmpdir:
+            jsonl_path = os.path.join(tmpdir, "history.jsonl")
+            binary_path = os.path.join(tmpdir, "history.gch")
+            with open(jsonl_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.write("{not json\n")
+
+            converted, skipped = history_store.convert_jsonl_to_binary(
+                jsonl_path, binary_path
+            )
+            store = history_store.BinaryHistoryStore(binary_path)
+            loaded = list(store.iter_entries(load_text=True))
+            compact = list(store.iter_entries())
+
+            with self.assertRaises(FileExistsError):
+                history_store.convert_jsonl_to_binary(jsonl_path, binary_path)
+
+        self.assertEqual((converted, skipped), (2, 1))
+        self.assertEqual(loaded, entries)
+        self.assertEqual(compact[0]["final_message"], entries[0]["final_message"])
+        self.assertIsNone(compact[0]["raw_candidates"][0]["content"])
+        self.assertEqual(compact[1]["selected_candidate"]["elapsed"], 3.0)
+
+    def test_report_reads_binary_history_and_ignores_torn_tail(self):
+        with TemporaryDirectory() as tmpdir:
+            binary_path = os.path.join(tmpdir, "history.gch")
+            store = history_store.BinaryHistoryStore(binary_path)
+            store.append(make_entry())
+            store.append(make_entry("canceled", "OpenAI", 3.0))
+            with open(binary_path, "ab") as f:
+                f.write(b"\xff\x00\x00\x00partial")
+
+            entries = list(report_history.iter_history_entries(binary_path, "binary"))
+
+        summary = report_history.summarize_entries(entries)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(summary["total_commits"], 1)
+        self.assertEqual(summary["total_canceled"], 1)
+        self.assertEqual(
+            summary["displayed_by_project_provider"][("GCM", "OpenAI")], 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from apis.OpenRouter import query_model as openrouter
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+CATALOG_PAYLOAD = {
+    "data": [
+        {
+            "id": "meta/llama-70b:free",
+            "context_length": 8000,
+            "pricing": {"prompt": "0", "completion": "0"},
+        },
+        {
+            "id": "qwen/qwen-7b:free",
+            "context_length": 128000,
+            "pricing": {"prompt": "0", "completion": "0"},
+        },
+        {
+            "id": "openai/gpt-5",
+            "context_length": 400000,
+            "pricing": {"prompt": "1", "completion": "1"},
+        },
+    ]
+}
+
+
+class OpenRouterCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.catalog_path = os.path.join(self.tmp.name, "catalog.json")
+        self.blacklist_path = os.path.join(self.tmp.name, "blacklist.txt")
+        for target, value in (
+            ("CATALOG_PATH", self.catalog_path),
+            ("BLACKLIST_PATH", self.blacklist_path),
+        ):
+            patcher = patch.object(openrouter, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_list_free_models_reuses_fresh_catalog_and_rankings(self):
+        session = FakeSession([
+            FakeResponse(200, CATALOG_PAYLOAD, {"ETag": '"v1"'}),
+        ])
+
+        with patch.object(openrouter, "get_session", return_value=session):
+            first = openrouter.list_free_models("FreeSmart")
+            second = openrouter.list_free_models("FreeCtxMax")
+
+        self.assertEqual(len(session.headers), 1)
+        self.assertEqual(first[0], "meta/llama-70b:free")
+        self.assertEqual(second[0], "qwen/qwen-7b:free")
+        self.assertNotIn("openai/gpt-5", first + second)
+
+    def test_list_free_models_revalidates_stale_catalog_with_etag(self):
+        session = FakeSession([
+            FakeResponse(200, CATALOG_PAYLOAD, {"ETag": '"v1"'}),
+            FakeResponse(304),
+        ])
+
+        with patch.object(openrouter, "get_session", return_value=session):
+            openrouter.list_free_models("FreeAll")
+            with patch.object(openrouter, "CATALOG_MAX_AGE", 0):
+                models = openrouter.list_free_models("FreeAll")
+
+        self.assertEqual(session.headers[1].get("If-None-Match"), '"v1"')
+        self.assertEqual(len(models), 2)
+
+    def test_list_free_models_reranks_when_blacklist_changes(self):
+        session = FakeSession([FakeResponse(200, CATALOG_PAYLOAD)])
+
+        with patch.object(openrouter, "get_session", return_value=session):
+            openrouter.list_free_models("FreeAll")
+            openrouter.save_to_blacklist(
+                "meta/llama-70b:free", self.blacklist_path
+            )
+            stat = os.stat(self.blacklist_path)
+            os.utime(self.blacklist_path, (stat.st_atime, time.time() + 5))
+            models = openrouter.list_free_models("FreeAll")
+
+        self.assertEqual(models, ["qwen/qwen-7b:free"])
+
+
+class OpenRouterModelStatsTests(unittest.TestCase):
+    def test_order_models_prefers_fast_reliable_and_skips_cooling(self):
+        now = 1000.0
+        stats = {}
+        openrouter.record_model_result(stats, "fast", True, 1.0, now=now)
+        openrouter.record_model_result(stats, "slow", True, 40.0, now=now)
+        openrouter.record_model_result(stats, "flaky", False, 2.0, now=now)
+
+        order = openrouter.order_models(
+            ["slow", "flaky", "fast", "new"], stats, now=now + 1
+        )
+
+        self.assertEqual(order, ["fast", "new", "slow"])
+        self.assertEqual(
+            openrouter.order_models(["flaky"], stats, now=now + 61),
+            ["flaky"]
+        )
+
+    def test_record_model_result_doubles_cooldown_on_repeated_failures(self):
+        stats = {}
+        openrouter.record_model_result(stats, "m", False, 1.0, now=0)
+        first = stats["m"]["cooldown_until"]
+        openrouter.record_model_result(stats, "m", False, 1.0, now=0)
+
+        self.assertEqual(first, openrouter.COOLDOWN_BASE)
+        self.assertEqual(stats["m"]["cooldown_until"], openrouter.COOLDOWN_BASE * 2)
+
+        openrouter.record_model_result(stats, "m", True, 3.0, now=0)
+
+        self.assertEqual(stats["m"]["cooldown_until"], 0)
+        self.assertEqual(stats["m"]["failures"], 0)
+
+    def test_concurrent_stats_updates_are_not_lost(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        stats_path = os.path.join(tmp.name, "model_stats.json")
+
+        def worker():
+            for _ in range(25):
+                openrouter.update_model_stats("m:free", True, 1.0, stats_path)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = openrouter.load_model_stats(stats_path)
+        self.assertEqual(stats["m:free"]["attempts"], 200)
+        self.assertEqual(os.listdir(tmp.name), ["model_stats.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,334 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from tempfile import TemporaryDirectory
+
+from apis.base import iter_sse_events
+from apis.cache import ResponseCache
+from apis.orchestrator import build_execution_plan, query_provider, \
+    run_generators, run_summarizer
+from apis.types import ProviderInfo
+
+
+def make_provider(name, priority, content, delay=0.0, model=None):
+    def query_fn(prompt):
+        time.sleep(delay)
+        return 200, model or f"{name.lower()}-model", content, None, delay
+
+    return ProviderInfo(
+        name=name,
+        available=True,
+        roles=["generate"],
+        priority=priority,
+        query_fn=query_fn,
+    )
+
+
+class OrchestratorTests(unittest.TestCase):
+    def test_run_generators_parallel_keeps_plan_order(self):
+        generators = [
+            make_provider("Ollama", 30, "fix: slow provider", delay=0.2),
+            make_provider("OpenAI", 70, "feat: fast provider"),
+        ]
+
+        candidates = run_generators(
+            generators, "prompt", 300, parallel=True
+        )
+
+        self.assertEqual(
+            [candidate.provider for candidate in candidates],
+            ["Ollama", "OpenAI"]
+        )
+
+    def test_run_generators_parallel_drops_providers_past_deadline(self):
+        release = threading.Event()
+
+        def blocked_query(prompt):
+            release.wait(5)
+            return 200, "slow", "fix: too late", None, 5.0
+
+        generators = [
+            ProviderInfo(
+                name="OpenRouter",
+                available=True,
+                roles=["generate"],
+                priority=40,
+                query_fn=blocked_query,
+            ),
+            make_provider("Claude", 95, "fix: on time"),
+        ]
+
+        try:
+            started = time.time()
+            candidates = run_generators(
+                generators, "prompt", 300, parallel=True, timeout=0.2
+            )
+            elapsed = time.time() - started
+        finally:
+            release.set()
+
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(
+            [candidate.provider for candidate in candidates],
+            ["Claude"]
+        )
+
+    def test_abandoned_providers_do_not_delay_process_exit(self):
+        script = "\n".join([
+            "import time",
+            "from apis.orchestrator import run_generators, run_summarizer",
+            "from apis.types import ProviderInfo",
+            "def slow(prompt):",
+            "    time.sleep(5)",
+            "    return 200, 'slow', 'fix: too late', None, 5.0",
+            "provider = ProviderInfo('Slow', True, ['generate'], 1, slow)",
+            "fast = ProviderInfo('Fast', True, ['generate'], 2,",
+            "                    lambda prompt: (200, 'fast', 'fix: on time', None, 0.0))",
+            "run_generators([provider, fast], 'prompt', 300, parallel=True, timeout=0.5)",
+            "run_summarizer(provider, ['a', 'b'], timeout=0.2)",
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        start = time.monotonic()
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True)
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 3)
+
+    def test_run_generators_skips_invalid_and_failed_responses(self):
+        generators = [
+            make_provider("OpenAI", 70, "not a conventional commit"),
+            ProviderInfo(
+                name="Codex",
+                available=True,
+                roles=["generate"],
+                priority=100,
+                query_fn=lambda prompt: (500, "gpt-5-codex", "boom", None, 0.1),
+            ),
+            make_provider("Claude", 95, "docs: explain setup"),
+        ]
+
+        for parallel in (False, True):
+            candidates = run_generators(
+                generators, "prompt", 300, parallel=parallel
+            )
+            self.assertEqual(
+                [candidate.provider for candidate in candidates],
+                ["Claude"]
+            )
+
+    def test_build_execution_plan_race_keeps_every_generator(self):
+        providers = [
+            make_provider(name, priority, "fix: x")
+            for name, priority in (
+                ("Codex", 100), ("Ollama", 30), ("OpenRouter", 40),
+                ("OpenAI", 70),
+            )
+        ]
+
+        plan = build_execution_plan(providers, {
+            "generator_count": 2,
+            "provider_strategy": "race",
+            "race_candidates": 2,
+        })
+
+        self.assertEqual(plan.strategy, "race")
+        self.assertEqual(plan.required_candidates, 2)
+        self.assertEqual(
+            [provider.name for provider in plan.generators],
+            ["Ollama", "OpenRouter", "OpenAI", "Codex"]
+        )
+
+    def test_run_generators_race_returns_after_required_candidates(self):
+        release = threading.Event()
+
+        def blocked_query(prompt):
+            release.wait(5)
+            return 200, "slow", "fix: slowest model", None, 5.0
+
+        generators = [
+            ProviderInfo(
+                name="OpenRouter",
+                available=True,
+                roles=["generate"],
+                priority=40,
+                query_fn=blocked_query,
+            ),
+            make_provider("OpenAI", 70, "feat: fast provider"),
+            make_provider("Codex", 100, "fix: fast provider", delay=0.05),
+        ]
+
+        try:
+            started = time.time()
+            candidates = run_generators(generators, "prompt", 300, required=2)
+            elapsed = time.time() - started
+        finally:
+            release.set()
+
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(
+            [candidate.provider for candidate in candidates],
+            ["OpenAI", "Codex"]
+        )
+
+    def test_query_provider_serves_repeated_prompt_from_cache(self):
+        calls = []
+
+        def query_fn(prompt):
+            calls.append(prompt)
+            return 200, "gpt-5-mini", "fix: cached answer", None, 1.5
+
+        provider = ProviderInfo(
+            name="OpenAI",
+            available=True,
+            roles=["generate"],
+            priority=70,
+            query_fn=query_fn,
+            models=["gpt-5-mini"],
+        )
+
+        with TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            first = query_provider(provider, "prompt", cache, 300)
+            second = query_provider(provider, "prompt", cache, 300)
+            other = query_provider(provider, "prompt", cache, 200)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            (second.provider, second.model, second.content),
+            (first.provider, first.model, first.content),
+        )
+        self.assertEqual(first.elapsed, 1.5)
+        self.assertLess(second.elapsed, 1.0)
+        self.assertEqual(other.content, "fix: cached answer")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+    def test_query_provider_skips_cache_for_dynamic_model_selection(self):
+        calls = []
+
+        def query_fn(prompt):
+            calls.append(prompt)
+            return 200, f"model-{len(calls)}:free", "fix: answer", None, 1.0
+
+        provider = ProviderInfo(
+            name="OpenRouter",
+            available=True,
+            roles=["generate"],
+            priority=40,
+            query_fn=query_fn,
+            models=["FreeSmart"],
+        )
+
+        with TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            first = query_provider(provider, "prompt", cache, 300)
+            second = query_provider(provider, "prompt", cache, 300)
+
+        self.assertEqual((first.model, second.model), ("model-1:free", "model-2:free"))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_response_cache_expires_and_evicts_least_recently_used(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, ttl=60, max_entries=2)
+            keys = [
+                cache.build_key("Claude", "sonnet", f"prompt {idx}", 300)
+                for idx in range(3)
+            ]
+            for offset, key in enumerate(keys[:2]):
+                cache.put(key, (200, "sonnet", "fix: x", None, 1.0))
+                path = os.path.join(cache_dir, f"{key}.json")
+                os.utime(path, (1000 + offset, 1000 + offset))
+
+            cache.put(keys[2], (200, "sonnet", "fix: x", None, 1.0))
+
+            self.assertIsNone(cache.get(keys[0]))
+            self.assertIsNotNone(cache.get(keys[1]))
+
+            cache.ttl = -1
+            self.assertIsNone(cache.get(keys[2]))
+
+    def test_run_generators_forwards_stream_deltas_per_provider(self):
+        def streaming_query(prompt, on_delta=None):
+            for piece in ("fix: ", "stream ", "tokens"):
+                on_delta(piece)
+            return 200, "llama3", "fix: stream tokens", None, 0.3
+
+        generators = [
+            ProviderInfo(
+                name="Ollama",
+                available=True,
+                roles=["generate"],
+                priority=30,
+                query_fn=streaming_query,
+            ),
+        ]
+        deltas = []
+
+        candidates = run_generators(
+            generators,
+            "prompt",
+            300,
+            on_delta=lambda provider, text: deltas.append((provider, text)),
+        )
+
+        self.assertEqual(candidates[0].content, "fix: stream tokens")
+        self.assertEqual(
+            "".join(text for _, text in deltas),
+            "fix: stream tokens"
+        )
+        self.assertEqual({provider for provider, _ in deltas}, {"Ollama"})
+
+    def test_run_summarizer_uses_cheapest_summarize_provider_in_order(self):
+        calls = []
+
+        def summarize(prompt):
+            calls.append(prompt)
+            if prompt == "broken":
+                return 500, "llama3", "error", None, 0.1
+            time.sleep(0.1 if prompt == "first" else 0.0)
+            return 200, "llama3", f"{prompt} group\nextra line", None, 0.1
+
+        summarizer = ProviderInfo(
+            name="Ollama",
+            available=True,
+            roles=["generate", "summarize"],
+            priority=30,
+            query_fn=summarize,
+        )
+        premium = make_provider("Claude", 95, "fix: premium")
+        premium.roles = ["generate", "summarize"]
+
+        plan = build_execution_plan([premium, summarizer], {})
+        summaries = run_summarizer(
+            plan.summarizer, ["first", "broken", "third"], timeout=5
+        )
+
+        self.assertIs(plan.summarizer, summarizer)
+        self.assertEqual(summaries, ["first group", None, "third group"])
+        self.assertEqual(sorted(calls), ["broken", "first", "third"])
+        self.assertEqual(run_summarizer(None, ["first"]), [None])
+
+    def test_iter_sse_events_skips_comments_and_stops_on_done(self):
+        class FakeResponse:
+            def iter_lines(self, decode_unicode=False):
+                return iter([
+                    ": OPENROUTER PROCESSING",
+                    "",
+                    'data: {"choices": [{"delta": {"content": "fix"}}]}',
+                    "data: [DONE]",
+                    'data: {"ignored": true}',
+                ])
+
+        events = list(iter_sse_events(FakeResponse()))
+
+        self.assertEqual(
+            events,
+            [{"choices": [{"delta": {"content": "fix"}}]}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
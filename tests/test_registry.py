@@ -0,0 +1,28 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from apis import registry
+
+
+class RegistryTests(unittest.TestCase):
+    def test_discovery_imports_only_enabled_providers(self):
+        env = {"OLLAMA_MODEL": "llama3", "OPENAI_API_KEY": "sk-test"}
+        config = {"providers": {"openai": {"enabled": False}}}
+
+        with patch.dict(os.environ, env, clear=True), \
+                patch("apis.registry.load_provider_module",
+                      wraps=registry.load_provider_module) as load_mock:
+            providers = registry.discover_available_providers(config)
+
+        self.assertEqual([provider.name for provider in providers], ["Ollama"])
+        self.assertEqual(providers[0].models, ["llama3"])
+        load_mock.assert_called_once_with("Ollama")
+        self.assertIs(
+            providers[0].query_fn,
+            registry.load_provider_module("Ollama").query_model,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,12 @@
 import json
 import os
+import subprocess
 import unittest
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from io import StringIO
+from tempfile import TemporaryDirectory
 from tempfile import mkstemp
 from unittest.mock import patch
 
@@ -201,6 +206,116 @@ class ReportHistoryTests(unittest.TestCase):
         self.assertEqual(summary["runs_by_os"]["WINDOWS"], 1)
         self.assertNotIn("MACOS", summary["runs_by_os"])
 
+    def test_parse_commit_trailer_reads_stamp_line_and_legacy_messages(self):
+        stamped = (
+            "[💻box🪟] 🔀: 📝: gcm.py\n"
+            "          ℹ️: feat: 🤖: mentioned in the body 🧠: nope\n"
+            "          🆔: 000,000,042 | 🕒: 2026-10-18 20:13:20.655 | "
+            "📍: Lima, PE | 🌐: CYGWIN | 🤖: OpenAI 🧠: gpt-5-mini | ⏱️: 1.23 secs"
+        )
+        legacy = (
+            "[💻builder🐧] 🔀: update report\n"
+            "   🤖: Codex 🧠: gpt-5-codex\n"
+            "   ⏱️: 4.20 secs"
+        )
+
+        trailer = report_history.parse_commit_trailer(stamped)
+        legacy_trailer = report_history.parse_commit_trailer(legacy)
+
+        self.assertEqual(trailer, report_history.CommitTrailer(
+            number="000,000,042",
+            timestamp="2026-10-18 20:13:20.655",
+            location="Lima, PE",
+            os="WINDOWS",
+            provider="OpenAI",
+            model="gpt-5-mini",
+            elapsed=1.23,
+        ))
+        self.assertEqual(legacy_trailer.os, "LINUX")
+        self.assertEqual(legacy_trailer.provider, "Codex")
+        self.assertEqual(legacy_trailer.model, "gpt-5-codex")
+        self.assertEqual(legacy_trailer.elapsed, 4.2)
+        self.assertIsNone(legacy_trailer.number)
+        self.assertEqual(report_history.parse_provider_from_commit_message(legacy), "Codex")
+        self.assertIs(report_history.parse_commit_trailer(""), report_history.EMPTY_TRAILER)
+
+    def test_parse_commit_trailer_strips_padding_around_stamp_fields(self):
+        stamped = (
+            "[💻box🐧] 🔀: update\n"
+            "          🆔: 000,000,043 | 🕒: 2026-10-18 20:13:20.655 | "
+            "🌐: LINUX | 🤖:  OpenAI  🧠:  gpt-5-mini  | ⏱️: 1.23 secs"
+        )
+
+        trailer = report_history.parse_commit_trailer(stamped)
+
+        self.assertEqual(trailer.number, "000,000,043")
+        self.assertEqual(trailer.provider, "OpenAI")
+        self.assertEqual(trailer.model, "gpt-5-mini")
+        self.assertEqual(trailer.elapsed, 1.23)
+
+    def test_compute_latency_rows_reports_percentiles_per_provider_and_model(self):
+        entries = [
+            {
+                "outcome": "committed",
+                "project": {"name": "GCM"},
+                "displayed_messages": [
+                    {"provider": "OpenAI", "model": "gpt-5" if value % 2 else "gpt-4o", "elapsed": float(value)}
+                    for value in range(1, 101)
+                ],
+            },
+        ]
+
+        summary = report_history.summarize_entries(entries)
+        rows = report_history.compute_latency_rows(summary)
+        provider_rows = report_history.compute_provider_rows(summary)
+
+        self.assertEqual(
+            [(row["provider"], row["model"], row["samples"]) for row in rows],
+            [("OpenAI", None, 100), ("OpenAI", "gpt-4o", 50), ("OpenAI", "gpt-5", 50)],
+        )
+        self.assertEqual(rows[0]["avg"], 50.5)
+        self.assertEqual(provider_rows[0]["avg_displayed"], 50.5)
+        self.assertEqual((rows[0]["p50"], rows[0]["p90"], rows[0]["p99"]), (50.0, 90.0, 99.0))
+
+    def test_elapsed_stats_exact_and_sketch_paths_share_rank_rule(self):
+        small = report_history.ElapsedStats()
+        for value in (1.0, 2.0, 3.0):
+            small.append(value)
+        small_sketch = report_history.DDSketch()
+        for value in (1.0, 2.0, 3.0):
+            small_sketch.add(value)
+
+        self.assertEqual(small.quantiles(), [2.0, 2.0, 2.0])
+        self.assertEqual(
+            small.quantiles(),
+            [round(value) for value in small_sketch.quantiles(report_history.LATENCY_QUANTILES)],
+        )
+
+        large = report_history.ElapsedStats()
+        values = [float(value) for value in range(1, 20001)]
+        for value in values:
+            large.append(value)
+
+        self.assertIsNone(large._samples)
+        self.assertLessEqual(len(large._sketch.bins), large._sketch.max_bins)
+        self.assertEqual(large.mean(), 10000.5)
+        for quantile, value in zip(report_history.LATENCY_QUANTILES, large.quantiles()):
+            exact = values[int(quantile * (len(values) - 1))]
+            self.assertAlmostEqual(value, exact, delta=exact * 0.01)
+
+    def test_ddsketch_stays_bounded_and_merges(self):
+        left = report_history.DDSketch(max_bins=64)
+        right = report_history.DDSketch(max_bins=64)
+        for value in range(1, 5001):
+            (left if value % 2 else right).add(value / 10)
+
+        left.merge(right)
+
+        self.assertLessEqual(len(left.bins), 64)
+        self.assertEqual(left.count, 5000)
+        self.assertAlmostEqual(left.quantile(0.99), 495.0, delta=495.0 * 0.01)
+        self.assertIsNone(report_history.DDSketch().quantile(0.5))
+
     def test_render_plain_summary_includes_os_breakdown(self):
         global_overview = {
             "total_runs": 3,
@@ -456,23 +571,419 @@ class ReportHistoryTests(unittest.TestCase):
         self.assertNotIn("WINDOWS", summary["runs_by_os"])
         self.assertEqual(summary["os_total_runs"], 1)
 
+    @patch("report_history.load_git_log_messages")
+    def test_git_log_store_reads_each_repository_once_per_report(self, load_git_log_messages_mock):
+        load_git_log_messages_mock.return_value = [
+            "[💻builder🐧] 🔀: update report | 🌐: LINUX | 🤖: Codex 🧠: gpt | ⏱️: 1.00 secs",
+        ]
+        entries = [
+            {
+                "outcome": "committed",
+                "project": {"name": "GCM", "path": "C:\\repo\\GCM"},
+                "selected_candidate": {"provider": "Codex", "elapsed": 1.0},
+                "displayed_messages": [{"provider": "Codex", "elapsed": 1.0}],
+            },
+        ]
+        log_store = report_history.GitLogStore()
+
+        summary = report_history.summarize_entries(entries, log_store)
+        global_overview = report_history.build_global_overview(
+            entries, ["C:\\repo\\GCM"], log_store
+        )
+        project_overview = report_history.build_overview_summary(
+            entries,
+            project_path="C:\\repo\\GCM",
+            project_name="GCM",
+            log_store=log_store,
+        )
+
+        load_git_log_messages_mock.assert_called_once_with("C:\\repo\\GCM")
+        self.assertEqual(summary["runs_by_os"]["LINUX"], 1)
+        self.assertEqual(global_overview["runs_by_os"]["LINUX"], 1)
+        self.assertEqual(project_overview["runs_by_os"]["LINUX"], 1)
+
+    @patch("report_history.load_git_log_messages")
+    def test_parallel_git_log_store_matches_serial_provider_rows(self, load_git_log_messages_mock):
+        def fake_git_log(project_path):
+            name = os.path.basename(project_path)
+            if name == "broken":
+                raise OSError("missing repository")
+            return [
+                f"[💻host🐧] 🔀: {name} {index} | 🌐: LINUX | "
+                f"🤖: {'Codex' if index % 2 else 'OpenAI'} 🧠: gpt | ⏱️: {index}.00 secs"
+                for index in range(len(name))
+            ]
+
+        load_git_log_messages_mock.side_effect = fake_git_log
+        project_paths = [
+            os.path.join(os.sep, "repos", name)
+            for name in ("alpha", "be", "broken", "gamma-ray", "d")
+        ]
+
+        def build_rows(workers):
+            log_store = report_history.GitLogStore(workers=workers)
+            entries = report_history.load_git_log_entries(project_paths, log_store)
+            summary = report_history.summarize_entries(entries, log_store)
+            return entries, report_history.compute_provider_rows(summary)
+
+        serial_entries, serial_rows = build_rows(1)
+        parallel_entries, parallel_rows = build_rows(4)
+
+        self.assertEqual(parallel_entries, serial_entries)
+        self.assertEqual(parallel_rows, serial_rows)
+        self.assertTrue(serial_rows)
+
+    @patch("report_history.load_git_log_messages")
+    def test_history_aggregator_matches_multi_pass_summaries_in_one_pass(self, load_git_log_messages_mock):
+        stamped = "[💻host🐧] 🔀: one | 🌐: LINUX | 🤖: Codex 🧠: gpt | ⏱️: 2.00 secs"
+        load_git_log_messages_mock.return_value = [
+            stamped,
+            "[💻mac🍎] 🔀: two | 🌐: MACOS | 🤖: OpenAI 🧠: gpt | ⏱️: 1.00 secs",
+        ]
+        repo_path = os.path.abspath("repo-gcm")
+        entries = [
+            {
+                "outcome": "committed",
+                "project": {"name": "GCM", "path": repo_path},
+                "final_message": stamped,
+                "selected_index": 1,
+                "selected_candidate": {"provider": "OpenAI", "elapsed": 1.0},
+                "plan": {"generators": ["OpenAI", "Codex"], "judge": "Claude"},
+                "displayed_messages": [
+                    {"provider": "OpenAI", "elapsed": 1.0},
+                    {"provider": "Codex", "elapsed": 2.0},
+                ],
+            },
+            {
+                "outcome": "canceled",
+                "project": {"name": "GCM", "path": repo_path},
+                "displayed_messages": [{"provider": "Codex", "elapsed": 3.0}],
+            },
+            {
+                "os": "WINDOWS",
+                "outcome": "committed",
+                "project": {"name": "Other"},
+                "selected_candidate": {"provider": "Ollama", "elapsed": 5.0},
+                "displayed_messages": [{"provider": "Ollama", "elapsed": 5.0}],
+            },
+        ]
+        consumed = []
+
+        def stream():
+            for entry in entries:
+                consumed.append(entry)
+                yield entry
+
+        aggregator = report_history.HistoryAggregator(
+            registered_repos=[repo_path],
+            project_path=repo_path,
+            project_name="GCM",
+        ).consume(stream())
+
+        self.assertEqual(consumed, entries)
+        self.assertEqual(
+            report_history.compute_provider_rows(aggregator.build_summary()),
+            report_history.compute_provider_rows(
+                report_history.summarize_entries(entries)
+            ),
+        )
+        self.assertEqual(
+            aggregator.build_global_overview(),
+            report_history.build_global_overview(entries, [repo_path]),
+        )
+        self.assertEqual(
+            aggregator.build_project_overview(),
+            report_history.build_overview_summary(
+                entries, project_path=repo_path, project_name="GCM"
+            ),
+        )
+        self.assertEqual(aggregator.summary["runs_by_os"], {"LINUX": 1, "MACOS": 1, "WINDOWS": 1})
+        self.assertEqual(aggregator.summary["selection_by_project_provider"][("GCM", "Codex")], 1)
+        self.assertEqual(aggregator.project_overview["total_runs"], 2)
+
+    def test_git_log_index_parses_only_new_commits_and_handles_rewrites(self):
+        def git(repo_path, *args):
+            return subprocess.run(
+                ["git", *args], cwd=repo_path, check=True,
+                capture_output=True, text=True,
+            ).stdout.strip()
+
+        def commit(repo_path, name, os_name):
+            with open(os.path.join(repo_path, name), "w") as f:
+                f.write(name)
+            git(repo_path, "add", name)
+            git(repo_path, "commit", "-q", "-m",
+                f"[💻host] 🔀: {name} | 🌐: {os_name} | 🤖: Codex 🧠: gpt | ⏱️: 1.00 secs")
+            return git(repo_path, "rev-parse", "HEAD")
+
+        with TemporaryDirectory() as repo_path, TemporaryDirectory() as index_dir:
+            git(repo_path, "init", "-q")
+            git(repo_path, "config", "user.name", "gcm")
+            git(repo_path, "config", "user.email", "gcm@example.com")
+            first = commit(repo_path, "a", "LINUX")
+            index = report_history.GitLogIndex(os.path.join(index_dir, "index.sqlite3"))
+
+            self.assertEqual(len(index.load_messages(repo_path)), 1)
+
+            second = commit(repo_path, "b", "MACOS")
+            with patch(
+                "report_history.load_git_log_commits",
+                wraps=report_history.load_git_log_commits,
+            ) as load_commits_mock:
+                messages = index.load_messages(repo_path)
+                index.load_messages(repo_path)
+
+            load_commits_mock.assert_called_once_with(repo_path, first, second)
+            self.assertIn("🔀: b", messages[0])
+            self.assertEqual(
+                index.load_os_counts(repo_path), {"LINUX": 1, "MACOS": 1}
+            )
+
+            git(repo_path, "reset", "-q", "--hard", first)
+            commit(repo_path, "c", "WINDOWS")
+            messages = index.load_messages(repo_path)
+
+            self.assertEqual(len(messages), 2)
+            self.assertFalse(any("🔀: b" in message for message in messages))
+            self.assertEqual(
+                index.load_os_counts(repo_path), {"LINUX": 1, "WINDOWS": 1}
+            )
+
+    def test_iter_history_entries_seeks_to_time_window(self):
+        start = datetime(2026, 1, 1, 12, 0, 0)
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for day in range(60):
+                    if day == 30:
+                        f.write("{broken\n")
+                    timestamp = (start + timedelta(days=day)).isoformat(timespec="milliseconds")
+                    f.write(json.dumps({"timestamp": timestamp, "day": day}) + "\n")
+
+            window = report_history.build_time_window(
+                since="2026-01-20", until="2026-02-05T00:00:00"
+            )
+            with open(path, "rb") as f:
+                offset = report_history.seek_history_offset(f, window.since)
+                first_line = json.loads(f.readline())
+            entries = list(report_history.iter_history_entries(path, window=window))
+            weekly = list(report_history.iter_history_entries(
+                path,
+                window=report_history.build_time_window(
+                    window="7d", now=datetime(2026, 3, 1, 12, 0, 0)
+                ),
+            ))
+
+        self.assertGreater(offset, 0)
+        self.assertEqual(first_line["day"], 19)
+        self.assertEqual([entry["day"] for entry in entries], list(range(19, 35)))
+        self.assertEqual([entry["day"] for entry in weekly], list(range(52, 60)))
+
+    def test_iter_history_entries_keeps_entries_appended_out_of_order(self):
+        # A DST fall-back and a late batch thread both write timestamps
+        # that go backwards by less than an hour.
+        stamps = [
+            ("09:00", "early"),
+            ("10:20", "before"),
+            ("10:05", "late-start"),
+            ("11:30", "inside"),
+            ("12:10", "after"),
+            ("11:50", "late-end"),
+            ("14:00", "later"),
+        ]
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for clock, label in stamps:
+                    entry = {"timestamp": f"2026-01-01T{clock}:00.000", "label": label}
+                    f.write(json.dumps(entry) + "\n")
+
+            window = report_history.build_time_window(
+                since="2026-01-01T10:10:00", until="2026-01-01T12:00:00"
+            )
+            entries = list(report_history.iter_history_entries(path, window=window))
+
+        self.assertEqual(
+            [entry["label"] for entry in entries], ["before", "inside", "late-end"]
+        )
+
+    def test_build_time_window_accepts_dates_and_relative_lengths(self):
+        now = datetime(2026, 3, 1, 12, 0, 0)
+
+        window = report_history.build_time_window(since="30d", now=now)
+        bounded = report_history.build_time_window(
+            until="2026-02-01", window="2w", now=now
+        )
+
+        self.assertEqual(window.since, datetime(2026, 1, 30, 12, 0, 0))
+        self.assertIsNone(window.until)
+        self.assertEqual(bounded.since, datetime(2026, 1, 19))
+        self.assertEqual(bounded.until, datetime(2026, 2, 1, 23, 59, 59, 999999))
+        self.assertFalse(report_history.TimeWindow())
+        with self.assertRaises(ValueError):
+            report_history.build_time_window(window="soon")
+        with self.assertRaises(ValueError):
+            report_history.build_time_window(since="2026-01-01", window="7d")
+
+    def test_build_time_window_handles_aware_datetimes_and_whole_days(self):
+        aware = report_history.build_time_window(since="2026-10-01T00:00:00Z")
+        day = report_history.build_time_window(since="2026-10-10", until="2026-10-10")
+        expected_since = datetime(2026, 10, 1, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+        self.assertEqual(aware.since, expected_since)
+        self.assertIsNone(aware.since.tzinfo)
+        self.assertTrue(aware.contains(datetime(2026, 10, 2, 9, 30)))
+        self.assertTrue(day.contains(datetime(2026, 10, 10, 18, 45)))
+        self.assertFalse(day.contains(datetime(2026, 10, 11, 0, 0)))
+
+    @patch("report_history.load_git_log_messages")
+    def test_git_log_store_pushes_time_window_into_git_log(self, load_git_log_messages_mock):
+        load_git_log_messages_mock.return_value = []
+        window = report_history.TimeWindow(datetime(2026, 1, 1), datetime(2026, 2, 1))
+
+        report_history.GitLogStore(window=window).get("/repos/GCM")
+
+        load_git_log_messages_mock.assert_called_once_with(
+            "/repos/GCM", since=window.since, until=window.until
+        )
+        self.assertEqual(
+            report_history.build_git_log_window_args(window.since, window.until),
+            ["--since=2026-01-01T00:00:00", "--until=2026-02-01T00:00:00"],
+        )
+
+    def test_rolling_rows_bucket_runs_acceptance_and_latency(self):
+        entries = [
+            {
+                "timestamp": timestamp,
+                "outcome": outcome,
+                "project": {"name": "GCM"},
+                "displayed_messages": [{"provider": "Codex", "elapsed": elapsed}],
+            }
+            for timestamp, outcome, elapsed in (
+                ("2026-03-02T09:00:00.000", "committed", 1.0),
+                ("2026-03-04T09:00:00.000", "canceled", 3.0),
+                ("2026-03-10T09:00:00.000", "committed", 2.0),
+            )
+        ]
+
+        aggregator = report_history.HistoryAggregator(
+            report_history.GitLogStore(), rolling="weekly"
+        ).consume(entries)
+        rows = report_history.compute_rolling_rows(aggregator.buckets, "weekly")
+
+        self.assertEqual(
+            [(row["bucket"], row["provider"], row["runs"]) for row in rows],
+            [
+                ("2026-W10", None, 2),
+                ("2026-W10", "Codex", None),
+                ("2026-W11", None, 1),
+                ("2026-W11", "Codex", None),
+            ],
+        )
+        self.assertEqual(rows[0]["acceptance"], 50.0)
+        self.assertEqual(rows[0]["avg"], 2.0)
+
+    @patch("report_history.render_summary")
+    @patch("report_history.load_registered_repos")
+    @patch("report_history.iter_git_log_entries")
+    @patch("report_history.iter_history_entries")
+    @patch("report_history.load_config")
+    def test_main_exports_machine_readable_formats(
+        self,
+        load_config_mock,
+        iter_history_entries_mock,
+        iter_git_log_entries_mock,
+        load_registered_repos_mock,
+        render_summary_mock,
+    ):
+        load_config_mock.return_value = {"history_json_path": "~/.missing.jsonl"}
+        load_registered_repos_mock.return_value = []
+        iter_history_entries_mock.side_effect = lambda *args: iter([
+            {
+                "outcome": "canceled",
+                "os": "LINUX",
+                "project": {"name": "GCM"},
+                "displayed_messages": [
+                    {"provider": "Codex", "model": "gpt-5", "elapsed": 2.0},
+                    {"provider": "Claude", "model": "sonnet", "elapsed": 4.0},
+                ],
+            },
+        ])
+        outputs = {}
+        for output_format in ("json", "csv", "prometheus"):
+            with patch("sys.stdout", new_callable=StringIO) as stdout:
+                self.assertEqual(report_history.main(["--format", output_format]), 0)
+            outputs[output_format] = stdout.getvalue()
+
+        payload = json.loads(outputs["json"])
+        csv_lines = outputs["csv"].splitlines()
+        render_summary_mock.assert_not_called()
+        iter_git_log_entries_mock.assert_not_called()
+        self.assertEqual(payload["summary"]["total_canceled"], 1)
+        self.assertEqual(payload["summary"]["projects"], ["GCM"])
+        self.assertEqual(
+            [(row["provider"], row["displayed"]) for row in payload["providers"]],
+            [("Claude", 1), ("Codex", 1)],
+        )
+        self.assertEqual(payload["latency"][0]["p50"], 4.0)
+        self.assertEqual(csv_lines[0], "section,scope,project,provider,model,period,os,choice,metric,value")
+        self.assertIn("latency,,,Codex,gpt-5,,,,p90,2.0", csv_lines)
+        self.assertIn('gcm_history_runs{scope="summary"} 1', outputs["prometheus"])
+        self.assertIn(
+            'gcm_provider_displayed{project="GCM",provider="Codex"} 1', outputs["prometheus"]
+        )
+        self.assertEqual(outputs["prometheus"].count("# TYPE gcm_latency_p99 gauge"), 1)
+
+    @patch("report_history.render_summary")
+    @patch("report_history.load_registered_repos")
+    @patch("report_history.iter_git_log_entries")
+    @patch("report_history.iter_history_entries")
+    @patch("report_history.load_config")
+    def test_main_passes_window_and_rolling_rows(
+        self,
+        load_config_mock,
+        iter_history_entries_mock,
+        iter_git_log_entries_mock,
+        load_registered_repos_mock,
+        render_summary_mock,
+    ):
+        load_config_mock.return_value = {"history_json_path": "~/.missing.jsonl"}
+        load_registered_repos_mock.return_value = []
+        iter_history_entries_mock.return_value = [
+            {
+                "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+                "outcome": "canceled",
+                "project": {"name": "GCM"},
+                "displayed_messages": [{"provider": "Codex", "elapsed": 1.0}],
+            },
+        ]
+
+        exit_code = report_history.main(["--window", "7d", "--rolling", "daily"])
+
+        window = iter_history_entries_mock.call_args[0][2]
+        rolling_rows = render_summary_mock.call_args[0][6]
+        self.assertEqual(exit_code, 0)
+        self.assertIsNotNone(window.since)
+        self.assertEqual(rolling_rows[0]["runs"], 1)
+        iter_git_log_entries_mock.assert_not_called()
+
     @patch("report_history.render_summary")
     @patch("report_history.load_registered_repos")
-    @patch("report_history.load_git_log_entries")
-    @patch("report_history.load_history_entries")
+    @patch("report_history.iter_git_log_entries")
+    @patch("report_history.iter_history_entries")
     @patch("report_history.load_config")
     def test_main_falls_back_to_git_log_when_structured_history_is_missing(
         self,
         load_config_mock,
-        load_history_entries_mock,
-        load_git_log_entries_mock,
+        iter_history_entries_mock,
+        iter_git_log_entries_mock,
         load_registered_repos_mock,
         render_summary_mock,
     ):
         load_config_mock.return_value = {"history_json_path": "~/.missing.jsonl"}
-        load_history_entries_mock.return_value = []
+        iter_history_entries_mock.return_value = []
         load_registered_repos_mock.return_value = [os.path.abspath("/tmp/Other")]
-        load_git_log_entries_mock.return_value = [
+        iter_git_log_entries_mock.return_value = [
             {
                 "os": "LINUX",
                 "outcome": "committed",
@@ -490,26 +1001,26 @@ class ReportHistoryTests(unittest.TestCase):
         exit_code = report_history.main()
 
         self.assertEqual(exit_code, 0)
-        load_git_log_entries_mock.assert_called_once()
-        git_log_paths = load_git_log_entries_mock.call_args[0][0]
+        iter_git_log_entries_mock.assert_called_once()
+        git_log_paths = iter_git_log_entries_mock.call_args[0][0]
         self.assertEqual(git_log_paths[0], os.path.abspath(os.getcwd()))
         self.assertIn(os.path.abspath("/tmp/Other"), git_log_paths)
         render_summary_mock.assert_called_once()
 
     @patch("report_history.load_registered_repos")
-    @patch("report_history.load_git_log_entries")
-    @patch("report_history.load_history_entries")
+    @patch("report_history.iter_git_log_entries")
+    @patch("report_history.iter_history_entries")
     @patch("report_history.load_config")
     def test_main_exits_cleanly_when_no_structured_or_git_history(
         self,
         load_config_mock,
-        load_history_entries_mock,
-        load_git_log_entries_mock,
+        iter_history_entries_mock,
+        iter_git_log_entries_mock,
         load_registered_repos_mock,
     ):
         load_config_mock.return_value = {"history_json_path": "~/.missing.jsonl"}
-        load_history_entries_mock.return_value = []
-        load_git_log_entries_mock.return_value = []
+        iter_history_entries_mock.return_value = []
+        iter_git_log_entries_mock.return_value = []
         load_registered_repos_mock.return_value = []
 
         with patch("sys.stdout", new=StringIO()) as stdout:
@@ -0,0 +1,33 @@
+import unittest
+
+from apis import transport
+
+
+class TransportTests(unittest.TestCase):
+    def tearDown(self):
+        transport.configure_transport({})
+
+    def test_get_session_is_shared_until_reconfigured(self):
+        transport.configure_transport({"transport": {"pool_size": 4}})
+
+        first = transport.get_session()
+        second = transport.get_session()
+        adapter = first.get_adapter("https://api.anthropic.com/v1/messages")
+
+        self.assertIs(first, second)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+        transport.configure_transport({"transport": {"timeout": 15}})
+
+        self.assertIsNot(transport.get_session(), first)
+        self.assertEqual(transport.get_timeout(), 15)
+
+    def test_get_openai_client_reuses_client_per_api_key(self):
+        first = transport.get_openai_client("key-a")
+
+        self.assertIs(transport.get_openai_client("key-a"), first)
+        self.assertIsNot(transport.get_openai_client("key-b"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
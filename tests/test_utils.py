@@ -0,0 +1,222 @@
+import os
+import subprocess
+import unittest
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import utils
+
+
+def git(repo_path, *args):
+    subprocess.run(["git", *args], cwd=repo_path, check=True,
+                   capture_output=True)
+
+
+class RepoSnapshotTests(unittest.TestCase):
+    def test_iter_status_v2_z_streams_every_entry_kind(self):
+        output = "\0".join([
+            "# branch.oid 1234abcd",
+            "# branch.head main",
+            "1 MM N... 100644 100644 100644 aaa bbb src/app.py",
+            "1 A. N... 000000 100644 100644 000 aaa new file.txt",
+            "2 R. N... 100644 100644 100644 aaa aaa R100 renamed.py",
+            "old name.py",
+            "2 C. N... 100644 100644 100644 aaa aaa C75 copy.py",
+            "orig.py",
+            "1 T. N... 100644 120000 120000 aaa bbb link",
+            "u UU N... 100644 100644 100644 100644 a b c conflict.txt",
+            "? caf\u00e9 \"quoted\"\nname.txt",
+            "! build/",
+            "",
+        ])
+        header = {}
+
+        entries = list(utils.iter_status_v2_z(
+            utils.iter_nul_records(StringIO(output, newline=""), chunk_size=7), header
+        ))
+
+        self.assertEqual(header, {"branch.oid": "1234abcd", "branch.head": "main"})
+        self.assertEqual(entries, [
+            ("MM", "src/app.py"),
+            ("A ", "new file.txt"),
+            ("R ", "renamed.py"),
+            ("C ", "copy.py"),
+            ("T ", "link"),
+            ("UU", "conflict.txt"),
+            ("??", 'caf\u00e9 "quoted"\nname.txt'),
+        ])
+
+    def test_format_shortstat_matches_git_wording(self):
+        self.assertEqual(
+            utils.format_shortstat(1, 2, 0),
+            "1 file changed, 2 insertions(+)"
+        )
+        self.assertEqual(
+            utils.format_shortstat(2, 0, 1),
+            "2 files changed, 1 deletion(-)"
+        )
+        self.assertEqual(
+            utils.format_shortstat(1, 0, 0),
+            "1 file changed, 0 insertions(+), 0 deletions(-)"
+        )
+        self.assertEqual(utils.format_shortstat(0, 0, 0), "")
+
+    def test_diff_summary_combines_staged_and_unstaged(self):
+        snapshot = utils.RepoSnapshot(
+            head=None, branch=None, staged_stat=(1, 2, 0), unstaged_stat=(2, 0, 3)
+        )
+
+        self.assertEqual(
+            snapshot.diff_summary,
+            "Staged: 1 file changed, 2 insertions(+)\n"
+            "Unstaged: 2 files changed, 3 deletions(-)"
+        )
+        self.assertEqual(utils.RepoSnapshot(head=None, branch=None).diff_summary, "")
+
+    def test_collect_repo_snapshot_matches_git_shortstat(self):
+        with TemporaryDirectory() as repo_path:
+            git(repo_path, "init", "-q")
+            git(repo_path, "config", "user.name", "gcm")
+            git(repo_path, "config", "user.email", "gcm@example.com")
+            with open(os.path.join(repo_path, "a.txt"), "w") as f:
+                f.write("one\ntwo\n")
+            git(repo_path, "add", "a.txt")
+            git(repo_path, "commit", "-q", "-m", "init")
+            with open(os.path.join(repo_path, "a.txt"), "w") as f:
+                f.write("one\n")
+            with open(os.path.join(repo_path, "b.txt"), "w") as f:
+                f.write("new\n")
+            git(repo_path, "add", "b.txt")
+
+            snapshot = utils.collect_repo_snapshot(cwd=repo_path)
+            expected = []
+            for label, args in (
+                ("Staged", ["diff", "--cached", "--shortstat"]),
+                ("Unstaged", ["diff", "--shortstat"]),
+            ):
+                output = subprocess.run(
+                    ["git", *args], cwd=repo_path, check=True,
+                    capture_output=True, text=True,
+                ).stdout.strip()
+                expected.append(f"{label}: {output}")
+
+        self.assertEqual(snapshot.commit_count, 1)
+        self.assertTrue(snapshot.head)
+        self.assertTrue(snapshot.has_staged_changes)
+        self.assertEqual(snapshot.diff_summary, "\n".join(expected))
+        self.assertEqual(
+            sorted(snapshot.status_entries),
+            [(" M", "a.txt"), ("A ", "b.txt")]
+        )
+
+    def test_collect_repo_snapshot_handles_renames_and_unusual_names(self):
+        with TemporaryDirectory() as repo_path:
+            git(repo_path, "init", "-q")
+            git(repo_path, "config", "user.name", "gcm")
+            git(repo_path, "config", "user.email", "gcm@example.com")
+            with open(os.path.join(repo_path, "old.txt"), "w") as f:
+                f.write("one\n")
+            git(repo_path, "add", "old.txt")
+            git(repo_path, "commit", "-q", "-m", "init")
+            git(repo_path, "mv", "old.txt", "new name.txt")
+            with open(os.path.join(repo_path, "caf\u00e9 \"q\".txt"), "w") as f:
+                f.write("new\n")
+
+            snapshot = utils.collect_repo_snapshot(cwd=repo_path)
+
+        self.assertEqual(snapshot.status_entries, [("R ", "new name.txt")])
+        self.assertEqual(snapshot.untracked.directories, {"": 1})
+        self.assertTrue(snapshot.has_staged_changes)
+
+    def test_collect_repo_snapshot_counts_untracked_per_directory(self):
+        with TemporaryDirectory() as repo_path:
+            git(repo_path, "init", "-q")
+            with open(os.path.join(repo_path, "tracked.txt"), "w") as f:
+                f.write("one\n")
+            git(repo_path, "add", "tracked.txt")
+            os.makedirs(os.path.join(repo_path, "build", "out"))
+            for index in range(20):
+                open(os.path.join(repo_path, "build", "out", f"{index}.o"), "w").close()
+            open(os.path.join(repo_path, "notes.txt"), "w").close()
+
+            normal = utils.collect_repo_snapshot(cwd=repo_path)
+            capped = utils.collect_repo_snapshot(
+                cwd=repo_path, untracked_files="all", untracked_limit=5,
+                untracked_cache=True,
+            )
+            skipped = utils.collect_repo_snapshot(cwd=repo_path, untracked_files="no")
+
+        self.assertEqual(normal.untracked.directories, {"": 1})
+        self.assertEqual(normal.untracked.trees, ["build"])
+        self.assertEqual(normal.untracked.files, 1)
+        self.assertFalse(normal.untracked.truncated)
+        self.assertEqual(capped.status_entries, [("A ", "tracked.txt")])
+        self.assertEqual(capped.untracked.total, 5)
+        self.assertTrue(capped.untracked.truncated)
+        self.assertEqual(skipped.status_entries, [("A ", "tracked.txt")])
+        self.assertEqual(skipped.untracked.total, 0)
+
+    def test_status_git_options_only_auto_enable_builtin_fsmonitor(self):
+        self.assertEqual(utils.status_git_options(), [])
+        self.assertEqual(
+            utils.status_git_options(untracked_cache=True, fsmonitor=True),
+            ["-c", "core.untrackedCache=true", "-c", "core.fsmonitor=true"],
+        )
+        with mock.patch.object(utils, "get_git_version", return_value=(2, 45, 1)), \
+                mock.patch.object(utils, "_git_config_value", return_value=None):
+            with mock.patch.object(utils.sys, "platform", "linux"):
+                self.assertEqual(utils.status_git_options(fsmonitor="auto"), [])
+            with mock.patch.object(utils.sys, "platform", "darwin"):
+                self.assertEqual(
+                    utils.status_git_options(fsmonitor="auto"),
+                    ["-c", "core.fsmonitor=true"],
+                )
+        with mock.patch.object(utils, "get_git_version", return_value=(2, 45, 1)), \
+                mock.patch.object(utils, "_git_config_value", return_value="watchman-hook"), \
+                mock.patch.object(utils.sys, "platform", "win32"):
+            self.assertEqual(utils.status_git_options(fsmonitor="auto"), [])
+
+    def test_collect_repo_snapshot_raises_outside_a_repository(self):
+        with TemporaryDirectory() as path:
+            with self.assertRaises(subprocess.CalledProcessError):
+                utils.collect_repo_snapshot(cwd=path)
+
+    def test_get_commit_count_is_cached_and_incremental_per_head(self):
+        def commit(repo_path, name):
+            with open(os.path.join(repo_path, name), "w") as f:
+                f.write(name)
+            git(repo_path, "add", name)
+            git(repo_path, "commit", "-q", "-m", name)
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], cwd=repo_path, check=True,
+                capture_output=True, text=True,
+            ).stdout.strip()
+
+        with TemporaryDirectory() as repo_path:
+            git(repo_path, "init", "-q")
+            git(repo_path, "config", "user.name", "gcm")
+            git(repo_path, "config", "user.email", "gcm@example.com")
+            first = commit(repo_path, "a")
+            second = commit(repo_path, "b")
+
+            self.assertEqual(utils.get_commit_count(repo_path, head=second), 2)
+            self.assertEqual(
+                utils.load_cached_commit_count(repo_path), (second, 2)
+            )
+
+            third = commit(repo_path, "c")
+            self.assertEqual(utils.get_commit_count(repo_path, head=third), 3)
+
+            git(repo_path, "reset", "-q", "--hard", first)
+            rewritten = commit(repo_path, "d")
+            self.assertEqual(
+                utils.get_commit_count(repo_path, head=rewritten), 2
+            )
+            self.assertEqual(
+                utils.load_cached_commit_count(repo_path), (rewritten, 2)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
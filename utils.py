@@ -1,9 +1,12 @@
 # utils.py - Librería compartida para GCM
 
+import io
 import os
 import sys
 import platform
 import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 DEFAULT_EMOJIS = {
     'windows': '🪟',
@@ -25,25 +28,25 @@ CHEAP_EMOJI = '💵'
 ENERGY_EMOJI = '🔌'
 
 
-def _git_safe_directory():
-    return os.path.abspath(os.getcwd()).replace("\\", "/")
+def _git_safe_directory(cwd=None):
+    return os.path.abspath(cwd or os.getcwd()).replace("\\", "/")
 
 
-def git_command(*args):
+def git_command(*args, cwd=None):
     return [
         "git",
         "-c",
-        f"safe.directory={_git_safe_directory()}",
+        f"safe.directory={_git_safe_directory(cwd)}",
         *args,
     ]
 
 
-def run_git_command(args, **kwargs):
-    return subprocess.run(git_command(*args), **kwargs)
+def run_git_command(args, cwd=None, **kwargs):
+    return subprocess.run(git_command(*args, cwd=cwd), cwd=cwd, **kwargs)
 
 
-def check_output_git(args, **kwargs):
-    return subprocess.check_output(git_command(*args), **kwargs)
+def check_output_git(args, cwd=None, **kwargs):
+    return subprocess.check_output(git_command(*args, cwd=cwd), cwd=cwd, **kwargs)
 
 
 def detect_environment(emojis=None):
@@ -111,19 +114,378 @@ def get_cost(USE_OLLAMA, MODEL_TIER):
     return EXPENSIVE_EMOJI
 
 
-def get_commit_count():
+COMMIT_COUNT_FILE = "gcm-count"
+
+
+def _commit_count_path(cwd=None):
+    git_dir = os.path.join(cwd or os.getcwd(), ".git")
+    if not os.path.isdir(git_dir):
+        return None
+    return os.path.join(git_dir, COMMIT_COUNT_FILE)
+
+
+def load_cached_commit_count(cwd=None):
+    path = _commit_count_path(cwd)
+    if not path:
+        return None, None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            sha, count = f.read().split()
+        return sha, int(count)
+    except (OSError, ValueError):
+        return None, None
+
+
+def save_cached_commit_count(head, count, cwd=None):
+    path = _commit_count_path(cwd)
+    if not path or not head:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{head} {count}\n")
+    except OSError:
+        pass
+
+
+def _count_commits_since(cached_sha, head, cwd=None):
+    # One call answers both "is the cached SHA still an ancestor?" (left
+    # side is 0) and "how many commits were added since?" (right side).
+    result = run_git_command(
+        ["rev-list", "--count", "--left-right", f"{cached_sha}...{head}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    behind, ahead = (int(value) for value in result.stdout.split())
+    if behind:
+        return None
+    return ahead
+
+
+def get_commit_count(cwd=None, head=None):
+    if head:
+        cached_sha, cached_count = load_cached_commit_count(cwd)
+        if cached_sha == head:
+            return cached_count
+        if cached_sha:
+            try:
+                added = _count_commits_since(cached_sha, head, cwd)
+            except Exception:
+                added = None
+            if added is not None:
+                save_cached_commit_count(head, cached_count + added, cwd)
+                return cached_count + added
+
     try:
         result = run_git_command(
-            ["rev-list", "--count", "HEAD"],
+            ["rev-list", "--count", head or "HEAD"],
+            cwd=cwd,
             capture_output=True,
             text=True,
             check=True
         )
         count = int(result.stdout.strip())
-        return count
     except Exception:
         return 0
 
+    if head:
+        save_cached_commit_count(head, count, cwd)
+    return count
+
+
+def format_shortstat(files, insertions, deletions):
+    if not files:
+        return ""
+
+    parts = [f"{files} file{'' if files == 1 else 's'} changed"]
+    # Same rules as git's own --shortstat footer.
+    if insertions or not deletions:
+        parts.append(
+            f"{insertions} insertion{'' if insertions == 1 else 's'}(+)"
+        )
+    if deletions or not insertions:
+        parts.append(
+            f"{deletions} deletion{'' if deletions == 1 else 's'}(-)"
+        )
+    return ", ".join(parts)
+
+
+def parse_numstat(output):
+    files = insertions = deletions = 0
+    for line in output.splitlines():
+        parts = line.split("\t", 2)
+        if len(parts) < 3:
+            continue
+        files += 1
+        # Binary files report "-" for both counts.
+        if parts[0].isdigit():
+            insertions += int(parts[0])
+        if parts[1].isdigit():
+            deletions += int(parts[1])
+    return files, insertions, deletions
+
+
+STATUS_CHUNK_SIZE = 1 << 16
+_STATUS_CODES = {}
+
+
+def _status_code(xy):
+    # "M." -> "M ": the same XY form as `git status --short`.
+    code = _STATUS_CODES.get(xy)
+    if code is None:
+        code = _STATUS_CODES[xy] = xy.replace(".", " ")
+    return code
+
+
+def iter_nul_records(stream, chunk_size=STATUS_CHUNK_SIZE):
+    """Split a text stream on NUL without reading it all into memory."""
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        records = (pending + chunk).split("\0") if pending else chunk.split("\0")
+        pending = records.pop()
+        yield from records
+    if pending:
+        yield pending
+
+
+def iter_status_v2_z(records, header=None):
+    """Stream (XY, path) entries from `git status --porcelain=v2 -z` records.
+
+    With -z paths are never quoted, renames and copies carry their source
+    path in the following record, and "# branch.*" headers are stored in
+    ``header`` when given. Ignored entries are skipped.
+    """
+    records = iter(records)
+    for record in records:
+        kind = record[:2]
+        if kind == "? ":
+            yield "??", record[2:]
+        elif kind == "1 ":
+            fields = record.split(" ", 8)
+            if len(fields) == 9:
+                yield _status_code(fields[1]), fields[8]
+        elif kind == "2 ":
+            # The rename/copy source follows as its own NUL-terminated record.
+            next(records, None)
+            fields = record.split(" ", 9)
+            if len(fields) == 10:
+                yield _status_code(fields[1]), fields[9]
+        elif kind == "u ":
+            fields = record.split(" ", 10)
+            if len(fields) == 11:
+                yield _status_code(fields[1]), fields[10]
+        elif kind == "# " and header is not None:
+            key, _, value = record[2:].partition(" ")
+            header[key] = value
+
+
+UNTRACKED_POLICIES = ("no", "normal", "all")
+DEFAULT_UNTRACKED_POLICY = "normal"
+# The built-in fsmonitor daemon ships with git 2.36+ on macOS and Windows.
+FSMONITOR_MIN_GIT_VERSION = (2, 36)
+FSMONITOR_PLATFORMS = ("darwin", "win32")
+_GIT_VERSION = None
+
+
+def get_git_version():
+    global _GIT_VERSION
+    if _GIT_VERSION is None:
+        try:
+            output = subprocess.run(
+                ["git", "version"], capture_output=True, text=True, check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            output = ""
+        numbers = output.replace("git version", "").strip().split(".")[:3]
+        _GIT_VERSION = tuple(
+            int(number) for number in numbers if number.isdigit()
+        )
+    return _GIT_VERSION
+
+
+def _git_config_value(key, cwd=None):
+    result = run_git_command(
+        ["config", "--get", key], cwd=cwd, capture_output=True, text=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def status_git_options(untracked_cache=False, fsmonitor=False, cwd=None):
+    """`-c` options that let git skip rescanning the working tree.
+
+    ``fsmonitor="auto"`` turns on the built-in daemon where git supports it,
+    unless the repository already configures its own fsmonitor hook.
+    """
+    options = []
+    if untracked_cache:
+        options += ["-c", "core.untrackedCache=true"]
+    if fsmonitor == "auto":
+        fsmonitor = (
+            sys.platform in FSMONITOR_PLATFORMS
+            and get_git_version() >= FSMONITOR_MIN_GIT_VERSION
+            and _git_config_value("core.fsmonitor", cwd) is None
+        )
+    if fsmonitor:
+        options += ["-c", "core.fsmonitor=true"]
+    return options
+
+
+@dataclass
+class UntrackedSummary:
+    """Untracked entries counted per directory instead of listed.
+
+    With ``-unormal`` git reports a wholly untracked directory as a single
+    ``dir/`` entry without enumerating it; those are kept apart in
+    ``trees`` because their file count is unknown.
+    """
+    directories: Dict[str, int] = field(default_factory=dict)
+    files: int = 0
+    trees: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def total(self):
+        return self.files + len(self.trees)
+
+    def add(self, path):
+        if path.endswith("/"):
+            self.trees.append(path[:-1])
+            return
+        directory = path.rpartition("/")[0]
+        self.directories[directory] = self.directories.get(directory, 0) + 1
+        self.files += 1
+
+
+def read_status_v2(cwd=None, untracked_files=DEFAULT_UNTRACKED_POLICY,
+                   untracked_limit=0, git_options=()):
+    """Run `git status --porcelain=v2 -z` and stream its entries.
+
+    Returns (head, branch, entries, untracked): tracked entries as (XY, path)
+    and untracked ones counted in an UntrackedSummary. git lists untracked
+    entries last, so past ``untracked_limit`` of them it is stopped without
+    losing tracked changes. Raises CalledProcessError like check=True when
+    git fails.
+    """
+    if untracked_files not in UNTRACKED_POLICIES:
+        raise ValueError(f"unknown untracked_files policy: {untracked_files!r}")
+    args = git_command(
+        *git_options,
+        "status",
+        "--porcelain=v2",
+        "--branch",
+        "-z",
+        f"--untracked-files={untracked_files}",
+        cwd=cwd,
+    )
+    process = subprocess.Popen(
+        args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    header = {}
+    entries = []
+    untracked = UntrackedSummary()
+    with process:
+        # newline="" keeps carriage returns inside file names intact.
+        stdout = io.TextIOWrapper(
+            process.stdout, encoding="utf-8", errors="replace", newline=""
+        )
+        for code, path in iter_status_v2_z(iter_nul_records(stdout), header):
+            if code != "??":
+                entries.append((code, path))
+            elif untracked_limit and untracked.total >= untracked_limit:
+                untracked.truncated = True
+                process.kill()
+                break
+            else:
+                untracked.add(path)
+        stderr = process.stderr.read()
+    if process.returncode and not untracked.truncated:
+        raise subprocess.CalledProcessError(
+            process.returncode, args, stderr=stderr
+        )
+
+    oid = header.get("branch.oid")
+    head = None if oid in (None, "(initial)") else oid
+    return head, header.get("branch.head"), entries, untracked
+
+
+@dataclass
+class RepoSnapshot:
+    head: Optional[str]
+    branch: Optional[str]
+    status_entries: List[Tuple[str, str]] = field(default_factory=list)
+    untracked: UntrackedSummary = field(default_factory=UntrackedSummary)
+    staged_stat: Tuple[int, int, int] = (0, 0, 0)
+    unstaged_stat: Tuple[int, int, int] = (0, 0, 0)
+    commit_count: int = 0
+
+    @property
+    def has_staged_changes(self):
+        return any(
+            code[0] not in " ?" for code, _ in self.status_entries
+        )
+
+    @property
+    def diff_summary(self):
+        summaries = []
+        for label, stat in (
+            ("Staged", self.staged_stat),
+            ("Unstaged", self.unstaged_stat),
+        ):
+            shortstat = format_shortstat(*stat)
+            if shortstat:
+                summaries.append(f"{label}: {shortstat}")
+        return "\n".join(summaries)
+
+
+def _git_stdout(args, cwd=None):
+    return run_git_command(
+        args,
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        check=True
+    ).stdout
+
+
+def collect_repo_snapshot(cwd=None, untracked_files=DEFAULT_UNTRACKED_POLICY,
+                          untracked_limit=0, untracked_cache=False,
+                          fsmonitor=False):
+    head, branch, entries, untracked = read_status_v2(
+        cwd,
+        untracked_files=untracked_files,
+        untracked_limit=untracked_limit,
+        git_options=status_git_options(untracked_cache, fsmonitor, cwd),
+    )
+
+    # Only ask git for line counts on the sides that actually changed.
+    staged_stat = (0, 0, 0)
+    if any(code[0] not in " ?" for code, _ in entries):
+        staged_stat = parse_numstat(
+            _git_stdout(["diff", "--cached", "--numstat"], cwd=cwd)
+        )
+
+    unstaged_stat = (0, 0, 0)
+    if any(code[1] != " " for code, _ in entries):
+        unstaged_stat = parse_numstat(
+            _git_stdout(["diff", "--numstat"], cwd=cwd)
+        )
+
+    return RepoSnapshot(
+        head=head,
+        branch=branch,
+        status_entries=entries,
+        untracked=untracked,
+        staged_stat=staged_stat,
+        unstaged_stat=unstaged_stat,
+        commit_count=get_commit_count(cwd, head=head) if head else 0,
+    )
+
 
 def print_inline(message):
     sys.stdout.write(message)
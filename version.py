@@ -46,18 +46,19 @@ def generate_version_badge(version, badge_dir=".badges"):
         safe_print(f"❌ Error creating badge: {e}")
 
 
-def update_version_file(config):
+def update_version_file(config, commit_count=None):
     version_file = config.get("file", "version.txt")
     version_mode = config.get("mode", "manual")
     version = None
 
     if version_mode == "commits":
         try:
-            output = check_output_git(
-                ["rev-list", "--count", "HEAD"],
-                stderr=None
-            )
-            commit_count = int(output.decode().strip())
+            if commit_count is None:
+                output = check_output_git(
+                    ["rev-list", "--count", "HEAD"],
+                    stderr=None
+                )
+                commit_count = int(output.decode().strip())
             commit_count += 1
             version = f"{commit_count:011,}"
             # version = str(commit_count + 1)